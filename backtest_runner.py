@@ -1,76 +1,59 @@
 # rs_outperformance_kite_system/backtest_runner.py
 
 import pandas as pd
-from datetime import datetime, timedelta
-from strategy.rs_entry_engine import run_daily_entry_engine
+from datetime import datetime
+from strategy.backtest_engine import run_backtest
 from data.live_fetch.kite_client import ZerodhaKiteClient
-import yaml
+from data.ohlc_store import OHLCStore
+from data.backtest_provider import BacktestDataProvider
 
-from tools.secrets import load_secrets
+from tools.config import get_config
 
-# Load config
-secrets = load_secrets()
+# Default backtest date range
+START_DATE = datetime(2025, 5, 1).date()
+END_DATE = datetime(2025, 5, 15).date()
 
-with open("config/params.yaml") as f:
-    params = yaml.safe_load(f)
+# Enough history before start_date for the weekly RS points (42 weeks)
+WARMUP_DAYS = 400
 
-api_key = secrets['kite_api_key']
-api_secret = secrets['kite_api_secret']
-access_token = secrets['kite_access_token']
 
-kite = ZerodhaKiteClient(api_key, api_secret, access_token)
+def run(start_date=START_DATE, end_date=END_DATE):
+    """Backtest the full strategy from ``start_date`` to ``end_date``."""
+    config = get_config()
+    secrets = config.secrets
+    params = config.params
 
-symbols = params['stock_list']
-index_symbol = params['index_symbol']
+    kite = ZerodhaKiteClient(secrets['kite_api_key'], secrets['kite_api_secret'],
+                             secrets['kite_access_token'], store=OHLCStore())
 
-# Backtest date range
-start_date = datetime(2025, 5, 1).date()
-end_date = datetime(2025, 5, 15).date()
-day_delta = timedelta(days=1)
+    # Load every symbol once for the whole window and run the vectorised engine
+    provider = BacktestDataProvider(kite, list(params.stock_list), params.index_symbol,
+                                    start_date, end_date, lookback_days=WARMUP_DAYS).load()
+    stock_data, index_df = provider.snapshot(end_date)
 
-results = []
-current_date = start_date
+    if index_df.empty or len(stock_data) < 10:
+        print("[📭] Not enough data to run the backtest.")
+        return None
 
-while current_date <= end_date:
-    print(f"[📅] Backtesting {current_date}")
+    result = run_backtest(
+        stock_data, index_df, start=start_date, end=end_date,
+        max_holdings=params.extra.get('max_holdings', 10), top_n=params.top_n,
+    )
+    summary = result['summary']
+    print(f"[📈] Return {summary['total_return']:.2%}, max drawdown {summary['max_drawdown']:.2%}, "
+          f"{summary['trades']} trades, win rate {summary['win_rate']:.0%}, "
+          f"avg turnover {summary['avg_turnover']:.2%}")
 
-    try:
-        # Fetch OHLCV for each stock for last 60 days only
-        stock_data = {}
-        lookback_start = current_date - timedelta(days=75)  # buffer for holidays
-        skipped = 0
-        for symbol in symbols:
-            df = kite.fetch_historical_ohlc(symbol, lookback_start, current_date)
-            if not df.empty:
-                stock_data[symbol] = df
-            else:
-                skipped += 1
+    result['trades'].to_csv("output/backtest_trades.csv", index=False)
+    pd.DataFrame({'equity': result['equity'], 'turnover': result['turnover']}).to_csv(
+        "output/backtest_equity.csv")
+    print("[✅] Backtest complete. Results saved to output/backtest_trades.csv "
+          "and output/backtest_equity.csv")
+    return result
 
-        index_df = kite.fetch_historical_ohlc(index_symbol, lookback_start, current_date)
 
-        print(f"[INFO] {len(stock_data)} symbols with data, {skipped} skipped.")
+if __name__ == "__main__":
+    from tools.log import configure_from
 
-        if index_df.empty or len(stock_data) < 10:
-            print(f"[SKIP] Not enough data to evaluate on {current_date}.")
-            current_date += day_delta
-            continue
-
-        entries = run_daily_entry_engine(api_key, api_secret, access_token,
-                                         stock_data_dict=stock_data, index_df=index_df, top_n=50)
-
-        if not entries.empty:
-            entries['date'] = current_date
-            results.append(entries)
-
-    except Exception as e:
-        print(f"[ERROR] Failed on {current_date}: {e}")
-
-    current_date += day_delta
-
-# Save combined trades to CSV
-if results:
-    all_trades = pd.concat(results, ignore_index=True)
-    all_trades.to_csv("output/backtest_trades.csv", index=False)
-    print("[✅] Backtest complete. Results saved to output/backtest_trades.csv")
-else:
-    print("[📭] No trades generated in the backtest range.")
+    configure_from(get_config().params)
+    run()
@@ -0,0 +1,95 @@
+# rs_outperformance_kite_system/benchmarks/offline_pipeline.py
+
+"""Load-test the fetch pipeline and live streamer against the offline Kite.
+
+    python -m benchmarks.offline_pipeline --symbols 500 --latency 0.05 --error-rate 0.01
+
+The fetch phase downloads every symbol through :class:`ZerodhaKiteClient`
+(rate limiter, retries, worker threads) from :class:`OfflineKiteConnect`.
+The stream phase runs :class:`LivePriceStreamer` on an
+:class:`OfflineKiteTicker` with intraday bar aggregation attached.
+"""
+
+import argparse
+import json
+import time
+
+from data.live_fetch.bar_aggregator import IntradayBarAggregator
+from data.live_fetch.kite_websocket import LivePriceStreamer
+from data.live_fetch.offline_kite import OfflineKiteTicker, OfflineMarket, offline_client
+from tools.log import quiet, setup_logging
+
+
+def run_fetch(market, symbols, workers=4, client_rate=None, **kite_kwargs):
+    client = offline_client(market, rate_limit=client_rate, **kite_kwargs)
+    started = time.perf_counter()
+    with quiet('data.live_fetch.kite_client'):
+        data = client.fetch_multiple_ohlc(symbols, workers=workers)
+    seconds = time.perf_counter() - started
+    latencies = sorted(client.latencies)
+    return client, {
+        'symbols': len(symbols),
+        'fetched': len(data),
+        'seconds': round(seconds, 3),
+        'symbols_per_second': round(len(symbols) / seconds, 2) if seconds else None,
+        'api_calls': client.api_calls,
+        'p95_latency_ms': round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 2) if latencies else None,
+        'kite': client.kite.stats(),
+    }
+
+
+def run_stream(market, token_map, symbols, seconds=5.0, interval=0.05, speed=60.0):
+    ticker = OfflineKiteTicker(market, interval=interval, speed=speed)
+    bars = IntradayBarAggregator()
+    streamer = LivePriceStreamer(None, None, token_map, ticker=ticker)
+    streamer.add_tick_listener(bars.on_kite_tick)
+    streamer.start(symbols, lambda prices: None)
+    time.sleep(seconds)
+    with quiet('data.live_fetch.kite_websocket'):
+        streamer.stop()
+    return {
+        'seconds': seconds,
+        'ticks_sent': ticker.ticks_sent,
+        'ticks_per_second': round(ticker.ticks_sent / seconds, 1),
+        'bars_closed': bars.bars_closed,
+        'dispatcher': streamer.stats(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline fetch and streaming load test.")
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--periods", type=int, default=250)
+    parser.add_argument("--workers", type=int, default=4, help="fetch threads")
+    parser.add_argument("--historical-rate", type=float, default=3, help="server limit, requests/s")
+    parser.add_argument("--client-rate", type=float, default=None, help="client pacing, requests/s")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added per API call")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="chance a call fails with 503")
+    parser.add_argument("--stream-seconds", type=float, default=5.0)
+    parser.add_argument("--tick-interval", type=float, default=0.05)
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    market = OfflineMarket.synthetic(args.symbols, args.periods, start_time="2024-06-03 09:15")
+    symbols = [s for s in market.tokens if s not in market.index_symbols]
+    client, fetch = run_fetch(market, symbols, args.workers, args.client_rate,
+                              rate_limits={'historical': args.historical_rate},
+                              latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    print(f"[FETCH] {fetch['fetched']}/{fetch['symbols']} symbols in {fetch['seconds']}s "
+          f"({fetch['symbols_per_second']}/s), {fetch['kite']['rejected']} rate-limited, "
+          f"{fetch['kite']['errors']} failed")
+
+    stream = run_stream(market, client.instrument_cache, symbols, args.stream_seconds, args.tick_interval)
+    print(f"[STREAM] {stream['ticks_sent']} ticks ({stream['ticks_per_second']}/s), "
+          f"{stream['bars_closed']} bars closed, dispatcher {stream['dispatcher']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({'fetch': fetch, 'stream': stream}, f, indent=2)
+        print(f"[✅] Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+# rs_outperformance_kite_system/benchmarks/run_benchmarks.py
+
+"""Time the scanning hot paths on synthetic universes.
+
+Every benchmark runs on a universe from :func:`tools.synthetic.generate_universe`
+at each requested size and reports wall time (best of ``--repeat`` runs), peak
+traced memory (one extra run under :mod:`tracemalloc`) and cost per symbol.
+The feature store is cleared before every run, so cached indicators never
+hide the real work.
+
+    python -m benchmarks.run_benchmarks                        # 500/2000/5000 symbols
+    python -m benchmarks.run_benchmarks --sizes 500 --save-baseline
+    python -m benchmarks.run_benchmarks --sizes 500 --compare benchmarks/results/baseline.json
+
+``--compare`` prints the change against a stored result file and exits with
+status 1 if any benchmark slowed down by more than ``--tolerance``.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from core.breadth import evaluate_breadth
+from core.feature_store import feature_store
+from core.multi_timeframe_fusion import compute_fusion_score, resample_to_weekly
+from core.pattern_recognizer import get_rs_pattern
+from core.rs_calculator import compute_rs_alpha
+from core.screener import screen_stocks
+from core.sector_analysis import SectorIndexEngine
+from strategy import rs_entry_engine
+from strategy.rs_exit_engine import evaluate_exit
+from tools.log import setup_logging
+from tools.synthetic import REGIMES, generate_universe
+
+DEFAULT_SIZES = (500, 2000, 5000)
+RESULTS_DIR = os.path.join("benchmarks", "results")
+BASELINE_PATH = os.path.join(RESULTS_DIR, "baseline.json")
+# Changes smaller than this many seconds are timer noise, not regressions.
+MIN_REGRESSION_SECONDS = 0.05
+
+
+class StubKiteClient:
+    """Offline stand-in for ``ZerodhaKiteClient`` serving the synthetic data."""
+
+    def __init__(self, stock_data, index_df):
+        self.stock_data = stock_data
+        self.index_df = index_df
+
+    def fetch_multiple_ohlc(self, symbols, *args, **kwargs):
+        return {s: self.stock_data[s] for s in symbols if s in self.stock_data}
+
+    def fetch_ohlc(self, symbol, *args, **kwargs):
+        return self.stock_data.get(symbol, self.index_df)
+
+    def fetch_index_data(self, *args, **kwargs):
+        return self.index_df
+
+
+def _bench_rs_alpha(ctx):
+    for df in ctx['stock_data'].values():
+        compute_rs_alpha(df, ctx['index_df'])
+
+
+def _bench_rs_pattern(ctx):
+    for series in ctx['rs_series'].values():
+        get_rs_pattern(series)
+
+
+def _bench_breadth(ctx):
+    evaluate_breadth(ctx['stock_data'])
+
+
+def _bench_screen(ctx):
+    screen_stocks(ctx['stock_data'], ctx['index_df'])
+
+
+def _bench_sector_index(ctx):
+    engine = SectorIndexEngine(ctx['sector_map']).build(ctx['stock_data'])
+    engine.rank(ctx['index_df'])
+
+
+def _bench_fusion_score(ctx):
+    index_df, index_weekly = ctx['index_df'], ctx['index_weekly']
+    for symbol, df in ctx['stock_data'].items():
+        compute_fusion_score(df, ctx['weekly'][symbol], index_df, index_weekly, symbol=symbol)
+
+
+def _bench_entry_engine(ctx):
+    client = StubKiteClient(ctx['stock_data'], ctx['index_df'])
+    with mock.patch.object(rs_entry_engine, 'send_telegram_message', lambda message: None):
+        rs_entry_engine.run_daily_entry_engine(
+            None, None, None, stock_data_dict=ctx['stock_data'], index_df=ctx['index_df'],
+            use_sector_filter=False, client=client, workers=ctx['workers'],
+        )
+
+
+def _bench_exit(ctx):
+    for symbol, df in ctx['stock_data'].items():
+        evaluate_exit(df, ctx['index_df'], symbol)
+
+
+BENCHMARKS = {
+    'compute_rs_alpha': _bench_rs_alpha,
+    'get_rs_pattern': _bench_rs_pattern,
+    'evaluate_breadth': _bench_breadth,
+    'screen_stocks': _bench_screen,
+    'sector_index': _bench_sector_index,
+    'compute_fusion_score': _bench_fusion_score,
+    'run_daily_entry_engine': _bench_entry_engine,
+    'evaluate_exit': _bench_exit,
+}
+
+
+def build_context(symbols, periods, regime, seed, gap_rate=0.0, workers=1):
+    """Generate the universe and the inputs each benchmark needs, untimed."""
+    stock_data, index_df = generate_universe(symbols, periods, regime=regime, seed=seed,
+                                             gap_rate=gap_rate)
+    return {
+        'stock_data': stock_data,
+        'index_df': index_df,
+        'index_weekly': resample_to_weekly(index_df),
+        'weekly': {s: resample_to_weekly(df) for s, df in stock_data.items()},
+        'rs_series': {s: (df['close'] / index_df['close']).dropna() for s, df in stock_data.items()},
+        'sector_map': {s: f"SECTOR{i % 12}" for i, s in enumerate(stock_data)},
+        'workers': workers,
+    }
+
+
+def _run_once(func, ctx):
+    feature_store.clear()
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        func(ctx)
+        return time.perf_counter() - started
+
+
+def _peak_memory(func, ctx):
+    feature_store.clear()
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            func(ctx)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, periods=250, regime='bull', seed=0, gap_rate=0.0,
+                   repeat=1, names=None, memory=True, workers=1):
+    """Run the selected benchmarks at every size and return the result dict."""
+    names = list(names or BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {sorted(unknown)}")
+
+    results = []
+    for size in sizes:
+        ctx = build_context(size, periods, regime, seed, gap_rate, workers)
+        for name in names:
+            func = BENCHMARKS[name]
+            seconds = min(_run_once(func, ctx) for _ in range(max(repeat, 1)))
+            peak = _peak_memory(func, ctx) if memory else None
+            row = {
+                'benchmark': name,
+                'symbols': size,
+                'seconds': round(seconds, 6),
+                'per_symbol_ms': round(seconds * 1000 / size, 6),
+                'peak_mb': round(peak / 2**20, 3) if peak is not None else None,
+            }
+            results.append(row)
+            print(f"[⏱️] {name:<24} {size:>6} symbols  {seconds:9.3f}s  "
+                  f"{row['per_symbol_ms']:8.3f} ms/symbol  "
+                  + (f"{row['peak_mb']:9.1f} MB peak" if memory else ""))
+        feature_store.clear()
+
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'periods': periods,
+            'regime': regime,
+            'seed': seed,
+            'gap_rate': gap_rate,
+            'repeat': repeat,
+            'workers': workers,
+        },
+        'results': results,
+    }
+
+
+def compare_results(current, baseline, tolerance=0.2, min_seconds=MIN_REGRESSION_SECONDS):
+    """Return one row per benchmark/size present in both result dicts.
+
+    A row is a regression when it is more than ``tolerance`` (a fraction)
+    slower than the baseline and the slowdown exceeds ``min_seconds``.
+    """
+    before = {(r['benchmark'], r['symbols']): r for r in baseline['results']}
+    rows = []
+    for r in current['results']:
+        old = before.get((r['benchmark'], r['symbols']))
+        if old is None:
+            continue
+        change = r['seconds'] / old['seconds'] - 1 if old['seconds'] else 0.0
+        rows.append({
+            'benchmark': r['benchmark'],
+            'symbols': r['symbols'],
+            'baseline_seconds': old['seconds'],
+            'seconds': r['seconds'],
+            'change': change,
+            'regression': change > tolerance and r['seconds'] - old['seconds'] > min_seconds,
+        })
+    return rows
+
+
+def save_results(results, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"[✅] Benchmark results saved to {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scanning hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--periods", type=int, default=250, help="daily bars per symbol")
+    parser.add_argument("--regime", choices=sorted(REGIMES), default="bull")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--gap-rate", type=float, default=0.0, help="fraction of bars dropped per stock")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per benchmark (best is kept)")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--workers", type=int, default=1, help="processes for the entry engine's fusion scoring")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--log-level", default="WARNING", help="level for the scanner's own logging")
+    parser.add_argument("--output", default=None, help="JSON file for the results")
+    parser.add_argument("--save-baseline", action="store_true", help=f"also write {BASELINE_PATH}")
+    parser.add_argument("--compare", metavar="BASELINE", help="result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown, e.g. 0.2 = 20%%")
+    args = parser.parse_args(argv)
+    setup_logging(args.log_level)
+
+    results = run_benchmarks(args.sizes, args.periods, args.regime, args.seed, args.gap_rate,
+                             args.repeat, args.only, not args.no_memory, args.workers)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    save_results(results, output)
+    if args.save_baseline:
+        save_results(results, BASELINE_PATH)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare_results(results, baseline, args.tolerance)
+        for row in rows:
+            flag = "[❌] REGRESSION" if row['regression'] else "[OK]"
+            print(f"{flag} {row['benchmark']:<24} {row['symbols']:>6} symbols  "
+                  f"{row['baseline_seconds']:.3f}s -> {row['seconds']:.3f}s ({row['change']:+.1%})")
+        if any(row['regression'] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
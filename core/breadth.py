@@ -1,25 +1,89 @@
 # rs_outperformance_kite_system/core/breadth.py
 
+import numpy as np
 import pandas as pd
 
+from core.panel import Panel
+from tools.log import get_logger
+
+log = get_logger(__name__)
+
+
 def evaluate_breadth(stock_data_dict, ma_days=50, threshold=0.55):
     """
     Checks if market breadth is strong based on % stocks above MA.
     """
-    count_above = 0
-    total = 0
-
-    for df in stock_data_dict.values():
-        if len(df) >= ma_days:
-            ma = df['close'].rolling(ma_days).mean()
-            if df['close'].iloc[-1] > ma.iloc[-1]:
-                count_above += 1
-            total += 1
+    # Only each stock's last ``ma_days`` closes matter, so stack those tails
+    # and compare last close to MA for the whole universe at once.
+    tails = [
+        df['close'].to_numpy(dtype=float)[-ma_days:]
+        for df in stock_data_dict.values()
+        if len(df) >= ma_days
+    ]
+    total = len(tails)
 
     if total == 0:
-        print("[❌] Breadth check failed: No valid stocks.")
+        log.warning("[❌] Breadth check failed: No valid stocks.")
         return False
 
+    window = np.column_stack(tails)
+    with np.errstate(invalid='ignore'):
+        count_above = int((window[-1] > window.mean(axis=0)).sum())
+
     percent = count_above / total
-    print(f"[📊] Market breadth: {percent:.2%} stocks above {ma_days}-day MA")
+    log.info("[📊] Market breadth: %.2f%% stocks above %d-day MA", percent * 100, ma_days)
     return percent >= threshold
+
+
+def compute_breadth_metrics(data, ma_windows=(20, 50, 200), high_low_window=252,
+                            mcclellan_fast=19, mcclellan_slow=39):
+    """Return a daily time series of market breadth metrics.
+
+    Parameters
+    ----------
+    data : Panel, pd.DataFrame or dict[str, pd.DataFrame]
+        Universe closes. A DataFrame is read as ``dates × symbols`` closes.
+
+    Columns of the result:
+
+    * ``pct_above_{n}ma`` – share of stocks with a full ``n``-day MA that
+      close above it
+    * ``advances`` / ``declines`` / ``ad_line`` – daily advancers, decliners
+      and their cumulative difference
+    * ``new_highs`` / ``new_lows`` – stocks closing at a ``high_low_window``
+      high or low
+    * ``mcclellan`` – EMA(19) minus EMA(39) of net advances
+    """
+    if isinstance(data, dict):
+        data = Panel.from_frames(data)
+    close = data.field_frame('close') if isinstance(data, Panel) else data
+    values = close.to_numpy(dtype=float)
+
+    metrics = pd.DataFrame(index=close.index)
+    with np.errstate(invalid='ignore'):
+        for n in ma_windows:
+            ma = close.rolling(n).mean().to_numpy()
+            eligible = ~np.isnan(ma) & ~np.isnan(values)
+            above = (values > ma) & eligible
+            counts = eligible.sum(axis=1)
+            metrics[f'pct_above_{n}ma'] = np.where(counts > 0, above.sum(axis=1) / np.maximum(counts, 1), np.nan)
+
+        change = np.full(values.shape, np.nan)
+        change[1:] = values[1:] - values[:-1]
+        advances = (change > 0).sum(axis=1)
+        declines = (change < 0).sum(axis=1)
+        metrics['advances'] = advances
+        metrics['declines'] = declines
+        metrics['ad_line'] = np.cumsum(advances - declines)
+
+        high = close.rolling(high_low_window).max().to_numpy()
+        low = close.rolling(high_low_window).min().to_numpy()
+        metrics['new_highs'] = (values >= high).sum(axis=1)
+        metrics['new_lows'] = (values <= low).sum(axis=1)
+
+    net = pd.Series(advances - declines, index=close.index, dtype=float)
+    metrics['mcclellan'] = (
+        net.ewm(span=mcclellan_fast, adjust=False).mean()
+        - net.ewm(span=mcclellan_slow, adjust=False).mean()
+    )
+    return metrics
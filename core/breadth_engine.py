@@ -2,17 +2,32 @@
 
 """Utility to evaluate overall market breadth."""
 
-from core.breadth import evaluate_breadth
+from core.breadth import evaluate_breadth, compute_breadth_metrics
 
 
 class BreadthEngine:
     """High level interface wrapping :func:`evaluate_breadth`."""
 
-    def __init__(self, ma_days: int = 50, threshold: float = 0.55) -> None:
+    def __init__(self, ma_days: int = 50, threshold: float = 0.55,
+                 ma_windows=(20, 50, 200), high_low_window: int = 252) -> None:
         self.ma_days = ma_days
         self.threshold = threshold
+        self.ma_windows = tuple(sorted(set(ma_windows) | {ma_days}))
+        self.high_low_window = high_low_window
 
     def evaluate(self, stock_data_dict):
         """Return ``True`` if market breadth is strong."""
         return evaluate_breadth(stock_data_dict, self.ma_days, self.threshold)
 
+    def compute(self, data):
+        """Return every breadth metric as a daily time series.
+
+        ``data`` may be a ``dict`` of DataFrames, a :class:`~core.panel.Panel`
+        or a ``dates × symbols`` close DataFrame. See
+        :func:`compute_breadth_metrics` for the columns.
+        """
+        return compute_breadth_metrics(data, self.ma_windows, self.high_low_window)
+
+    def strong_days(self, metrics):
+        """Return a boolean series marking days whose breadth meets the threshold."""
+        return metrics[f'pct_above_{self.ma_days}ma'] >= self.threshold
@@ -0,0 +1,132 @@
+# rs_outperformance_kite_system/core/feature_store.py
+
+"""Memoising cache for derived indicator series.
+
+Entry, exit, charting and reporting all ask for the same AMA, Donchian and
+RS alpha series within one run. :class:`FeatureStore` computes each of them
+once per bar: results are keyed by ``(symbol, feature, params, bar stamp)``
+where the bar stamp fingerprints every bar the indicator reads (a hash of
+the index and the input columns), so a restated bar or a different window of
+the same length is never served another frame's values. Frames carrying a
+provisional live bar (see :func:`data.live_fetch.bar_buffer.apply_live_prices`)
+are computed but not cached. Entries are evicted least-recently-used once the
+memory cap is reached.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from core.rs_calculator import compute_ama, compute_donchian_channel, compute_rs_alpha
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _bar_stamp(df, columns=('close',)):
+    if df is None or df.empty or df.attrs.get('provisional'):
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    index = df.index
+    if isinstance(index, pd.DatetimeIndex):
+        digest.update(index.asi8.tobytes())
+    else:
+        digest.update(pd.util.hash_array(index.to_numpy()).tobytes())
+    for col in columns:
+        if col in df.columns:
+            digest.update(np.ascontiguousarray(df[col].to_numpy(dtype=float)).tobytes())
+    return len(df), digest.digest()
+
+
+def _nbytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    return int(getattr(value, 'nbytes', 64))
+
+
+class FeatureStore:
+    """LRU cache of indicator series with hit/miss statistics."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, symbol, feature, params, stamp, compute):
+        """Return the cached value for the key, computing it on a miss.
+
+        With ``symbol=None`` the value is computed and not cached.
+        """
+        if symbol is None or stamp is None:
+            return compute()
+        key = (symbol, feature, tuple(sorted(params.items())), stamp)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        value = compute()
+        size = _nbytes(value)
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = value
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= _nbytes(evicted)
+                    self.evictions += 1
+        return value
+
+    def ama(self, symbol, df, period=10):
+        return self.get(symbol, 'ama', {'period': period}, _bar_stamp(df),
+                        lambda: compute_ama(df, period))
+
+    def donchian(self, symbol, df, lookback=20):
+        return self.get(symbol, 'donchian', {'lookback': lookback},
+                        _bar_stamp(df, ('high', 'low', 'close')),
+                        lambda: compute_donchian_channel(df, lookback))
+
+    def rs_alpha(self, symbol, stock_df, index_df, period=21):
+        stamps = (_bar_stamp(stock_df), _bar_stamp(index_df))
+        stamp = None if None in stamps else stamps
+        return self.get(symbol, 'rs_alpha', {'period': period}, stamp,
+                        lambda: compute_rs_alpha(stock_df, index_df, period))
+
+    def add_indicators(self, symbol, df, ama_period=10, donchian_lookback=20):
+        """Cached equivalent of ``add_donchian_channel(add_ama(df))``."""
+        df['ama'] = self.ama(symbol, df, ama_period)
+        channel = self.donchian(symbol, df, donchian_lookback)
+        for col in channel.columns:
+            df[col] = channel[col]
+        return df
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'evictions': self.evictions,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+# Process-wide store shared by the engines, charting and reporting.
+feature_store = FeatureStore()
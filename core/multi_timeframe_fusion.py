@@ -1,16 +1,19 @@
 # core/multi_timeframe_fusion.py
 
+import numpy as np
 import pandas as pd
-from core.rs_calculator import compute_rs_alpha
-from core.rs_calculator import add_ama, add_donchian_channel
-from core.pattern_recognizer import get_rs_pattern
+from core.rs_calculator import compute_rs_alpha, compute_rs_alpha_matrix
+from core.feature_store import feature_store
+from core.pattern_recognizer import get_rs_pattern, classify_rs_patterns, compact_trailing
+from core.panel import Panel
+from tools.metrics import metrics
 
 
-def compute_fusion_score(daily_df, weekly_df, index_daily, index_weekly):
+def compute_fusion_score(daily_df, weekly_df, index_daily, index_weekly, symbol=None):
     score = 0
 
     # Step 1: RS Alpha (daily)
-    rs_daily = compute_rs_alpha(daily_df, index_daily).dropna()
+    rs_daily = feature_store.rs_alpha(symbol, daily_df, index_daily).dropna()
     if len(rs_daily) > 20:
         score += 1
 
@@ -26,8 +29,7 @@ def compute_fusion_score(daily_df, weekly_df, index_daily, index_weekly):
             score += 1
 
     # Step 4: Breakout & Trend Confirmation
-    daily_df = add_ama(daily_df)
-    daily_df = add_donchian_channel(daily_df)
+    daily_df = feature_store.add_indicators(symbol, daily_df)
 
     close = daily_df['close'].iloc[-1]
     ama = daily_df['ama'].iloc[-1]
@@ -41,6 +43,105 @@ def compute_fusion_score(daily_df, weekly_df, index_daily, index_weekly):
     return score  # Max score = 5
 
 
+def _merged_rs_alpha(close, bench, both, period):
+    """RS alpha per column over the rows where stock and index both trade.
+
+    Rows are compacted per column first, which reproduces the inner merge
+    done by :func:`compute_rs_alpha` even when a stock has gaps.
+    """
+    length = len(close)
+    stock = compact_trailing(close, length, mask=both)
+    index = compact_trailing(np.broadcast_to(bench[:, None], close.shape), length, mask=both)
+    return compute_rs_alpha_matrix(stock, index, period)
+
+
+def compute_fusion_scores(stock_data, index_df, index_weekly=None, rs_period=21,
+                          ama_period=10, donchian_lookback=20, volume_window=20):
+    """Score every symbol at once; batch form of :func:`compute_fusion_score`.
+
+    ``stock_data`` is a ``dict`` of daily DataFrames or a
+    :class:`~core.panel.Panel`. The universe is resampled to weekly bars in
+    one grouped operation and every step is evaluated as array operations.
+
+    Returns a DataFrame indexed by symbol with the score and the components
+    the entry engine needs: ``Fusion Score``, ``RS Alpha`` (latest daily),
+    ``RS Points``, ``Weekly RS Points``, ``RS Pattern``, ``Close``, ``AMA``,
+    ``Donchian High``, ``Donchian Breakout`` and ``Volume Confirm``.
+    """
+    panel = stock_data if isinstance(stock_data, Panel) else Panel.from_frames(stock_data)
+    if index_df is None or index_df.empty or not panel.symbols:
+        return pd.DataFrame()
+    length = len(panel)
+    own = panel.mask
+    bars = own.sum(axis=0)
+
+    # Step 1: RS Alpha (daily) on the dates shared with the index
+    index_close = panel.align(index_df)
+    both = own & ~np.isnan(index_close)[:, None]
+    rs_daily = _merged_rs_alpha(panel.close, index_close, both, rs_period)
+    rs_points = (~np.isnan(rs_daily)).sum(axis=0)
+    latest_rs = rs_daily[-1] if length else np.full(len(panel.symbols), np.nan)
+
+    # Step 2: RS Alpha (weekly) from one grouped resample of the universe
+    with metrics.span("fusion.weekly_resample", symbols=len(panel.symbols)):
+        weekly_close = panel.field_frame('close').resample('W').last()
+    if index_weekly is None:
+        index_weekly = index_df[['close']].resample('W').last().dropna()
+    weekly_index = weekly_close.index
+    index_w = index_weekly['close']
+    if index_w.index.tz is not None and weekly_index.tz is not None:
+        index_w = index_w.tz_convert(weekly_index.tz)
+    index_w = index_w.reindex(weekly_index).to_numpy(dtype=float)
+    weekly_values = weekly_close.to_numpy()
+    both_w = ~np.isnan(weekly_values) & ~np.isnan(index_w)[:, None]
+    rs_weekly = _merged_rs_alpha(weekly_values, index_w, both_w, rs_period)
+    weekly_points = (~np.isnan(rs_weekly)).sum(axis=0)
+
+    # Step 3: Pattern Match (daily)
+    with metrics.span("fusion.pattern", symbols=len(panel.symbols)):
+        patterns = classify_rs_patterns(rs_daily)
+
+    # Step 4: Breakout & Trend Confirmation on each stock's own bars
+    own_frame = lambda values: pd.DataFrame(compact_trailing(values, length, mask=own))
+    close_own = own_frame(panel.close)
+    high_own = own_frame(panel.high)
+    volume_own = own_frame(panel.volume)
+
+    ama = close_own.ewm(span=ama_period, adjust=False).mean().to_numpy()
+    high_roll = high_own.rolling(window=donchian_lookback).max().to_numpy()
+    avg_volume = volume_own.rolling(window=volume_window).mean().to_numpy()
+
+    close = close_own.to_numpy()[-1]
+    ama_last = np.where(bars >= ama_period, ama[-1], np.nan)
+    long_enough = bars >= donchian_lookback
+    with np.errstate(invalid='ignore'):
+        prior_high = high_roll[-2] if length > 1 else np.full(len(bars), np.nan)
+        breakout = (long_enough & (close > prior_high)).astype(int)
+        above_ama = close > ama_last
+        volume_confirm = volume_own.to_numpy()[-1] > avg_volume[-1]
+
+    score = (
+        (rs_points > 20).astype(int)
+        + (weekly_points > 20)
+        + ((rs_points > 0) & np.isin(patterns, ["Flying", "Star", "Lion"]))
+        + above_ama
+        + (breakout == 1)
+    )
+
+    return pd.DataFrame({
+        'Fusion Score': score,
+        'RS Alpha': latest_rs,
+        'RS Points': rs_points,
+        'Weekly RS Points': weekly_points,
+        'RS Pattern': patterns,
+        'Close': close,
+        'AMA': ama_last,
+        'Donchian High': np.where(long_enough, high_roll[-1], np.nan),
+        'Donchian Breakout': breakout,
+        'Volume Confirm': volume_confirm,
+    }, index=pd.Index(panel.symbols, name='symbol'))
+
+
 def resample_to_weekly(df):
     return df.resample('W').agg({
         'open': 'first',
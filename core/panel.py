@@ -0,0 +1,120 @@
+# rs_outperformance_kite_system/core/panel.py
+
+"""Aligned date × symbol OHLCV arrays."""
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def _to_tz(index, tz):
+    """Return ``index`` in ``tz``; naive stamps are read as wall time there."""
+    if index.tz is None:
+        return index if tz is None else index.tz_localize(tz)
+    if tz is None:
+        return index.tz_localize(None)
+    return index if str(index.tz) == str(tz) else index.tz_convert(tz)
+
+
+class Panel:
+    """OHLCV data for a universe held as ``(dates × symbols)`` float arrays.
+
+    All fields share one trading calendar and one column order, so
+    whole-universe calculations are plain array operations. Missing bars are
+    ``NaN`` and ``mask`` marks where a symbol has a close. Use
+    :meth:`from_frames` / :meth:`to_frames` to move between the panel and the
+    ``dict[str, pd.DataFrame]`` used elsewhere in the code base.
+    """
+
+    def __init__(self, dates, symbols, open, high, low, close, volume):
+        self.dates = pd.DatetimeIndex(dates)
+        self.symbols = list(symbols)
+        self.columns = {sym: i for i, sym in enumerate(self.symbols)}
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.mask = ~np.isnan(close)
+
+    @classmethod
+    def from_frames(cls, stock_data_dict, calendar=None):
+        """Build a panel from ``{symbol: DataFrame}``.
+
+        ``calendar`` may be a ``DatetimeIndex`` or a DataFrame (typically the
+        benchmark index) whose dates define the rows; bars on other dates are
+        dropped. Without it the union of all dates is used. Frames whose
+        index is tz-naive while the calendar is tz-aware (or the reverse) are
+        matched on their wall-clock dates, in the calendar's timezone (the
+        first tz-aware frame's when there is no calendar).
+        """
+        frames = {s: df for s, df in stock_data_dict.items() if df is not None and not df.empty}
+        indexes = [pd.DatetimeIndex(df.index) for df in frames.values()]
+        if calendar is None:
+            tz = next((index.tz for index in indexes if index.tz is not None), None)
+            indexes = [_to_tz(index, tz) for index in indexes]
+            # One concatenation instead of a union per frame.
+            calendar = indexes[0].append(indexes[1:]) if indexes else pd.DatetimeIndex([], tz=tz)
+        elif isinstance(calendar, pd.DataFrame):
+            calendar = calendar.index
+        calendar = pd.DatetimeIndex(calendar).drop_duplicates().sort_values()
+
+        symbols = list(frames)
+        shape = (len(calendar), len(symbols))
+        arrays = {field: np.full(shape, np.nan) for field in FIELDS}
+        for j, (df, index) in enumerate(zip(frames.values(), indexes)):
+            pos = calendar.get_indexer(_to_tz(index, calendar.tz))
+            found = pos >= 0
+            rows = pos[found]
+            for field in FIELDS:
+                if field in df.columns:
+                    arrays[field][rows, j] = df[field].to_numpy(dtype=float)[found]
+        return cls(calendar, symbols, **arrays)
+
+    def to_frames(self, fields=FIELDS):
+        """Return ``{symbol: DataFrame}`` holding each symbol's available bars."""
+        return {sym: self.frame(sym, fields) for sym in self.symbols}
+
+    def frame(self, symbol, fields=FIELDS):
+        j = self.columns[symbol]
+        rows = self.mask[:, j]
+        return pd.DataFrame(
+            {field: getattr(self, field)[rows, j] for field in fields},
+            index=self.dates[rows],
+        )
+
+    def field_frame(self, field="close"):
+        """Return one field as a ``dates × symbols`` DataFrame."""
+        return pd.DataFrame(getattr(self, field), index=self.dates, columns=self.symbols, copy=False)
+
+    def align(self, series):
+        """Return ``series`` (or a DataFrame's ``close``) reindexed to the panel dates."""
+        if isinstance(series, pd.DataFrame):
+            series = series['close']
+        series = series.set_axis(_to_tz(pd.DatetimeIndex(series.index), self.dates.tz))
+        series = series[~series.index.duplicated(keep='last')]
+        return series.reindex(self.dates).to_numpy(dtype=float)
+
+    def select(self, symbols):
+        """Return a panel restricted to ``symbols`` (in the given order)."""
+        cols = [self.columns[s] for s in symbols]
+        return Panel(self.dates, symbols, *(getattr(self, f)[:, cols] for f in FIELDS))
+
+    def upto(self, end):
+        """Return a zero-copy panel of the rows dated on or before ``end``."""
+        end = pd.Timestamp(end)
+        if (self.dates.tz is None) != (end.tz is None):
+            end = end.tz_localize(self.dates.tz) if end.tz is None else end.tz_localize(None)
+        stop = self.dates.searchsorted(end, side='right')
+        return Panel(self.dates[:stop], self.symbols, *(getattr(self, f)[:stop] for f in FIELDS))
+
+    @property
+    def shape(self):
+        return self.close.shape
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __contains__(self, symbol):
+        return symbol in self.columns
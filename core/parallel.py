@@ -0,0 +1,177 @@
+# rs_outperformance_kite_system/core/parallel.py
+
+"""Run per-symbol panel computations across a process pool.
+
+The panel's OHLCV arrays are copied once into a
+:mod:`multiprocessing.shared_memory` block. Workers attach to it by name,
+so only the symbol range of each chunk is sent to them, not the data.
+Every computation used here is independent per symbol (column), so
+splitting the universe into column chunks and concatenating the chunk
+results in order gives the same output as the serial call.
+
+Pools are started with the ``forkserver`` method (``spawn`` where it is not
+available) rather than ``fork``: by the time a pool is created the logging
+listener and the Telegram sender threads are running, and forking a
+process with live threads can copy a lock in its held state.
+"""
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from core.panel import FIELDS, Panel
+from tools.log import attach_worker, worker_config
+
+# Below this many symbols the pool start-up costs more than it saves.
+MIN_PARALLEL_SYMBOLS = 200
+
+# Imported once by the fork server so each worker starts with them loaded.
+_PRELOAD = ['numpy', 'pandas', 'core.panel', 'core.parallel']
+
+
+def resolve_workers(workers):
+    """Map ``workers`` (``None``/``0``/``-1``/int) to a process count."""
+    if workers is None or workers == 1:
+        return 1
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def pool_context():
+    """Return the multiprocessing context the process pools are started with."""
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(_PRELOAD)
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def _init_pool_worker(log_config, initializer, initargs):
+    attach_worker(*log_config)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def process_pool(workers, initializer=None, initargs=()):
+    """Return a :class:`ProcessPoolExecutor` on :func:`pool_context`.
+
+    Workers log through this process's listener (see
+    :func:`tools.log.worker_config`) before running ``initializer``.
+    """
+    context = pool_context()
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_pool_worker,
+                               initargs=(worker_config(context), initializer, initargs))
+
+
+class SharedPanel:
+    """A :class:`Panel` whose arrays live in one shared-memory block.
+
+    Use as a context manager in the parent process; the block is unlinked on
+    exit. :meth:`spec` is the small picklable description workers receive.
+    """
+
+    def __init__(self, panel):
+        self.symbols = panel.symbols
+        self.dates = panel.dates
+        shape = (len(FIELDS),) + panel.shape
+        self.shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+        block = np.ndarray(shape, dtype=float, buffer=self.shm.buf)
+        for k, field in enumerate(FIELDS):
+            block[k] = getattr(panel, field)
+        self._spec = (self.shm.name, shape, self.dates.asi8, str(self.dates.tz) if self.dates.tz else None)
+
+    def spec(self, lo, hi):
+        return self._spec + (self.symbols[lo:hi], lo, hi)
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 always registers with the tracker
+        # Pool workers report to the parent's resource tracker, which keeps
+        # one entry per name: registering the block again is a no-op and the
+        # parent's unlink still removes it. (Unregistering here would drop
+        # the parent's entry instead.)
+        return shared_memory.SharedMemory(name=name)
+
+
+def _detach(result):
+    # Results must not keep views on the block once it is closed.
+    if isinstance(result, dict):
+        return {k: _detach(v) for k, v in result.items()}
+    if isinstance(result, (np.ndarray, pd.DataFrame, pd.Series)):
+        return result.copy()
+    return result
+
+
+def attach_panel(spec):
+    """Return ``(shm, panel)`` for a :meth:`SharedPanel.spec` in a worker.
+
+    The panel's arrays are views on ``shm``; drop every reference to them
+    before calling ``shm.close()``.
+    """
+    name, shape, dates, tz, symbols, lo, hi = spec
+    shm = _attach(name)
+    block = np.ndarray(shape, dtype=float, buffer=shm.buf)
+    index = pd.DatetimeIndex(dates)
+    if tz is not None:
+        index = index.tz_localize('UTC').tz_convert(tz)
+    return shm, Panel(index, symbols, *(block[k, :, lo:hi] for k in range(len(FIELDS))))
+
+
+def _run_chunk(spec, func, kwargs):
+    shm, panel = attach_panel(spec)
+    try:
+        return _detach(func(panel, **kwargs))
+    finally:
+        del panel
+        shm.close()
+
+
+def _combine(parts):
+    first = parts[0]
+    if isinstance(first, (pd.DataFrame, pd.Series)):
+        return pd.concat(parts)
+    if isinstance(first, np.ndarray):
+        return np.concatenate(parts, axis=-1)
+    if isinstance(first, dict):
+        return {k: _combine([p[k] for p in parts]) for k in first}
+    raise TypeError(f"Cannot combine chunk results of type {type(first).__name__}")
+
+
+def map_panel(func, panel, workers=None, chunks_per_worker=2, **kwargs):
+    """Evaluate ``func(panel, **kwargs)`` over symbol chunks in parallel.
+
+    ``func`` must be a module-level function that treats symbols
+    independently and returns a DataFrame/Series indexed by symbol, an array
+    with symbols on the last axis, or a dict of those. Chunk results are
+    concatenated in symbol order, so the output equals ``func(panel,
+    **kwargs)``. Small universes and ``workers=1`` run serially.
+    """
+    workers = resolve_workers(workers)
+    n = len(panel.symbols)
+    if workers == 1 or n < MIN_PARALLEL_SYMBOLS:
+        return func(panel, **kwargs)
+
+    size = math.ceil(n / (workers * chunks_per_worker))
+    bounds = [(lo, min(lo + size, n)) for lo in range(0, n, size)]
+    with SharedPanel(panel) as shared, process_pool(workers) as pool:
+        futures = [pool.submit(_run_chunk, shared.spec(lo, hi), func, kwargs) for lo, hi in bounds]
+        parts = [f.result() for f in futures]
+    return _combine(parts)
@@ -1,11 +1,13 @@
 # rs_outperformance_kite_system/core/pattern_recognizer.py
 
+import math
+
 import numpy as np
 import pandas as pd
 
 def detect_flying_pattern(rs_series, window=10):
     """Higher highs and higher lows in RS = Flying"""
-    df = pd.DataFrame(rs_series, columns=['rs'])
+    df = pd.DataFrame({'rs': rs_series})
     df['hh'] = df['rs'] > df['rs'].shift(1)
     df['hl'] = df['rs'].rolling(window).min().shift(1) < df['rs']
     if df['hh'].iloc[-window:].sum() >= (window * 0.7) and df['hl'].iloc[-1]:
@@ -53,3 +55,203 @@ def get_rs_pattern(rs_series):
         return "Cat"
     else:
         return "Unclassified"
+
+
+# Trailing bars needed to evaluate every detector with its default windows.
+PATTERN_LOOKBACK = 20
+PATTERN_LABELS = np.array(["Flying", "Lion", "Star", "Drowning", "Cat", "Unclassified"], dtype=object)
+
+
+def compact_trailing(rs_matrix, lookback=PATTERN_LOOKBACK, mask=None):
+    """Right-align the last ``lookback`` non-NaN values of each column.
+
+    The result matches calling ``series.dropna()`` per symbol: missing values
+    are squeezed out and shorter histories are padded with leading ``NaN``.
+    An explicit boolean ``mask`` selects the rows to keep instead, so several
+    fields can be compacted with the same row selection.
+    """
+    values = np.asarray(rs_matrix, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    out = np.full((lookback, values.shape[1]), np.nan)
+    if len(values) == 0:
+        return out
+
+    valid = ~np.isnan(values) if mask is None else np.broadcast_to(mask, values.shape)
+    # A stable sort lifts each column's valid values to the top, in order.
+    order = np.argsort(~valid, axis=0, kind='stable')
+    counts = valid.sum(axis=0)
+    src = counts[None, :] - lookback + np.arange(lookback)[:, None]
+    keep = src >= 0
+    rows = np.take_along_axis(order, np.clip(src, 0, None), axis=0)
+    out[keep] = np.take_along_axis(values, rows, axis=0)[keep]
+    return out
+
+
+def _nanmean(values, axis=0):
+    count = (~np.isnan(values)).sum(axis=axis)
+    total = np.nansum(values, axis=axis)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 0, total / count, np.nan)
+
+
+# The Star test compares a mean and a standard deviation with fixed bounds,
+# and a flat RS window puts them within float noise of those bounds. The
+# helpers below add values in the same order as pandas' Series.mean/std
+# (numpy's pairwise sum over NaN-as-zero data), so the label matches
+# get_rs_pattern to the last bit rather than just approximately.
+
+def _series_sum(values):
+    # A contiguous row is summed exactly like a 1-D Series.
+    return np.ascontiguousarray(values.T).sum(axis=1)
+
+
+def _series_mean(values):
+    missing = np.isnan(values)
+    count = (~missing).sum(axis=0)
+    total = _series_sum(np.where(missing, 0.0, values))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 0, total / count, np.nan)
+
+
+def _series_std(values):
+    missing = np.isnan(values)
+    count = (~missing).sum(axis=0)
+    filled = np.where(missing, 0.0, values)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = _series_sum(filled) / count
+        sq = np.where(missing, 0.0, (mean - filled) ** 2)
+        return np.where(count > 1, np.sqrt(_series_sum(sq) / (count - 1)), np.nan)
+
+
+def _pairwise_sum(values):
+    """``sum(values)`` in numpy's pairwise order (see :func:`_series_sum`)."""
+    n = len(values)
+    if n < 8:
+        total = 0.0
+        for v in values:
+            total += v
+        return total
+    if n <= 128:
+        r = list(values[:8])
+        i = 8
+        while i < n - n % 8:
+            for k in range(8):
+                r[k] += values[i + k]
+            i += 8
+        total = ((r[0] + r[1]) + (r[2] + r[3])) + ((r[4] + r[5]) + (r[6] + r[7]))
+        for v in values[i:]:
+            total += v
+        return total
+    half = n // 2
+    half -= half % 8
+    return _pairwise_sum(values[:half]) + _pairwise_sum(values[half:])
+
+
+def classify_rs_patterns(rs_matrix, window=10, spike_threshold=0.05, base_window=20, cat_threshold=0.01):
+    """Label the latest bar of every column of an RS matrix.
+
+    Vectorised equivalent of :func:`get_rs_pattern` for a ``(dates × symbols)``
+    array or DataFrame, keeping its precedence Flying → Lion → Star →
+    Drowning → Cat. Leading ``NaN`` in a column is treated as missing history
+    (as if the scalar function were given a shorter series); pass the matrix
+    through :func:`compact_trailing` to get ``series.dropna()`` semantics.
+    Columns without data are ``"Unclassified"``.
+
+    Returns a Series indexed by column for DataFrame input, otherwise an
+    object array of labels.
+    """
+    columns = rs_matrix.columns if isinstance(rs_matrix, pd.DataFrame) else None
+    values = np.asarray(rs_matrix, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    n = values.shape[1]
+
+    # Work on the trailing window only; rows before a column's first value
+    # (or padding above the data) are "absent" rather than NaN values.
+    lookback = max(base_window, window + 1, 10)
+    valid = ~np.isnan(values)
+    has_data = valid.any(axis=0)
+    first_valid = np.where(has_data, valid.argmax(axis=0), len(values))
+    offset = len(values) - lookback
+    x = np.full((lookback, n), np.nan)
+    tail = values[max(offset, 0):]
+    x[lookback - len(tail):] = tail
+    absent = np.arange(lookback)[:, None] < (first_valid - offset)[None, :]
+
+    with np.errstate(invalid='ignore'):
+        last = x[-1]
+        diff = x[1:] - x[:-1]
+
+        # Flying: at least 70% higher highs and above the prior window's low
+        hh = x[-window:] > x[-window - 1:-1]
+        prior_min = x[-window - 1:-1].min(axis=0)
+        flying = (hh.sum(axis=0) >= window * 0.7) & (prior_min < last)
+
+        # Lion: latest jump above the threshold and twice the recent 5-bar average
+        avg = np.stack([diff[k - 4:k + 1].mean(axis=0) for k in range(len(diff) - 5, len(diff) - 1)])
+        lion = (diff[-1] > spike_threshold) & (diff[-1] > _nanmean(avg) * 2)
+
+        # Star: tight base followed by a rising last ten bars
+        base_std = _series_std(x[lookback - base_window:lookback - 10])
+        # ``series.iloc[-10:].diff()`` starts with NaN
+        recent_trend = _series_mean(np.vstack([np.full((1, n), np.nan), diff[-9:]]))
+        star = (base_std < 0.01) & (recent_trend > 0)
+
+        # Drowning: last five present values non-increasing, with no NaN
+        present = ~absent[-5:]
+        gaps = (present & np.isnan(x[-5:])).any(axis=0)
+        steps = ~present[:-1] | (x[-4:] <= x[-5:-1])
+        drowning = ~gaps & steps.all(axis=0)
+
+        # Cat: last ten values within a narrow range
+        recent = x[-10:]
+        recent_has = (~np.isnan(recent)).any(axis=0)
+        rs_range = np.where(np.isnan(recent), -np.inf, recent).max(axis=0) - \
+            np.where(np.isnan(recent), np.inf, recent).min(axis=0)
+        cat = recent_has & (rs_range < cat_threshold)
+
+    choice = np.select([flying, lion, star, drowning, cat], np.arange(5), default=5)
+    labels = PATTERN_LABELS[np.where(has_data, choice, 5)]
+    if columns is not None:
+        return pd.Series(labels, index=columns)
+    return labels
+
+
+def classify_rs_window(values, window=10, spike_threshold=0.05, base_window=20, cat_threshold=0.01):
+    """Label one RS window in plain Python.
+
+    Same result as ``classify_rs_patterns(values)[0]`` for a window of at
+    least :data:`PATTERN_LOOKBACK` values without ``NaN``, but without the
+    per-call overhead of numpy on tiny arrays, for tick-by-tick use.
+    Other input is passed to :func:`classify_rs_patterns`.
+    """
+    x = [float(v) for v in values[-PATTERN_LOOKBACK:]]
+    if len(x) < PATTERN_LOOKBACK or any(v != v for v in x):
+        return classify_rs_patterns(np.asarray(values, dtype=float))[0]
+
+    last = x[-1]
+    diff = [b - a for a, b in zip(x[:-1], x[1:])]
+
+    higher = sum(1 for a, b in zip(x[-window - 1:-1], x[-window:]) if b > a)
+    if higher >= window * 0.7 and min(x[-window - 1:-1]) < last:
+        return "Flying"
+
+    avgs = [sum(diff[k - 4:k + 1]) / 5 for k in range(len(diff) - 5, len(diff) - 1)]
+    if diff[-1] > spike_threshold and diff[-1] > sum(avgs) / len(avgs) * 2:
+        return "Lion"
+
+    base = x[len(x) - base_window:len(x) - 10]
+    mean = _pairwise_sum(base) / len(base)
+    base_std = math.sqrt(_pairwise_sum([(mean - v) ** 2 for v in base]) / (len(base) - 1))
+    if base_std < 0.01 and _pairwise_sum([0.0] + diff[-9:]) / 9 > 0:
+        return "Star"
+
+    tail = x[-5:]
+    if all(b <= a for a, b in zip(tail[:-1], tail[1:])):
+        return "Drowning"
+
+    recent = x[-10:]
+    if max(recent) - min(recent) < cat_threshold:
+        return "Cat"
+    return "Unclassified"
@@ -1,5 +1,6 @@
 # rs_outperformance_kite_system/core/rs_calculator.py
 
+import numpy as np
 import pandas as pd
 
 def compute_returns(df, period):
@@ -8,6 +9,48 @@ def compute_returns(df, period):
     return (df['close'] / df['close'].shift(period)) - 1
 
 
+def compute_rs_alpha_matrix(close, index_close, period=21):
+    """Vectorised RS alpha for a whole universe.
+
+    Parameters
+    ----------
+    close : np.ndarray or pd.DataFrame
+        ``(dates × symbols)`` closing prices, e.g. ``Panel.close``.
+    index_close : np.ndarray or pd.Series
+        Benchmark closes aligned to the same dates, or a matrix of the same
+        shape as ``close`` when each column has its own row alignment.
+    period : int or sequence of int
+        Return lookback. When a sequence is given a dict ``{period: result}``
+        is returned.
+
+    Returns ``stock_ret - index_ret`` with the first ``period`` rows ``NaN``,
+    as an array or, for DataFrame input, a DataFrame with the same labels.
+    """
+    if not isinstance(period, int):
+        return {p: compute_rs_alpha_matrix(close, index_close, p) for p in period}
+
+    frame = close if isinstance(close, pd.DataFrame) else None
+    values = np.asarray(close, dtype=float)
+    bench = np.asarray(index_close, dtype=float)
+    squeeze = values.ndim == 1
+    if squeeze:
+        values = values[:, None]
+    if bench.ndim == 1 or squeeze:
+        bench = bench.reshape(-1, 1)
+
+    alpha = np.full(values.shape, np.nan)
+    if len(values) > period:
+        stock_ret = (values[period:] / values[:-period]) - 1
+        index_ret = (bench[period:] / bench[:-period]) - 1
+        alpha[period:] = stock_ret - index_ret
+
+    if squeeze:
+        alpha = alpha[:, 0]
+    if frame is not None:
+        return pd.DataFrame(alpha, index=frame.index, columns=frame.columns)
+    return alpha
+
+
 def compute_rs_alpha(stock_df, index_df, period=21):
     if stock_df.empty or index_df.empty:
         return pd.Series(dtype=float)
@@ -26,11 +69,10 @@ def compute_rs_alpha(stock_df, index_df, period=21):
         return pd.Series(dtype=float)
 
     # Step 2: Compute returns
-    stock_ret = (combined['close_stock'] / combined['close_stock'].shift(period)) - 1
-    index_ret = (combined['close_index'] / combined['close_index'].shift(period)) - 1
-
-    rs_alpha = stock_ret - index_ret
-    return rs_alpha
+    rs_alpha = compute_rs_alpha_matrix(
+        combined['close_stock'].to_numpy(), combined['close_index'].to_numpy(), period
+    )
+    return pd.Series(rs_alpha, index=combined.index)
 
 def compute_rs_rank(rs_alpha_dict):
     df = pd.DataFrame.from_dict(rs_alpha_dict, orient='index', columns=['RS Alpha'])
@@ -38,26 +80,40 @@ def compute_rs_rank(rs_alpha_dict):
     return df
 
 
-def add_ama(df, period=10):
+def compute_ama(df, period=10):
+    """Return the AMA (EMA of close) series without modifying ``df``."""
     if 'close' not in df.columns or len(df) < period:
-        df['ama'] = None
-        return df
-    df['ama'] = df['close'].ewm(span=period, adjust=False).mean()
+        return pd.Series(None, index=df.index, dtype=object)
+    return df['close'].ewm(span=period, adjust=False).mean()
+
+
+def add_ama(df, period=10):
+    df['ama'] = compute_ama(df, period)
     return df
 
 
-def add_donchian_channel(df, lookback=20):
+def compute_donchian_channel(df, lookback=20):
+    """Return ``donchian_high``/``donchian_low``/``donchian_breakout`` columns."""
     if len(df) < lookback:
-        df['donchian_breakout'] = 0
-        df['donchian_high'] = None
-        df['donchian_low'] = None
-        return df
+        return pd.DataFrame({
+            'donchian_breakout': 0,
+            'donchian_high': None,
+            'donchian_low': None,
+        }, index=df.index)
 
     high_roll = df['high'].rolling(window=lookback).max()
     low_roll = df['low'].rolling(window=lookback).min()
     breakout = df['close'] > high_roll.shift(1)
 
-    df['donchian_high'] = high_roll
-    df['donchian_low'] = low_roll
-    df['donchian_breakout'] = breakout.astype(int)
-    return df
\ No newline at end of file
+    return pd.DataFrame({
+        'donchian_high': high_roll,
+        'donchian_low': low_roll,
+        'donchian_breakout': breakout.astype(int),
+    }, index=df.index)
+
+
+def add_donchian_channel(df, lookback=20):
+    channel = compute_donchian_channel(df, lookback)
+    for col in channel.columns:
+        df[col] = channel[col]
+    return df
@@ -1,25 +1,45 @@
 # rs_outperformance_kite_system/core/screener.py
 
-from core.rs_calculator import compute_rs_alpha, compute_rs_rank, add_ama, add_donchian_channel
-from core.pattern_recognizer import get_rs_pattern
+import logging
+
+from core.rs_calculator import compute_rs_alpha_matrix, compute_rs_rank
+from core.feature_store import feature_store
+from core.pattern_recognizer import classify_rs_patterns, compact_trailing
+from core.panel import Panel
+from tools.log import get_logger
+from tools.metrics import metrics
+import numpy as np
 import pandas as pd
 
+log = get_logger(__name__)
+
+
 def screen_stocks(stock_data_dict, index_df, top_n=50):
+    """Screen the universe for RS leaders."""
     rs_alpha_latest = {}
 
-    # Step 1: Compute RS Alpha for all stocks
-    for symbol, stock_df in stock_data_dict.items():
-        rs_alpha = compute_rs_alpha(stock_df, index_df)
-
-        if rs_alpha is not None:
-            rs_alpha = rs_alpha.dropna()
-            if not rs_alpha.empty and len(rs_alpha) >= 21:
-                rs_alpha_latest[symbol] = rs_alpha.iloc[-1]
-                print(f"[RS] {symbol}: {len(rs_alpha)} RS points, latest = {rs_alpha.iloc[-1]:.4f}")
-            else:
-                print(f"[SKIP] No RS Alpha for {symbol} (only {len(rs_alpha)} rows)")
-        else:
-            print(f"[SKIP] RS Alpha failed for {symbol}")
+    # Step 1: Compute RS Alpha for all stocks in one pass over the universe
+    with metrics.span("screen.rs_alpha", symbols=len(stock_data_dict)):
+        panel = Panel.from_frames(stock_data_dict, calendar=index_df)
+        rs_alpha = compute_rs_alpha_matrix(panel.close, panel.align(index_df))
+    valid = ~np.isnan(rs_alpha)
+    counts = valid.sum(axis=0)
+    last_rows = len(rs_alpha) - 1 - valid[::-1].argmax(axis=0)
+
+    # Per-symbol lines only at DEBUG; the guard skips the loop's logging
+    # calls entirely otherwise.
+    verbose = log.isEnabledFor(logging.DEBUG)
+    for symbol in stock_data_dict:
+        j = panel.columns.get(symbol)
+        count = counts[j] if j is not None else 0
+        if count >= 21:
+            rs_alpha_latest[symbol] = rs_alpha[last_rows[j], j]
+            if verbose:
+                log.debug("[RS] %s: %d RS points, latest = %.4f", symbol, count, rs_alpha_latest[symbol])
+        elif verbose:
+            log.debug("[SKIP] No RS Alpha for %s (only %d rows)", symbol, count)
+    log.info("[RS] RS Alpha for %d of %d symbols (%d with < 21 RS points)",
+             len(rs_alpha_latest), len(stock_data_dict), len(stock_data_dict) - len(rs_alpha_latest))
 
     # Step 2: Rank top RS Alpha stocks
     rs_df = compute_rs_rank(rs_alpha_latest)
@@ -27,45 +47,53 @@ def screen_stocks(stock_data_dict, index_df, top_n=50):
 
     final_list = []
 
-    # Step 3: Apply pattern, indicator, and price filters
-    for symbol in top_symbols:
-        stock_df = stock_data_dict[symbol].copy()
-
-        if len(stock_df) < 35:
-            print(f"[SKIP] {symbol} has only {len(stock_df)} rows (<35)")
-            continue
-
-        # Align stock and index for RS pattern analysis
-        aligned = pd.DataFrame()
-        aligned['stock'] = stock_df['close']
-        aligned['index'] = index_df['close']
-        aligned.dropna(inplace=True)
-
-        if aligned.empty or len(aligned) < 21:
-            print(f"[SKIP] {symbol} - insufficient aligned RS data")
-            continue
-
-        rs_series = aligned['stock'] / aligned['index']
-        pattern = get_rs_pattern(rs_series)
-
-        stock_df = add_ama(stock_df)
-        stock_df = add_donchian_channel(stock_df)
-
-        try:
-            close = stock_df['close'].iloc[-1]
-            ama = stock_df['ama'].iloc[-1]
-            donchian_breakout = stock_df['donchian_breakout'].iloc[-1]
-
-            if close > ama and donchian_breakout == 1 and pattern in ['Flying', 'Lion', 'Star']:
-                final_list.append({
-                    'symbol': symbol,
-                    'RS Alpha': rs_alpha_latest[symbol],
-                    'RS Pattern': pattern,
-                    'Close': close,
-                    'AMA': ama
-                })
-
-        except Exception as e:
-            print(f"[ERROR] Filtering failed for {symbol}: {e}")
+    # Step 3: Classify RS patterns for the leaders in one batch
+    index_close = panel.align(index_df)
+    cols = [panel.columns[symbol] for symbol in top_symbols]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rs_ratio = panel.close[:, cols] / index_close[:, None]
+    aligned_counts = (~np.isnan(rs_ratio)).sum(axis=0)
+    with metrics.span("screen.pattern", symbols=len(top_symbols)):
+        patterns = classify_rs_patterns(compact_trailing(rs_ratio))
+
+    # Step 4: Apply indicator and price filters
+    skipped = 0
+    with metrics.span("screen.filters", symbols=len(top_symbols)):
+        for k, symbol in enumerate(top_symbols):
+            stock_df = stock_data_dict[symbol].copy()
+
+            if len(stock_df) < 35:
+                skipped += 1
+                log.debug("[SKIP] %s has only %d rows (<35)", symbol, len(stock_df))
+                continue
+
+            if aligned_counts[k] < 21:
+                skipped += 1
+                log.debug("[SKIP] %s - insufficient aligned RS data", symbol)
+                continue
+
+            pattern = patterns[k]
+
+            stock_df = feature_store.add_indicators(symbol, stock_df)
+
+            try:
+                close = stock_df['close'].iloc[-1]
+                ama = stock_df['ama'].iloc[-1]
+                donchian_breakout = stock_df['donchian_breakout'].iloc[-1]
+
+                if close > ama and donchian_breakout == 1 and pattern in ['Flying', 'Lion', 'Star']:
+                    final_list.append({
+                        'symbol': symbol,
+                        'RS Alpha': rs_alpha_latest[symbol],
+                        'RS Pattern': pattern,
+                        'Close': close,
+                        'AMA': ama
+                    })
+
+            except Exception as e:
+                log.error("[ERROR] Filtering failed for %s: %s", symbol, e)
+
+    log.info("[SCREEN] %d of the top %d passed the filters (%d skipped for short history)",
+             len(final_list), len(top_symbols), skipped)
 
     return pd.DataFrame(final_list)
\ No newline at end of file
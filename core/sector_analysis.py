@@ -1,36 +1,248 @@
+# rs_outperformance_kite_system/core/sector_analysis.py
+
+"""Sector indices built from their constituents and ranked by RS alpha.
+
+:class:`SectorIndexEngine` groups the universe by ``config/sector_map.yaml``
+and turns each sector's constituents into one index series in a single
+matrix pass: each day's constituent returns are averaged per sector (equal
+weight, or weighted by traded value ``close × volume``) and compounded from a
+base of 100. A constituent without a bar on a date simply drops out of that
+day's average. The series are kept between calls and extended by
+:meth:`~SectorIndexEngine.update` with only the new bars, so a daily refresh
+touches one row per sector instead of the whole history.
+"""
+
+import numpy as np
 import pandas as pd
-import yaml
-from core.rs_calculator import compute_rs_alpha
 
-def filter_by_sector_strength(stock_data_dict, index_data_dict, top_n_sectors=3):
+from core.panel import Panel
+from core.rs_calculator import compute_rs_alpha_matrix
+from tools.config import get_config
+from tools.log import get_logger
+
+log = get_logger(__name__)
+
+WEIGHTINGS = ("equal", "volume")
+BASE_LEVEL = 100.0
+
+
+def _ffill(values):
+    """Forward-fill ``NaN`` down each column of a 2-D array."""
+    rows = np.where(np.isnan(values), 0, np.arange(len(values))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return values[rows, np.arange(values.shape[1])]
+
+
+def _align(series, dates):
+    if isinstance(series, pd.DataFrame):
+        series = series['close']
+    if series.index.tz is not None and dates.tz is not None and series.index.tz != dates.tz:
+        series = series.tz_convert(dates.tz)
+    series = series[~series.index.duplicated(keep='last')]
+    return series.reindex(dates).to_numpy(dtype=float)
+
+
+class SectorIndexEngine:
+    """Constituent-based sector index levels for a universe.
+
+    ``sector_map`` maps symbols to sector names and defaults to the current
+    config snapshot. ``weighting`` is ``"equal"`` or ``"volume"``. After
+    :meth:`build` (or :meth:`sync`) ``levels`` holds a ``dates × sectors``
+    array and ``counts`` the number of constituents priced on each date.
     """
-    Ranks sectors by RS Alpha (via ETF proxies) and returns stock symbols from top N sectors.
+
+    def __init__(self, sector_map=None, weighting="equal"):
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"weighting must be one of {WEIGHTINGS}, got {weighting!r}")
+        self.weighting = weighting
+        self._sector_map = sector_map
+        self._map_used = None
+        self.dates = pd.DatetimeIndex([])
+        self.symbols = []
+        self.sectors = []
+        self.levels = None
+        self.counts = None
+        self._codes = None
+        self._onehot = None
+        self._last_close = None
+        self._anchors = {}
+
+    @property
+    def sector_map(self):
+        return self._sector_map if self._sector_map is not None else get_config().sector_map
+
+    @property
+    def built(self):
+        return self.levels is not None
+
+    def build(self, stock_data_dict):
+        """Compute every sector series from scratch; returns ``self``."""
+        sector_map = self.sector_map
+        frames = {s: df for s, df in stock_data_dict.items()
+                  if s in sector_map and df is not None and not df.empty}
+        panel = Panel.from_frames(frames)
+
+        self.symbols = panel.symbols
+        self.sectors = sorted({sector_map[s] for s in self.symbols})
+        codes = {sector: k for k, sector in enumerate(self.sectors)}
+        self._codes = np.array([codes[sector_map[s]] for s in self.symbols], dtype=int)
+        self._onehot = np.zeros((len(self.symbols), len(self.sectors)))
+        self._onehot[np.arange(len(self.symbols)), self._codes] = 1.0
+        self._map_used = sector_map
+
+        previous = np.full(len(self.symbols), np.nan)
+        returns, counts, last_close = self._sector_returns(previous, panel.close, panel.volume)
+        self.dates = panel.dates
+        self.levels = BASE_LEVEL * np.cumprod(1.0 + returns, axis=0)
+        self.counts = counts
+        self._last_close = last_close
+        self._anchors = self._anchor_bars(frames)
+        log.info("[SECTOR] Built %d sector indices from %d constituents over %d bars",
+                 len(self.sectors), len(self.symbols), len(self.dates))
+        return self
+
+    def update(self, stock_data_dict):
+        """Append the bars dated after the last built date; returns ``self``.
+
+        Only the new rows are read from each frame. Symbols outside the built
+        universe are ignored; call :meth:`build` (or :meth:`sync`) to add them.
+        """
+        if not self.built or len(self.dates) == 0:
+            return self.build(stock_data_dict)
+        last = self.dates[-1]
+        columns = {s: j for j, s in enumerate(self.symbols)}
+        new_frames = {}
+        for symbol, df in stock_data_dict.items():
+            if symbol in columns and df is not None and not df.empty:
+                tail = df.iloc[df.index.searchsorted(last, side='right'):]
+                if not tail.empty:
+                    new_frames[symbol] = tail
+        if not new_frames:
+            return self
+
+        panel = Panel.from_frames(new_frames)
+        shape = (len(panel.dates), len(self.symbols))
+        close, volume = np.full(shape, np.nan), np.full(shape, np.nan)
+        cols = [columns[s] for s in panel.symbols]
+        close[:, cols] = panel.close
+        volume[:, cols] = panel.volume
+
+        returns, counts, last_close = self._sector_returns(self._last_close, close, volume)
+        levels = self.levels[-1] * np.cumprod(1.0 + returns, axis=0)
+        self.dates = self.dates.append(panel.dates)
+        self.levels = np.vstack([self.levels, levels])
+        self.counts = np.vstack([self.counts, counts])
+        self._last_close = last_close
+        self._anchors.update(self._anchor_bars(new_frames))
+        log.debug("[SECTOR] Appended %d bars to %d sector indices", len(panel.dates), len(self.sectors))
+        return self
+
+    def sync(self, stock_data_dict):
+        """Bring the series up to date with ``stock_data_dict``.
+
+        Appends new bars when the data extends what was built. Rebuilds when
+        the universe, the sector map or any already-used bar has changed (a
+        replaced provisional bar, or an older replay window).
+        """
+        sector_map = self.sector_map
+        symbols = [s for s, df in stock_data_dict.items()
+                   if s in sector_map and df is not None and not df.empty]
+        if (not self.built or sector_map is not self._map_used
+                or sorted(symbols) != sorted(self.symbols) or not self._anchors_match(stock_data_dict)):
+            return self.build(stock_data_dict)
+        return self.update(stock_data_dict)
+
+    def _sector_returns(self, previous, close, volume):
+        """Per-sector returns for the rows of ``close`` given each symbol's prior close."""
+        filled = _ffill(np.vstack([previous, close]))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = close / filled[:-1] - 1.0
+        valid = np.isfinite(returns)
+        if self.weighting == "volume":
+            weights = np.where(valid, np.nan_to_num(close * volume), 0.0)
+        else:
+            weights = valid.astype(float)
+        num = (np.where(valid, returns, 0.0) * weights) @ self._onehot
+        den = weights @ self._onehot
+        sector_returns = np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+        counts = (valid.astype(float) @ self._onehot).astype(int)
+        return sector_returns, counts, filled[-1]
+
+    def _anchor_bars(self, frames):
+        if len(self.dates) == 0:
+            return {}
+        last = self.dates[-1]
+        anchors = {}
+        for symbol, df in frames.items():
+            pos = df.index.searchsorted(last, side='right')
+            if pos:
+                anchors[symbol] = (df.index[pos - 1], float(df['close'].iloc[pos - 1]))
+        return anchors
+
+    def _anchors_match(self, stock_data_dict):
+        if len(self.dates) == 0:
+            return False
+        last = self.dates[-1]
+        for symbol, anchor in self._anchors.items():
+            df = stock_data_dict[symbol]
+            pos = df.index.searchsorted(last, side='right')
+            if not pos or (df.index[pos - 1], float(df['close'].iloc[pos - 1])) != anchor:
+                return False
+        return True
+
+    def frame(self):
+        """Return the sector levels as a ``dates × sectors`` DataFrame."""
+        return pd.DataFrame(self.levels, index=self.dates, columns=self.sectors)
+
+    def rank(self, benchmark, period=21):
+        """Rank sectors by RS alpha against ``benchmark`` on the latest common date.
+
+        Returns a DataFrame indexed by sector with ``RS Alpha`` and
+        ``Constituents``, strongest first. Sectors without a priced
+        constituent on that date are left out.
+        """
+        columns = ['RS Alpha', 'Constituents']
+        if not self.built or len(self.dates) <= period or benchmark is None or len(benchmark) == 0:
+            return pd.DataFrame(columns=columns)
+        bench = _align(benchmark, self.dates)
+        rows = np.flatnonzero(np.isfinite(bench))
+        rows = rows[rows >= period]
+        if len(rows) == 0:
+            return pd.DataFrame(columns=columns)
+        row = rows[-1]
+        alpha = compute_rs_alpha_matrix(self.levels[:row + 1], bench[:row + 1], period)[-1]
+        ranking = pd.DataFrame({
+            'RS Alpha': alpha,
+            'Constituents': self._onehot.sum(axis=0).astype(int),
+        }, index=pd.Index(self.sectors, name='sector'))
+        ranking = ranking[(self.counts[row] > 0) & np.isfinite(alpha)]
+        return ranking.sort_values('RS Alpha', ascending=False)
+
+    def membership(self, sectors):
+        """Return ``{symbol: bool}``: whether each symbol belongs to one of ``sectors``."""
+        chosen = np.isin(np.array(self.sectors, dtype=object), list(sectors))
+        return dict(zip(self.symbols, chosen[self._codes].tolist()))
+
+
+sector_engine = SectorIndexEngine()
+
+
+def filter_by_sector_strength(stock_data_dict, index_df, top_n_sectors=3, engine=None):
+    """Return the symbols of ``stock_data_dict`` that belong to the top N sectors.
+
+    Sectors are ranked by the RS alpha of their constituent index against
+    ``index_df``. The shared :data:`sector_engine` keeps the sector series
+    between calls unless another ``engine`` is given. When no sector can be
+    ranked the universe is returned unfiltered.
     """
-    with open("config/sector_map.yaml", "r") as f:
-        sector_map = yaml.safe_load(f) or {}
-
-    sector_rs = {}
-
-    # Step 1: Calculate RS Alpha for each sector ETF proxy
-    for sector, index_df in index_data_dict.items():
-        if index_df is not None and not index_df.empty:
-            for stock, df in stock_data_dict.items():
-                if df is not None and not df.empty:
-                    rs = compute_rs_alpha(df, index_df)
-                    if not rs.empty:
-                        sector_rs[sector] = rs.iloc[-1]  # use last RS Alpha
-                    break
-
-    # Step 2: Rank sectors by RS
-    top_sectors = sorted(sector_rs.items(), key=lambda x: x[1], reverse=True)[:top_n_sectors]
-    top_sector_names = [s[0] for s in top_sectors]
-    print(f"[✅] Top Sectors by RS: {top_sector_names}")
-
-    # Step 3: Filter stock symbols based on sector_map
-    selected_symbols = []
-    for stock in stock_data_dict:
-        stock_sector = sector_map.get(stock)
-        if stock_sector in top_sector_names:
-            selected_symbols.append(stock)
-
-    return selected_symbols
\ No newline at end of file
+    engine = engine or sector_engine
+    engine.sync(stock_data_dict)
+    ranking = engine.rank(index_df)
+    if ranking.empty:
+        log.warning("[WARN] No sector could be ranked; skipping the sector filter.")
+        return list(stock_data_dict)
+
+    top_sector_names = list(ranking.index[:top_n_sectors])
+    log.info("[✅] Top Sectors by RS: %s", top_sector_names)
+    in_top = engine.membership(top_sector_names)
+    return [s for s in stock_data_dict if in_top.get(s, False)]
@@ -0,0 +1,212 @@
+# rs_outperformance_kite_system/core/streaming.py
+
+"""Incremental indicator state for tick-by-tick evaluation.
+
+Each indicator is seeded once from history and then advanced in O(1) per
+bar with :meth:`update`. :meth:`peek` returns the value the indicator would
+have if ``x`` were the next bar, without committing it, which is how a live
+price is treated until its bar closes. Values match the batch functions in
+:mod:`core.rs_calculator` and the ``rolling`` calls in the engines.
+"""
+
+from collections import deque
+
+import numpy as np
+
+from core.pattern_recognizer import PATTERN_LOOKBACK, classify_rs_window
+
+
+class StreamingEMA:
+    """``series.ewm(span=span, adjust=False).mean()`` one value at a time."""
+
+    def __init__(self, span, values=()):
+        self.span = span
+        self.alpha = 2.0 / (span + 1)
+        self.value = None
+        self.count = 0
+        for x in values:
+            self.update(x)
+
+    def peek(self, x):
+        if self.value is None:
+            return float(x)
+        return self.value + self.alpha * (x - self.value)
+
+    def update(self, x):
+        if x != x:  # NaN bars leave the state untouched
+            return self.value
+        self.value = self.peek(x)
+        self.count += 1
+        return self.value
+
+
+class StreamingSMA:
+    """``series.rolling(window).mean()`` with a running sum."""
+
+    def __init__(self, window, values=()):
+        self.window = window
+        self._values = deque(maxlen=window)
+        self._sum = 0.0
+        for x in values:
+            self.update(x)
+
+    @property
+    def value(self):
+        if len(self._values) < self.window:
+            return np.nan
+        return self._sum / self.window
+
+    def peek(self, x):
+        if len(self._values) + 1 < self.window:
+            return np.nan
+        oldest = self._values[0] if len(self._values) == self.window else 0.0
+        return (self._sum - oldest + x) / self.window
+
+    def update(self, x):
+        if len(self._values) == self.window:
+            self._sum -= self._values[0]
+        self._values.append(x)
+        self._sum += x
+        return self.value
+
+
+class RollingExtreme:
+    """``series.rolling(window).max()`` (or ``min``) via a monotonic deque.
+
+    The deque holds ``(position, value)`` pairs whose values are strictly
+    decreasing (increasing for ``min``), so its head is always the extreme
+    of the current window and each value is pushed and popped at most once.
+    """
+
+    def __init__(self, window, mode='max', values=()):
+        self.window = window
+        self._better = (lambda a, b: a >= b) if mode == 'max' else (lambda a, b: a <= b)
+        self._pick = max if mode == 'max' else min
+        self._deque = deque()
+        self.count = 0
+        for x in values:
+            self.update(x)
+
+    @property
+    def value(self):
+        if self.count < self.window or not self._deque:
+            return np.nan
+        return self._deque[0][1]
+
+    def _head(self, start):
+        for pos, val in self._deque:
+            if pos >= start:
+                return val
+        return None
+
+    def peek(self, x):
+        """Extreme of the last ``window - 1`` bars together with ``x``."""
+        if self.count + 1 < self.window:
+            return np.nan
+        head = self._head(self.count + 1 - self.window)
+        return x if head is None else self._pick(head, x)
+
+    def update(self, x):
+        if x == x:
+            while self._deque and self._better(x, self._deque[-1][1]):
+                self._deque.pop()
+            self._deque.append((self.count, x))
+        self.count += 1
+        while self._deque and self._deque[0][0] <= self.count - 1 - self.window:
+            self._deque.popleft()
+        return self.value
+
+
+class LiveExitEvaluator:
+    """Streaming form of :func:`strategy.rs_exit_engine.evaluate_exit`.
+
+    Seeded once from a symbol's daily history and the benchmark, it keeps the
+    AMA, 50-bar SMA, Donchian channel, RS alpha window and recent RS ratios.
+    :meth:`evaluate` treats a live price as a provisional bar appended to the
+    history (with ``high == low == close``); :meth:`update` commits a closed
+    bar.
+    """
+
+    def __init__(self, stock_df, index_df, symbol, rs_threshold=0.01, rs_period=21,
+                 ama_period=10, donchian_lookback=20, sma_window=50):
+        self.symbol = symbol
+        self.rs_threshold = rs_threshold
+        self.ama_period = ama_period
+        close = stock_df['close'].to_numpy(dtype=float)
+        high = stock_df['high'].to_numpy(dtype=float) if 'high' in stock_df.columns else close
+        self.bars = len(close)
+        self.ama = StreamingEMA(ama_period, close)
+        self.sma = StreamingSMA(sma_window, close)
+        self.donchian_high = RollingExtreme(donchian_lookback, 'max', high)
+
+        # Same inner join as compute_rs_alpha; only the last ``rs_period``
+        # pairs are needed to roll the alpha forward.
+        joined = stock_df[['close']].join(index_df[['close']], how='inner', rsuffix='_index')
+        self.index_close = float(index_df['close'].iloc[-1]) if not index_df.empty else np.nan
+        self.rs_period = rs_period
+        self.merged = len(joined)
+        self._alpha_base = deque(
+            zip(joined['close'].to_numpy(dtype=float)[-rs_period:],
+                joined['close_index'].to_numpy(dtype=float)[-rs_period:]),
+            maxlen=rs_period,
+        )
+
+        rs = (stock_df['close'] / index_df['close']).to_numpy(dtype=float)
+        self._rs = deque(rs[-(PATTERN_LOOKBACK - 1):], maxlen=PATTERN_LOOKBACK - 1)
+
+    def _rs_alpha(self, close, index_close):
+        if self.merged + 1 < self.rs_period + 1:
+            return None
+        base_close, base_index = self._alpha_base[0]
+        return (close / base_close - 1) - (index_close / base_index - 1)
+
+    def evaluate(self, price, index_price=None):
+        """Return the exit dict for a live ``price`` or ``None`` to hold.
+
+        ``index_price`` defaults to the benchmark's last close.
+        """
+        index_price = self.index_close if index_price is None else index_price
+        latest_rs = self._rs_alpha(price, index_price)
+        if latest_rs is None:
+            return None
+
+        pattern = classify_rs_window(list(self._rs) + [price / index_price])
+        ama = self.ama.peek(price) if self.bars + 1 >= self.ama_period else np.nan
+        ema50 = self.sma.peek(price)
+        # Breakout compares against the channel *before* this bar.
+        donchian_signal = int(price > self.donchian_high.value)
+
+        if latest_rs < self.rs_threshold:
+            reason = "RS Alpha weak"
+        elif pattern in ["Drowning", "Cat"]:
+            reason = f"RS pattern = {pattern}"
+        elif price < ama:
+            reason = "Price below AMA"
+        elif donchian_signal == -1:
+            reason = "Donchian breakdown"
+        elif price < ema50:
+            reason = "Price below 50 EMA"
+        else:
+            return None
+
+        return {
+            "symbol": self.symbol,
+            "RS Alpha": latest_rs,
+            "RS Pattern": pattern,
+            "Price": price,
+            "AMA": ama,
+            "Exit Reason": reason
+        }
+
+    def update(self, close, high=None, index_close=None):
+        """Commit a closed bar."""
+        high = close if high is None else high
+        index_close = self.index_close if index_close is None else index_close
+        self.bars += 1
+        self.ama.update(close)
+        self.sma.update(close)
+        self.donchian_high.update(high)
+        self._alpha_base.append((close, index_close))
+        self.merged += 1
+        self._rs.append(close / index_close)
+        self.index_close = index_close
@@ -0,0 +1,82 @@
+# rs_outperformance_kite_system/data/backtest_provider.py
+
+"""Load-once historical data source for walk-forward backtests."""
+
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from tools.log import get_logger
+
+log = get_logger(__name__)
+
+
+class BacktestDataProvider:
+    """Fetch the full backtest window once and serve point-in-time views.
+
+    Every symbol is loaded for ``[start - lookback_days, end]`` in a single
+    request (or straight from the client's OHLC store). :meth:`snapshot`
+    then returns, for any simulated day, DataFrames that are zero-copy
+    windows onto the loaded arrays, equivalent to
+    ``df.loc[day - lookback_days:day]``.
+    """
+
+    def __init__(self, client, symbols, index_symbol, start, end, lookback_days=75):
+        self.client = client
+        self.symbols = list(symbols)
+        self.index_symbol = index_symbol
+        self.start = start
+        self.end = end
+        self.lookback_days = lookback_days
+        self._frames = {}
+        self._index = None
+
+    def load(self, workers=4):
+        """Fetch the whole window for every symbol and the index."""
+        window_start = self.start - timedelta(days=self.lookback_days)
+        stock_data = self.client.fetch_multiple_ohlc(
+            self.symbols, workers=workers, start=window_start, end=self.end
+        )
+        self._frames = {sym: self._pack(df) for sym, df in stock_data.items()}
+        index_df = self.client.fetch_historical_ohlc(self.index_symbol, window_start, self.end)
+        self._index = self._pack(index_df) if not index_df.empty else None
+        log.info("[INFO] Backtest data loaded: %d symbols, %s to %s",
+                 len(self._frames), window_start, self.end)
+        return self
+
+    @staticmethod
+    def _pack(df):
+        df = df.sort_index()
+        columns = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+        values = np.ascontiguousarray(df[columns].to_numpy(dtype=float))
+        index = df.index
+        days = index.tz_localize(None) if index.tz is not None else index
+        return values, index, list(columns), days.normalize().asi8
+
+    @staticmethod
+    def _view(packed, lo_day, hi_day):
+        values, index, columns, days = packed
+        lo = days.searchsorted(pd.Timestamp(lo_day).value, side="left")
+        hi = days.searchsorted(pd.Timestamp(hi_day).value, side="right")
+        # A DataFrame built on an ndarray slice shares memory with it and,
+        # unlike ``df.iloc[lo:hi]``, is not flagged as a copy of a parent.
+        return pd.DataFrame(values[lo:hi], index=index[lo:hi], columns=columns, copy=False)
+
+    def trading_days(self):
+        """Return the index's trading dates within ``[start, end]``."""
+        if self._index is None:
+            return []
+        days = pd.to_datetime(np.unique(self._index[3])).date
+        return [d for d in days if self.start <= d <= self.end]
+
+    def snapshot(self, current_date):
+        """Return ``(stock_data, index_df)`` as seen at the close of ``current_date``."""
+        lo_day = current_date - timedelta(days=self.lookback_days)
+        stock_data = {}
+        for sym, packed in self._frames.items():
+            view = self._view(packed, lo_day, current_date)
+            if not view.empty:
+                stock_data[sym] = view
+        index_df = self._view(self._index, lo_day, current_date) if self._index is not None else pd.DataFrame()
+        return stock_data, index_df
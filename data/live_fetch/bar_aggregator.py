@@ -0,0 +1,123 @@
+# rs_outperformance_kite_system/data/live_fetch/bar_aggregator.py
+
+"""Build intraday OHLCV bars from the live tick stream.
+
+Ticks are bucketed by exchange time into fixed-minute bars anchored at the
+session open (09:15), so 1/5/15-minute bars line up with the exchange's own
+candles. A bar is closed, and ``on_bar(symbol, interval, bar)`` emitted, when
+the first tick of a later bucket arrives or :meth:`close_due` is called past
+the boundary. Bars are kept per symbol and interval in :class:`BarBuffer`.
+"""
+
+import threading
+from datetime import datetime, time as dtime
+
+import pandas as pd
+
+from data.live_fetch.bar_buffer import BarBuffer
+from tools.log import get_logger
+
+log = get_logger(__name__)
+
+DEFAULT_INTERVALS = (1, 5, 15)
+SESSION_OPEN = dtime(9, 15)
+INTRADAY_CAPACITY = 400  # a full session of 1-minute bars is 375
+
+
+class IntradayBarAggregator:
+    """Aggregate ticks into intraday bars for every subscribed symbol.
+
+    ``on_bar`` runs on the thread that feeds ticks (the socket thread when
+    attached to :class:`LivePriceStreamer`), so it should only hand the bar
+    off, not evaluate strategies itself.
+    """
+
+    def __init__(self, intervals=DEFAULT_INTERVALS, on_bar=None, capacity=INTRADAY_CAPACITY,
+                 session_open=SESSION_OPEN):
+        self.intervals = tuple(intervals)
+        self.on_bar = on_bar
+        self.capacity = capacity
+        self.session_open = session_open
+        self.buffers = {}
+        self._bucket = {}
+        self._open = set()
+        self._last_volume = {}
+        self._lock = threading.Lock()
+        self.ticks = 0
+        self.bars_closed = 0
+
+    def _bucket_start(self, ts, interval):
+        anchor = datetime.combine(ts.date(), self.session_open)
+        minutes = int((ts - anchor).total_seconds() // 60)
+        return anchor + pd.Timedelta(minutes=minutes - minutes % interval)
+
+    def bars(self, symbol, interval):
+        """Return the symbol's bars for ``interval`` (the newest may still be open)."""
+        buf = self.buffers.get((symbol, interval))
+        return buf.frame() if buf is not None else pd.DataFrame()
+
+    def on_kite_tick(self, symbol, tick):
+        """Feed one KiteTicker tick dict for ``symbol``."""
+        ts = tick.get("exchange_timestamp") or tick.get("last_trade_time") or datetime.now()
+        self.update(symbol, tick.get("last_price"), ts, tick.get("volume_traded"))
+
+    def update(self, symbol, price, ts, cumulative_volume=None):
+        """Add a trade at exchange time ``ts``; ``cumulative_volume`` is the day's total."""
+        if price is None:
+            return
+        ts = pd.Timestamp(ts).tz_localize(None).to_pydatetime()
+        closed = []
+        with self._lock:
+            self.ticks += 1
+            volume = 0.0
+            if cumulative_volume is not None:
+                previous = self._last_volume.get(symbol)
+                if previous is not None and cumulative_volume >= previous:
+                    volume = float(cumulative_volume - previous)
+                self._last_volume[symbol] = cumulative_volume
+
+            for interval in self.intervals:
+                key = (symbol, interval)
+                start = self._bucket_start(ts, interval)
+                current = self._bucket.get(key)
+                buf = self.buffers.get(key)
+                if current is not None and start <= current:
+                    # Late ticks still update a bar already closed by close_due.
+                    buf.apply_tick(price, volume=buf.column("volume")[-1] + volume)
+                    continue
+                if key in self._open:
+                    closed.append((symbol, interval, self._last_bar(buf, current)))
+                if buf is None:
+                    buf = self.buffers[key] = BarBuffer(self.capacity)
+                buf.append(start, price, volume=volume)
+                self._bucket[key] = start
+                self._open.add(key)
+        self._emit(closed)
+
+    def close_due(self, now=None):
+        """Close every open bar whose interval ended at or before ``now``."""
+        now = pd.Timestamp(now or datetime.now()).tz_localize(None).to_pydatetime()
+        closed = []
+        with self._lock:
+            for key in list(self._open):
+                symbol, interval = key
+                start = self._bucket[key]
+                if start + pd.Timedelta(minutes=interval) <= now:
+                    closed.append((symbol, interval, self._last_bar(self.buffers[key], start)))
+                    self._open.discard(key)
+        self._emit(closed)
+
+    @staticmethod
+    def _last_bar(buf, start):
+        o, h, l, c, v = (buf.column(col)[-1] for col in ("open", "high", "low", "close", "volume"))
+        return {'time': pd.Timestamp(start), 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+
+    def _emit(self, closed):
+        self.bars_closed += len(closed)
+        if self.on_bar is None:
+            return
+        for symbol, interval, bar in closed:
+            try:
+                self.on_bar(symbol, interval, bar)
+            except Exception as e:
+                log.error("[ERROR] Bar handler failed for %s %dm: %s", symbol, interval, e)
@@ -0,0 +1,194 @@
+# rs_outperformance_kite_system/data/live_fetch/bar_buffer.py
+
+"""Fixed-capacity OHLCV bar buffer for live updates.
+
+``df.loc[ts] = ...`` reallocates the whole frame on every append. A
+:class:`BarBuffer` preallocates twice its capacity; appends write into the
+free tail and, once it is used up, the newest ``capacity`` bars are moved
+back to the front. Appends are therefore amortised O(1), memory stays flat,
+and column accessors return zero-copy views of the live window.
+"""
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ("open", "high", "low", "close", "volume")
+DEFAULT_CAPACITY = 512
+
+
+class BarBuffer:
+    """Array-backed OHLCV bars for one symbol."""
+
+    __slots__ = ("capacity", "tz", "_times", "_data", "_start", "_end", "_head")
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, tz=None):
+        self.capacity = capacity
+        self.tz = tz
+        self._times = np.zeros(2 * capacity, dtype="int64")
+        self._data = np.full((2 * capacity, len(COLUMNS)), np.nan)
+        self._start = 0
+        self._end = 0
+        self._head = None  # cached index of every bar but the newest
+
+    @classmethod
+    def from_frame(cls, df, capacity=None):
+        """Seed a buffer with the bars of ``df`` (the newest ones if it is longer)."""
+        capacity = capacity or max(DEFAULT_CAPACITY, len(df))
+        buf = cls(capacity, tz=df.index.tz if isinstance(df.index, pd.DatetimeIndex) else None)
+        df = df.iloc[-capacity:]
+        n = len(df)
+        buf._times[:n] = pd.DatetimeIndex(df.index).asi8
+        for j, col in enumerate(COLUMNS):
+            if col in df.columns:
+                buf._data[:n, j] = df[col].to_numpy(dtype=float)
+        buf._end = n
+        return buf
+
+    def __len__(self):
+        return self._end - self._start
+
+    def _compact(self):
+        keep = self.capacity - 1
+        lo = self._end - keep
+        self._times[:keep] = self._times[lo:self._end]
+        self._data[:keep] = self._data[lo:self._end]
+        self._start, self._end = 0, keep
+        self._head = None
+
+    def append(self, ts, open, high=None, low=None, close=None, volume=0.0):
+        """Add a bar. With only ``open`` given it is a one-price (tick) bar."""
+        if self._end == len(self._times):
+            self._compact()
+        self._end += 1
+        if self._end - self._start > self.capacity:
+            self._start += 1
+        self.replace_last(ts, open, high, low, close, volume)
+
+    def replace_last(self, ts, open, high=None, low=None, close=None, volume=0.0):
+        """Overwrite the newest bar, time included (e.g. a provisional live bar)."""
+        high = open if high is None else high
+        low = open if low is None else low
+        close = open if close is None else close
+        ts = pd.Timestamp(ts)
+        if self.tz is not None and ts.tz is None:
+            ts = ts.tz_localize(self.tz)
+        i = self._end - 1
+        self._times[i] = ts.value
+        self._data[i] = (open, high, low, close, volume)
+
+    def update_last(self, **fields):
+        """Overwrite fields of the newest bar, e.g. ``update_last(close=101.5)``."""
+        row = self._data[self._end - 1]
+        for name, value in fields.items():
+            row[COLUMNS.index(name)] = value
+
+    def apply_tick(self, price, volume=None):
+        """Fold a traded price (and optional cumulative volume) into the newest bar."""
+        row = self._data[self._end - 1]
+        # ``not >=`` / ``not <=`` also replaces a NaN high or low.
+        if not row[1] >= price:
+            row[1] = price
+        if not row[2] <= price:
+            row[2] = price
+        row[3] = price
+        if volume is not None:
+            row[4] = volume
+
+    def column(self, name):
+        """Return a zero-copy view of one column over the live window."""
+        return self._data[self._start:self._end, COLUMNS.index(name)]
+
+    @property
+    def close(self):
+        return self.column("close")
+
+    @property
+    def high(self):
+        return self.column("high")
+
+    @property
+    def low(self):
+        return self.column("low")
+
+    def last_time(self):
+        if not len(self):
+            return None
+        ts = pd.Timestamp(self._times[self._end - 1])
+        return ts.tz_localize("UTC").tz_convert(self.tz) if self.tz is not None else ts
+
+    def _to_index(self, times):
+        index = pd.DatetimeIndex(times)
+        return index.tz_localize("UTC").tz_convert(self.tz) if self.tz is not None else index
+
+    def index(self):
+        # Only the newest bar's time can change in place, so the rest of the
+        # index is built once per append rather than on every call.
+        key = (self._start, self._end - 1)
+        if self._head is None or self._head[0] != key:
+            self._head = (key, self._to_index(self._times[self._start:self._end - 1]))
+        if not len(self):
+            return self._head[1]
+        return self._head[1].append(self._to_index(self._times[self._end - 1:self._end]))
+
+    def frame(self):
+        """Return the bars as a DataFrame sharing memory with the buffer."""
+        return pd.DataFrame(self._data[self._start:self._end], index=self.index(),
+                            columns=list(COLUMNS), copy=False)
+
+
+class LiveBars:
+    """One :class:`BarBuffer` per symbol: its daily history plus a live bar.
+
+    The history is copied in once. Each later price only rewrites the last
+    bar, so a tick costs O(1) however long the history is. A symbol is seeded
+    again when it is given a different history frame (another object, or one
+    whose length or last date changed).
+    """
+
+    def __init__(self):
+        self._buffers = {}
+
+    def buffer(self, symbol, df):
+        entry = self._buffers.get(symbol)
+        key = (len(df), df.index[-1])
+        if entry is None or entry[0] is not df or entry[1] != key:
+            buf = BarBuffer.from_frame(df, capacity=len(df) + 1)
+            buf.append(df.index[-1], np.nan)  # live slot, set by the caller
+            entry = self._buffers[symbol] = (df, key, buf)
+        return entry[2]
+
+    def clear(self):
+        self._buffers.clear()
+
+
+# Buffers shared by the scans that re-apply live prices every cycle.
+live_bars = LiveBars()
+
+
+def apply_live_prices(stock_data_dict, live_prices, ts=None, bars=None):
+    """Return ``stock_data_dict`` with each live price added as a provisional bar.
+
+    The input frames are not modified. The bar has open, high, low and close
+    all equal to the live price and zero volume, instead of the NaN columns
+    that ``df.loc[ts] = {'close': price}`` leaves behind. Updated frames are
+    marked ``attrs['provisional']`` so the feature store does not cache them.
+
+    Each symbol's bars are kept in ``bars`` (default :data:`live_bars`)
+    between calls, and the returned frame is a view on them. The next call
+    for that symbol rewrites its last row.
+    """
+    ts = ts or pd.Timestamp.now()
+    bars = live_bars if bars is None else bars
+    updated = dict(stock_data_dict)
+    for sym, price in live_prices.items():
+        df = stock_data_dict.get(sym)
+        if df is None or df.empty:
+            continue
+        buf = bars.buffer(sym, df)
+        buf.replace_last(ts, price)
+        frame = buf.frame()
+        if list(df.columns) != list(COLUMNS):
+            frame = frame[[c for c in df.columns if c in COLUMNS]]
+        frame.attrs['provisional'] = True
+        updated[sym] = frame
+    return updated
@@ -0,0 +1,128 @@
+# rs_outperformance_kite_system/data/live_fetch/instrument_master.py
+
+"""Disk-cached Kite instrument master with hash indexes.
+
+``kite.instruments()`` returns tens of thousands of rows and only changes once
+per trading day, so the dump is pickled together with lookup tables keyed by
+tradingsymbol, name and instrument token. Every client in the process shares
+the same loaded master.
+"""
+
+import os
+import pickle
+from datetime import date, timedelta
+
+from tools.log import get_logger
+
+log = get_logger(__name__)
+
+DEFAULT_PATH = os.path.join("data", "cache", "instruments.pkl")
+FIELDS = ("instrument_token", "tradingsymbol", "name", "instrument_type", "exchange", "segment")
+
+_LOADED = {}
+
+
+def last_trading_day(today=None):
+    """Return ``today`` or, on a weekend, the preceding Friday."""
+    day = today or date.today()
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+class InstrumentMaster:
+    """Instrument dump indexed for O(1) token and symbol lookups."""
+
+    def __init__(self, instruments, fetched_on):
+        self.fetched_on = fetched_on
+        self.instruments = [{k: item.get(k) for k in FIELDS} for item in instruments]
+        self.by_symbol = {}
+        self.by_name = {}
+        self.by_token = {}
+        for item in self.instruments:
+            self.by_symbol.setdefault(item['tradingsymbol'], []).append(item)
+            self.by_name.setdefault((item.get('name') or '').upper(), []).append(item)
+            self.by_token[item['instrument_token']] = item
+
+        self._token_map = {}
+        for item in self.instruments:
+            if item['instrument_type'] in ['EQ', 'Index'] and item['exchange'] in ['NSE', 'NFO']:
+                self._token_map[item['tradingsymbol']] = item['instrument_token']
+
+    def __len__(self):
+        return len(self.instruments)
+
+    def is_fresh(self, today=None):
+        return self.fetched_on >= last_trading_day(today)
+
+    def token_map(self):
+        """Return ``tradingsymbol → token`` for tradable NSE/NFO equities and indices.
+
+        A copy is returned so callers may add aliases without touching the
+        shared master.
+        """
+        return dict(self._token_map)
+
+    def index_token(self, name):
+        """Return the token of the index whose ``name`` matches, or ``None``."""
+        for item in self.by_name.get(name.upper(), ()):
+            if (item.get('instrument_type') or '').upper() == 'INDEX':
+                return item['instrument_token']
+        return None
+
+    def symbol_for_token(self, token):
+        item = self.by_token.get(token)
+        return item['tradingsymbol'] if item else None
+
+    def save(self, path=DEFAULT_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as fh:
+            pickle.dump(self, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def read(cls, path=DEFAULT_PATH):
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as fh:
+                master = pickle.load(fh)
+        except Exception as e:
+            log.warning("[WARN] Ignoring unreadable instrument cache %s: %s", path, e)
+            return None
+        return master if isinstance(master, cls) else None
+
+    @classmethod
+    def load(cls, kite, path=DEFAULT_PATH, today=None):
+        """Return the instrument master, downloading at most once per trading day.
+
+        The in-process copy is tried first, then the pickle at ``path``; only
+        when both are stale is ``kite.instruments()`` called. If the download
+        fails a stale cache is still returned rather than nothing. With
+        ``path=None`` nothing is cached and the master is always downloaded.
+        """
+        if path is None:
+            try:
+                instruments = kite.instruments()
+            except Exception as e:
+                log.warning("[WARN] Failed to fetch instruments: %s", e)
+                instruments = []
+            return cls(instruments or [], today or date.today())
+        master = _LOADED.get(path)
+        if master is None or not master.is_fresh(today):
+            cached = cls.read(path)
+            master = cached if cached is not None else master
+        if master is None or not master.is_fresh(today):
+            try:
+                instruments = kite.instruments()
+            except Exception as e:
+                log.warning("[WARN] Failed to fetch instruments: %s", e)
+                instruments = None
+            if instruments:
+                master = cls(instruments, today or date.today())
+                master.save(path)
+            elif master is None:
+                return cls([], date.min)
+        _LOADED[path] = master
+        return master
@@ -1,45 +1,102 @@
 # rs_outperformance_kite_system/data/live_fetch/kite_client.py
 
-try:
-    from kiteconnect import KiteConnect
-except Exception:  # pragma: no cover - optional dependency may be missing
-    KiteConnect = None
+# ``kiteconnect`` pulls in Twisted for its ticker, so it is imported when the
+# first real client is created (see :func:`_kite_connect`).
+KiteConnect = None
 
 try:
     import pandas as pd
 except Exception:  # pragma: no cover - optional dependency may be missing
     pd = None
 
-from datetime import datetime, timedelta, date
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import threading
 import time
 
+from data.live_fetch.instrument_master import InstrumentMaster, DEFAULT_PATH as INSTRUMENT_PATH
+from data.live_fetch.rate_limiter import TokenBucket, HISTORICAL_RATE_LIMIT
+from tools.log import get_logger
+from tools.metrics import metrics
+
+log = get_logger(__name__)
+
+# Connection pool shared by every request made through one client.
+HTTP_POOL = {"pool_connections": 4, "pool_maxsize": 8}
+MAX_RETRIES = 4
+
+
+def _kite_connect():
+    global KiteConnect
+    if KiteConnect is None:
+        from kiteconnect import KiteConnect
+    return KiteConnect
+
+
+def _is_rate_limited(error):
+    return getattr(error, "code", None) == 429 or "too many requests" in str(error).lower()
+
+
+def _latency_summary(latencies):
+    """Return ``count/p50/p95/max`` of request latencies in milliseconds."""
+    if not latencies:
+        return "no requests"
+    ordered = sorted(latencies)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return (f"{len(ordered)} requests, p50 {pick(0.5):.0f} ms, "
+            f"p95 {pick(0.95):.0f} ms, max {ordered[-1] * 1000:.0f} ms")
+
+
 class ZerodhaKiteClient:
-    def __init__(self, api_key, api_secret, access_token):
+    def __init__(self, api_key, api_secret, access_token, store=None,
+                 rate_limit=HISTORICAL_RATE_LIMIT, kite=None, instrument_path=INSTRUMENT_PATH):
         self.api_key = api_key
         self.api_secret = api_secret
         self.access_token = access_token
-        self.kite = KiteConnect(api_key=self.api_key)
-        self.kite.set_access_token(self.access_token)
-        self.instrument_cache = self.build_token_cache()
+        # Optional :class:`data.ohlc_store.OHLCStore`; when set, historical
+        # bars are served from disk and only the missing tail is downloaded.
+        self.store = store
+        self.limiter = TokenBucket(rate_limit)
+        self.api_calls = 0
+        self.latencies = []
+        self._stats_lock = threading.Lock()
+        # ``kite`` may be any KiteConnect-compatible object, e.g.
+        # :class:`data.live_fetch.offline_kite.OfflineKiteConnect`.
+        self._kite = None
+        self._lazy_lock = threading.RLock()
+        if kite is not None:
+            self._kite = kite
+            self._kite.set_access_token(self.access_token)
+        self.instrument_path = instrument_path
+        self.instruments = None
+        self._instrument_cache = None
+
+    @property
+    def kite(self):
+        """The KiteConnect session, created on first use."""
+        if self._kite is None:
+            with self._lazy_lock:
+                if self._kite is None:
+                    kite = _kite_connect()(api_key=self.api_key, pool=HTTP_POOL)
+                    kite.set_access_token(self.access_token)
+                    self._kite = kite
+        return self._kite
+
+    @property
+    def instrument_cache(self):
+        """Symbol → token map, loaded on first use so that runs served from
+        the OHLC store never touch the instrument dump."""
+        if self._instrument_cache is None:
+            with self._lazy_lock:
+                if self._instrument_cache is None:
+                    self._instrument_cache = self.build_token_cache()
+        return self._instrument_cache
 
     def build_token_cache(self):
-        print("[INFO] Building instrument token cache...")
-        try:
-            instruments = self.kite.instruments()
-        except Exception as e:
-            print(f"[WARN] Failed to fetch instruments: {e}")
-            return {}
-
-        print("[DEBUG] Sampling index instruments:")
-        for item in instruments:
-            if item['instrument_type'] == 'Index':
-                print(f"{item['tradingsymbol']} | {item['name']} → {item['instrument_token']}")
-
-        token_map = {}
-        for item in instruments:
-            if item['instrument_type'] in ['EQ', 'Index'] and item['exchange'] in ['NSE', 'NFO']:
-                token_map[item['tradingsymbol']] = item['instrument_token']
-        print(f"[✅] Cached {len(token_map)} tradable tokens.")
+        self.instruments = InstrumentMaster.load(self.kite, self.instrument_path)
+        token_map = self.instruments.token_map()
+        log.info("[✅] Cached %d tradable tokens (instrument master of %s).",
+                 len(token_map), self.instruments.fetched_on)
         return token_map
 
     def fetch_instrument_token(self, symbol):
@@ -65,15 +122,12 @@ class ZerodhaKiteClient:
 
         mapped_name = index_aliases.get(symbol, symbol)
 
-        try:
-            for item in self.kite.instruments():
-                if item.get('name', '').upper() == mapped_name.upper() and item.get('instrument_type', '').upper() == 'INDEX':
-                    token = item['instrument_token']
-                    self.instrument_cache[symbol] = token
-                    print(f"[DYNAMIC ✅] Resolved index token for '{symbol}' → {token}")
-                    return token
-        except Exception as e:
-            print(f"[ERROR] Failed to resolve token from instruments for {symbol}: {e}")
+        if self.instruments is not None:
+            token = self.instruments.index_token(mapped_name)
+            if token:
+                self.instrument_cache[symbol] = token
+                log.debug("[DYNAMIC ✅] Resolved index token for '%s' → %s", symbol, token)
+                return token
 
         manual_index_tokens = {
             "NIFTY": 256265,
@@ -91,37 +145,48 @@ class ZerodhaKiteClient:
 
         if symbol in manual_index_tokens:
             token = manual_index_tokens[symbol]
-            print(f"[HARDCODE ✅] Used static token for {symbol} → {token}")
+            log.debug("[HARDCODE ✅] Used static token for %s → %s", symbol, token)
             return token
 
-        print(f"[❌] No token found for {symbol}")
+        log.warning("[❌] No token found for %s", symbol)
         return None
 
     def fetch_historical_ohlc(self, symbol, from_date, to_date, interval="day"):
+        missing = None
+        if self.store is not None:
+            missing = self.store.missing_ranges(symbol, from_date, to_date, interval)
+            if not missing:
+                # Fully cached: no token lookup, no request.
+                return self.store.read(symbol, interval, start=from_date, end=to_date)
+
         token = self.fetch_instrument_token(symbol)
-        print(f"[FETCH] {symbol} OHLC from {from_date} to {to_date} → Token: {token}")
+        log.debug("[FETCH] %s OHLC from %s to %s → Token: %s", symbol, from_date, to_date, token)
 
         if not token:
             return pd.DataFrame()
 
-        kite = KiteConnect(api_key=self.api_key)
-        kite.set_access_token(self.access_token)
+        if self.store is None:
+            df = self._download(symbol, token, from_date, to_date, interval)
+            return pd.DataFrame() if df is None else df
+
+        for start, end in missing:
+            df = self._download(symbol, token, start, end, interval)
+            if df is not None:
+                self.store.write(symbol, interval, df, requested_from=start, fetched_to=end)
+        return self.store.read(symbol, interval, start=from_date, end=to_date)
 
+    def _download(self, symbol, token, from_date, to_date, interval):
+        """Fetch bars from Kite; returns ``None`` if the request itself failed."""
         try:
-            data = kite.historical_data(
-                instrument_token=token,
-                from_date=from_date,
-                to_date=to_date,
-                interval=interval
-            )
+            data = self._historical_data(token, from_date, to_date, interval)
 
             if not data:
-                print(f"[EMPTY] {symbol}")
+                log.debug("[EMPTY] %s", symbol)
                 return pd.DataFrame()
 
             df = pd.DataFrame(data)
             if 'close' not in df.columns:
-                print(f"[ERROR] {symbol}: Missing 'close' column.")
+                log.error("[ERROR] %s: Missing 'close' column.", symbol)
                 return pd.DataFrame()
 
             df['date'] = pd.to_datetime(df['date'])
@@ -129,29 +194,82 @@ class ZerodhaKiteClient:
             return df
 
         except Exception as e:
-            print(f"[FAIL] {symbol}: {e}")
-            return pd.DataFrame()
+            log.warning("[FAIL] %s: %s", symbol, e)
+            return None
+
+    def _historical_data(self, token, from_date, to_date, interval):
+        """Rate-limited ``historical_data`` call with backoff on HTTP 429."""
+        for attempt in range(MAX_RETRIES + 1):
+            self.limiter.acquire()
+            started = time.perf_counter()
+            try:
+                data = self.kite.historical_data(
+                    instrument_token=token,
+                    from_date=from_date,
+                    to_date=to_date,
+                    interval=interval
+                )
+            except Exception as e:
+                if not _is_rate_limited(e) or attempt == MAX_RETRIES:
+                    metrics.count("kite.historical_errors")
+                    raise
+                metrics.count("kite.historical_throttled")
+                log.info("[THROTTLED] Rate limited, backing off (attempt %d)", attempt + 1)
+                self.limiter.throttled()
+                continue
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._stats_lock:
+                    self.api_calls += 1
+                    self.latencies.append(elapsed)
+                metrics.count("kite.historical_calls")
+                metrics.observe("kite.historical_seconds", elapsed)
+            self.limiter.succeeded()
+            return data
+
+    def fetch_multiple_ohlc(self, symbol_list, workers=4, start=None, end=None):
+        if not start or not end:
+            today = datetime.now().date()
+            days_of_data = 50
+            holiday_buffer = 30
+            start = today - timedelta(days=days_of_data + holiday_buffer)
+            end = today
 
-    def fetch_multiple_ohlc(self, symbol_list):
-        today = datetime.now().date()
-        days_of_data = 50
-        holiday_buffer = 30
-        start = today - timedelta(days=days_of_data + holiday_buffer)
-        end = today
+        symbol_list = list(symbol_list)
+        log.info("[INFO] Fetching OHLCV for %d symbols from %s to %s", len(symbol_list), start, end)
 
-        print(f"[INFO] Fetching OHLCV for {len(symbol_list)} symbols from {start} to {end}")
-        data_dict = {}
+        # Requests are paced by ``self.limiter``; the worker threads only
+        # overlap network latency, so the quota sets the overall speed.
+        calls_at_start = len(self.latencies)
 
-        for symbol in symbol_list:
+        def fetch(symbol):
+            started = time.perf_counter()
             df = self.fetch_historical_ohlc(symbol, start, end)
+            metrics.observe("fetch.symbol_seconds", time.perf_counter() - started)
+            return df
+
+        with metrics.span("fetch.ohlc", symbols=len(symbol_list)):
+            if workers and workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    frames = list(pool.map(fetch, symbol_list))
+            else:
+                frames = [fetch(symbol) for symbol in symbol_list]
+
+        data_dict = {}
+        skipped = []
+        for symbol, df in zip(symbol_list, frames):
             if not df.empty:
                 data_dict[symbol] = df
-                print(f"[✅] {symbol}: {len(df)} rows")
+                log.debug("[✅] %s: %d rows", symbol, len(df))
             else:
-                print(f"[SKIP] No data for {symbol}")
-            time.sleep(0.4)  # Respect rate limits
-
-        print(f"[✅] Fetched data for {len(data_dict)} symbols.")
+                skipped.append(symbol)
+                log.debug("[SKIP] No data for %s", symbol)
+
+        log.info("[✅] Fetched data for %d symbols (%s).", len(data_dict),
+                 _latency_summary(self.latencies[calls_at_start:]))
+        if skipped:
+            log.info("[SKIP] No data for %d symbols: %s", len(skipped), ", ".join(skipped[:10])
+                     + (" ..." if len(skipped) > 10 else ""))
         return data_dict
 
     def fetch_index_data(self, index_symbol='NIFTY', start=None, end=None):
@@ -160,9 +278,9 @@ class ZerodhaKiteClient:
             start = end - timedelta(days=50)
         index_df = self.fetch_historical_ohlc(index_symbol, start, end)
         if index_df.empty:
-            print(f"[❌] Failed to fetch index data for {index_symbol}")
+            log.warning("[❌] Failed to fetch index data for %s", index_symbol)
         else:
-            print(f"[✅] Index {index_symbol}: {len(index_df)} rows")
+            log.info("[✅] Index %s: %d rows", index_symbol, len(index_df))
         return index_df
 
     def fetch_live_prices(self, symbols):
@@ -189,10 +307,12 @@ class ZerodhaKiteClient:
         if not tokens:
             return {}
 
+        metrics.count("kite.quote_calls")
         try:
             quotes = self.kite.quote(tokens.values())
         except Exception as e:  # pragma: no cover - network or auth issue
-            print(f"[WARN] Failed to fetch live prices: {e}")
+            metrics.count("kite.quote_errors")
+            log.warning("[WARN] Failed to fetch live prices: %s", e)
             return {}
 
         prices = {}
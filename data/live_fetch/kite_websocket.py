@@ -2,58 +2,185 @@ try:
     from kiteconnect import KiteTicker
 except Exception:  # pragma: no cover - optional dependency may be missing
     KiteTicker = None
-from broker.zerodha import DummyWebSocket
 import time
 import threading
 
+from tools.log import get_logger
+
+log = get_logger(__name__)
+
+# Distinct symbols that may wait for the consumer before new ones are dropped.
+MAX_PENDING = 10000
+
+
+class TickDispatcher:
+    """Deliver prices to a callback from a dedicated consumer thread.
+
+    The socket thread only merges ``{symbol: price}`` updates into a pending
+    dict, so a slow callback never blocks it. A symbol that is still pending
+    is overwritten with its latest price (coalesced); once ``max_pending``
+    distinct symbols are waiting, updates for new symbols are dropped.
+    """
+
+    def __init__(self, callback, max_pending=MAX_PENDING):
+        self.callback = callback
+        self.max_pending = max_pending
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        self.received = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="tick-dispatcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, data):
+        with self._cond:
+            for sym, price in data.items():
+                self.received += 1
+                if sym in self._pending:
+                    self.coalesced += 1
+                elif len(self._pending) >= self.max_pending:
+                    self.dropped += 1
+                    continue
+                self._pending[sym] = price
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._pending:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, {}
+            self._deliver(batch)
+
+    def _deliver(self, batch):
+        try:
+            self.callback(batch)
+        except Exception as e:
+            self.errors += 1
+            log.error("[ERROR] Tick callback failed: %s", e)
+        self.delivered += len(batch)
+
+    def stop(self, flush=True, timeout=1.0):
+        """Stop the consumer, delivering anything still pending when ``flush``."""
+        with self._cond:
+            self._running = False
+            if not flush:
+                self._pending = {}
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def stats(self):
+        return {
+            'received': self.received,
+            'delivered': self.delivered,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped,
+            'errors': self.errors,
+        }
+
 
 class LivePriceStreamer:
-    """Stream live prices using KiteTicker with a fallback DummyWebSocket."""
+    """Stream live prices using KiteTicker with a fallback DummyWebSocket.
 
-    def __init__(self, api_key, access_token, token_map):
+    ``ticker`` may be a KiteTicker-compatible object to use instead of
+    connecting to Kite, e.g. :class:`data.live_fetch.offline_kite.OfflineKiteTicker`.
+    """
+
+    def __init__(self, api_key, access_token, token_map, max_pending=MAX_PENDING, ticker=None):
         self.api_key = api_key
         self.access_token = access_token
         self.token_map = token_map
-        self.ticker = None
+        self.max_pending = max_pending
+        self.ticker = ticker
         self.dummy = None
+        self.dispatcher = None
+        self.tick_listeners = []
+        # Several aliases may share one token (e.g. "NIFTY" and "NIFTY 50").
+        self.symbols_by_token = {}
+        for sym, tok in token_map.items():
+            self.symbols_by_token.setdefault(tok, []).append(sym)
+
+    def add_tick_listener(self, listener):
+        """Call ``listener(symbol, tick)`` for every raw tick on the socket thread.
+
+        Unlike the ``start`` callback, listeners see every tick (nothing is
+        coalesced), which bar aggregation needs. They must return quickly.
+        """
+        self.tick_listeners.append(listener)
+
+    def _dummy_feed(self, deliver):
+        """Wrap ``deliver`` so DummyWebSocket prices also reach tick listeners."""
+        def feed(data):
+            for sym, price in data.items():
+                tick = {"last_price": price}
+                for listener in self.tick_listeners:
+                    listener(sym, tick)
+            deliver(data)
+        return feed
+
+    def _start_dummy(self, symbols, deliver):
+        # The broker package is only needed for this fallback feed.
+        try:
+            from broker.zerodha import DummyWebSocket
+        except ImportError as e:
+            log.error("[ERROR] No fallback feed available: %s", e)
+            return
+        self.dummy = DummyWebSocket(symbols)
+        self.dummy.start(self._dummy_feed(deliver))
 
     def _parse_ticks(self, ticks):
         data = {}
         for t in ticks:
-            token = t.get("instrument_token")
             price = t.get("last_price")
-            for sym, tok in self.token_map.items():
-                if tok == token:
-                    data[sym] = price
+            for sym in self.symbols_by_token.get(t.get("instrument_token"), ()):
+                data[sym] = price
+                for listener in self.tick_listeners:
+                    listener(sym, t)
         return data
 
     def start(self, symbols, callback):
         tokens = [self.token_map.get(s) for s in symbols if s in self.token_map]
         tokens = [t for t in tokens if t]
-        if KiteTicker is None:
-            print("[WARN] KiteTicker unavailable. Using DummyWebSocket.")
-            self.dummy = DummyWebSocket(symbols)
-            self.dummy.start(callback)
+        self.dispatcher = TickDispatcher(callback, self.max_pending).start()
+        deliver = self.dispatcher.submit
+        if KiteTicker is None and self.ticker is None:
+            log.warning("[WARN] KiteTicker unavailable. Using DummyWebSocket.")
+            self._start_dummy(symbols, deliver)
             return
         try:
-            self.ticker = KiteTicker(self.api_key, self.access_token)
+            if self.ticker is None:
+                self.ticker = KiteTicker(self.api_key, self.access_token)
 
             def on_ticks(ws, ticks):
                 data = self._parse_ticks(ticks)
                 if data:
-                    callback(data)
+                    deliver(data)
 
             def on_connect(ws, resp):
                 if tokens:
                     ws.subscribe(tokens)
+                    if self.tick_listeners:
+                        # Full mode carries exchange timestamps for bar building.
+                        ws.set_mode(ws.MODE_FULL, tokens)
 
             self.ticker.on_ticks = on_ticks
             self.ticker.on_connect = on_connect
             self.ticker.connect(threaded=True)
         except Exception as e:
-            print(f"[WARN] Live websocket failed: {e}. Using DummyWebSocket.")
-            self.dummy = DummyWebSocket(symbols)
-            self.dummy.start(callback)
+            log.warning("[WARN] Live websocket failed: %s. Using DummyWebSocket.", e)
+            self._start_dummy(symbols, deliver)
 
     def stop(self):
         if self.ticker:
@@ -63,6 +190,14 @@ class LivePriceStreamer:
                 pass
         if self.dummy:
             self.dummy.stop()
+        if self.dispatcher:
+            self.dispatcher.stop()
+            stats = self.dispatcher.stats()
+            log.info("[INFO] Ticks: %d received, %d coalesced, %d dropped",
+                     stats['received'], stats['coalesced'], stats['dropped'])
+
+    def stats(self):
+        return self.dispatcher.stats() if self.dispatcher else {}
 
     def snapshot(self, symbols, timeout=2):
         """Return a snapshot of prices for ``symbols`` collected over ``timeout`` seconds."""
@@ -0,0 +1,526 @@
+# rs_outperformance_kite_system/data/live_fetch/offline_kite.py
+
+"""Offline stand-ins for ``KiteConnect`` and ``KiteTicker``.
+
+:class:`OfflineMarket` holds the bars and the moving last prices;
+:class:`OfflineKiteConnect` serves ``instruments``, ``historical_data``,
+``quote``, ``ltp``, ``orders``/``positions`` and paper ``place_order`` from it,
+and :class:`OfflineKiteTicker` streams ticks in the same shape as the real
+websocket. :class:`OfflineBroker` fills the paper trader's orders in place
+of ``broker.zerodha.ZerodhaBroker``. Every REST call goes through per-endpoint rate limits, an optional
+latency and random error injection, so the fetch pipeline, streamer and paper
+trader can be load-tested without credentials or network access:
+
+    market = OfflineMarket.synthetic(500)
+    client = offline_client(market, latency=0.05, error_rate=0.01)
+    streamer = LivePriceStreamer(None, None, client.instrument_cache,
+                                 ticker=OfflineKiteTicker(market))
+"""
+
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from tools.log import get_logger
+
+try:
+    from kiteconnect.exceptions import InputException, NetworkException
+except Exception:  # pragma: no cover - optional dependency may be missing
+    class KiteException(Exception):
+        def __init__(self, message, code=500):
+            super().__init__(message)
+            self.code = code
+
+    class InputException(KiteException):
+        def __init__(self, message, code=400):
+            super().__init__(message, code)
+
+    class NetworkException(KiteException):
+        def __init__(self, message, code=503):
+            super().__init__(message, code)
+
+log = get_logger(__name__)
+
+# Requests per second per endpoint, as documented by Kite Connect.
+RATE_LIMITS = {'historical': 3, 'quote': 1, 'order': 10, 'default': 10}
+# Longest date range a single historical request may span, in days.
+MAX_RANGE_DAYS = {
+    'minute': 60, '3minute': 100, '5minute': 100, '10minute': 100,
+    '15minute': 200, '30minute': 200, '60minute': 400, 'day': 2000,
+}
+FIRST_TOKEN = 100001
+
+
+class OfflineMarket:
+    """Bars, instruments and live prices shared by the offline REST and ticker.
+
+    ``bars`` maps symbols to daily OHLCV frames; ``intraday`` optionally maps a
+    Kite interval name (``"5minute"``) to ``{symbol: frame}``. Symbols in
+    ``index_symbols`` are listed as indices. Live prices start at the last
+    close and take a random-walk step of ``volatility`` per :meth:`step`.
+    With ``start_time`` the market runs on a simulated clock moved by
+    :meth:`advance`; otherwise it uses the wall clock.
+    """
+
+    def __init__(self, bars, intraday=None, index_symbols=("NIFTY",), volatility=0.002, seed=0,
+                 start_time=None):
+        self.bars = {'day': dict(bars)}
+        self.bars.update({k: dict(v) for k, v in (intraday or {}).items()})
+        self.index_symbols = set(index_symbols)
+        self.volatility = volatility
+        self._rng = random.Random(seed)
+        self._clock = pd.Timestamp(start_time).to_pydatetime() if start_time is not None else None
+        self._lock = threading.Lock()
+
+        self.tokens = {sym: FIRST_TOKEN + i for i, sym in enumerate(self.bars['day'])}
+        self.symbols = {tok: sym for sym, tok in self.tokens.items()}
+        self.prices = {}
+        self.day_ohlc = {}
+        self.volume = {}
+        for sym, df in self.bars['day'].items():
+            last = round(float(df['close'].iloc[-1]), 2) if len(df) else 0.0
+            self.prices[sym] = last
+            self.day_ohlc[sym] = {'open': last, 'high': last, 'low': last, 'close': last}
+            self.volume[sym] = 0
+
+    @classmethod
+    def synthetic(cls, n_symbols=500, periods=250, regime='bull', seed=0, index_symbol="NIFTY", **kwargs):
+        """Build a market from :func:`tools.synthetic.generate_universe`.
+
+        The bars end on the last business day before today, so the clients'
+        default "last N days" requests find data.
+        """
+        from tools.synthetic import generate_universe
+
+        start = pd.bdate_range(end=pd.Timestamp.today().normalize() - pd.offsets.BDay(1),
+                               periods=periods)[0]
+        stock_data, index_df = generate_universe(n_symbols, periods, regime=regime, seed=seed,
+                                                 start=start)
+        stock_data[index_symbol] = index_df
+        return cls(stock_data, index_symbols=(index_symbol,), seed=seed, **kwargs)
+
+    @classmethod
+    def from_store(cls, store, symbols, index_symbols=("NIFTY",), intervals=("day",), **kwargs):
+        """Build a market from bars recorded in an :class:`OHLCStore`."""
+        frames = {iv: {} for iv in intervals}
+        for interval in intervals:
+            for sym in list(symbols) + [s for s in index_symbols if s not in symbols]:
+                df = store.read(sym, interval)
+                if not df.empty:
+                    frames[interval][sym] = df
+        daily = frames.pop('day', {})
+        return cls(daily, intraday=frames, index_symbols=index_symbols, **kwargs)
+
+    def now(self):
+        return self._clock if self._clock is not None else datetime.now()
+
+    def advance(self, seconds):
+        """Move the simulated clock forward (no-op on the wall clock)."""
+        if self._clock is not None:
+            with self._lock:
+                self._clock += timedelta(seconds=seconds)
+
+    def instruments(self):
+        return [
+            {
+                'instrument_token': tok,
+                'exchange_token': tok // 256,
+                'tradingsymbol': sym,
+                'name': sym,
+                'instrument_type': 'Index' if sym in self.index_symbols else 'EQ',
+                'segment': 'INDICES' if sym in self.index_symbols else 'NSE',
+                'exchange': 'NSE',
+                'tick_size': 0.05,
+                'lot_size': 1,
+                'last_price': self.prices[sym],
+            }
+            for sym, tok in self.tokens.items()
+        ]
+
+    def step(self, symbols=None):
+        """Random-walk the price of ``symbols`` (default all) and return them."""
+        with self._lock:
+            for sym in symbols if symbols is not None else list(self.prices):
+                price = round(self.prices[sym] * (1 + self._rng.gauss(0, self.volatility)), 2)
+                self.prices[sym] = price
+                ohlc = self.day_ohlc[sym]
+                ohlc['high'] = max(ohlc['high'], price)
+                ohlc['low'] = min(ohlc['low'], price)
+                if sym not in self.index_symbols:
+                    self.volume[sym] += self._rng.randint(1, 500)
+        return symbols
+
+    def tick(self, sym, mode='full'):
+        """Return a KiteTicker-style tick dict for ``sym``."""
+        tick = {
+            'instrument_token': self.tokens[sym],
+            'mode': mode,
+            'tradable': sym not in self.index_symbols,
+            'last_price': self.prices[sym],
+        }
+        if mode != 'ltp':
+            tick.update(volume_traded=self.volume[sym], ohlc=dict(self.day_ohlc[sym]),
+                        change=0.0)
+        if mode == 'full':
+            now = self.now()
+            tick.update(exchange_timestamp=now, last_trade_time=now)
+        return tick
+
+    def history(self, symbol, interval):
+        return self.bars.get(interval, {}).get(symbol)
+
+
+class _RateLimiter:
+    """Sliding one-second window per endpoint; excess calls are rejected."""
+
+    def __init__(self, limits):
+        self.limits = limits
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def allow(self, endpoint):
+        limit = self.limits.get(endpoint, self.limits.get('default'))
+        if not limit:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            window = self._calls.setdefault(endpoint, deque())
+            while window and now - window[0] >= 1.0:
+                window.popleft()
+            if len(window) >= limit:
+                return False
+            window.append(now)
+            return True
+
+
+class OfflineKiteConnect:
+    """In-process replacement for :class:`kiteconnect.KiteConnect`.
+
+    ``rate_limits`` maps endpoint (``historical``, ``quote``, ``order``,
+    ``default``) to requests per second; a call over the limit raises a
+    429 ``NetworkException`` as Kite does. ``latency`` (+ up to ``jitter``)
+    seconds are slept per call, and ``error_rate`` (a float, or a dict per
+    endpoint) is the chance a call fails with a 503.
+    """
+
+    def __init__(self, market, rate_limits=None, latency=0.0, jitter=0.0, error_rate=0.0, seed=0,
+                 api_key=None, **kwargs):
+        self.market = market
+        self.api_key = api_key
+        self.access_token = None
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.limiter = _RateLimiter(dict(RATE_LIMITS, **(rate_limits or {})))
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._order_ids = itertools.count(1)
+        self._orders = []
+        self.calls = {}
+        self.rejected = 0
+        self.errors = 0
+
+    def set_access_token(self, access_token):
+        self.access_token = access_token
+
+    def _call(self, endpoint):
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            rate = self.error_rate.get(endpoint, 0.0) if isinstance(self.error_rate, dict) else self.error_rate
+            fail = rate and self._rng.random() < rate
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if not self.limiter.allow(endpoint):
+            with self._lock:
+                self.rejected += 1
+            raise NetworkException("Too many requests", code=429)
+        if delay:
+            time.sleep(delay)
+        if fail:
+            with self._lock:
+                self.errors += 1
+            raise NetworkException("Injected offline error", code=503)
+
+    def stats(self):
+        return {'calls': dict(self.calls), 'rejected': self.rejected, 'errors': self.errors}
+
+    def instruments(self, exchange=None):
+        self._call('default')
+        items = self.market.instruments()
+        return [i for i in items if i['exchange'] == exchange] if exchange else items
+
+    def historical_data(self, instrument_token, from_date, to_date, interval, continuous=False, oi=False):
+        self._call('historical')
+        start, end = pd.Timestamp(from_date), pd.Timestamp(to_date)
+        max_days = MAX_RANGE_DAYS.get(interval)
+        if max_days is None:
+            raise InputException(f"Invalid interval: {interval}")
+        if (end - start).days > max_days:
+            raise InputException("interval exceeds max limit: %d days" % max_days)
+
+        symbol = self.market.symbols.get(int(instrument_token))
+        df = self.market.history(symbol, interval) if symbol else None
+        if df is None or df.empty:
+            return []
+        # Compare in exchange-local wall time; a bare date covers the whole day.
+        tz = df.index.tz
+        index = df.index.tz_localize(None) if tz is not None else df.index
+        start, end = (t.tz_convert(tz).tz_localize(None) if t.tz is not None and tz is not None
+                      else t.tz_localize(None) for t in (start, end))
+        if end == end.normalize():
+            end += pd.Timedelta(days=1) - pd.Timedelta(1)
+        rows = df[(index >= start) & (index <= end)]
+        cols = [c for c in ('open', 'high', 'low', 'close', 'volume') if c in rows.columns]
+        records = rows[cols].to_dict('records')
+        for ts, record in zip(rows.index, records):
+            record['date'] = ts.to_pydatetime()
+        return records
+
+    def _resolve(self, instruments):
+        if isinstance(instruments, (str, int)):
+            instruments = [instruments]
+        resolved = {}
+        for key in instruments:
+            if isinstance(key, str) and not key.isdigit():
+                sym = key.split(":", 1)[-1]
+            else:
+                sym = self.market.symbols.get(int(key))
+            if sym in self.market.tokens:
+                resolved[str(key)] = sym
+        return resolved
+
+    def quote(self, *instruments):
+        self._call('quote')
+        keys = instruments[0] if len(instruments) == 1 else instruments
+        quotes = {}
+        for key, sym in self._resolve(keys).items():
+            tick = self.market.tick(sym, mode='full')
+            quotes[key] = {
+                'instrument_token': tick['instrument_token'],
+                'timestamp': tick['exchange_timestamp'],
+                'last_price': tick['last_price'],
+                'volume': tick['volume_traded'],
+                'ohlc': tick['ohlc'],
+            }
+        return quotes
+
+    def ltp(self, *instruments):
+        self._call('quote')
+        keys = instruments[0] if len(instruments) == 1 else instruments
+        return {
+            key: {'instrument_token': self.market.tokens[sym], 'last_price': self.market.prices[sym]}
+            for key, sym in self._resolve(keys).items()
+        }
+
+    def place_order(self, variety, exchange, tradingsymbol, transaction_type, quantity, product,
+                    order_type, price=None, **kwargs):
+        """Fill the order immediately at the last price (or ``price`` for limits)."""
+        self._call('order')
+        if tradingsymbol not in self.market.tokens:
+            raise InputException(f"Invalid tradingsymbol: {tradingsymbol}")
+        fill = price if order_type == 'LIMIT' and price else self.market.prices[tradingsymbol]
+        order_id = str(next(self._order_ids))
+        with self._lock:
+            self._orders.append({
+                'order_id': order_id,
+                'variety': variety,
+                'exchange': exchange,
+                'tradingsymbol': tradingsymbol,
+                'instrument_token': self.market.tokens[tradingsymbol],
+                'transaction_type': transaction_type,
+                'order_type': order_type,
+                'product': product,
+                'quantity': quantity,
+                'filled_quantity': quantity,
+                'price': price or 0,
+                'average_price': fill,
+                'status': 'COMPLETE',
+                'order_timestamp': self.market.now(),
+                'tag': kwargs.get('tag'),
+            })
+        return order_id
+
+    def orders(self):
+        self._call('default')
+        with self._lock:
+            return [dict(o) for o in self._orders]
+
+    def positions(self):
+        self._call('default')
+        net = {}
+        with self._lock:
+            orders = list(self._orders)
+        for o in orders:
+            key = (o['tradingsymbol'], o['product'])
+            pos = net.setdefault(key, {
+                'tradingsymbol': o['tradingsymbol'], 'exchange': o['exchange'],
+                'instrument_token': o['instrument_token'], 'product': o['product'],
+                'quantity': 0, 'buy_quantity': 0, 'sell_quantity': 0,
+                'buy_value': 0.0, 'sell_value': 0.0,
+            })
+            value = o['filled_quantity'] * o['average_price']
+            if o['transaction_type'] == 'BUY':
+                pos['quantity'] += o['filled_quantity']
+                pos['buy_quantity'] += o['filled_quantity']
+                pos['buy_value'] += value
+            else:
+                pos['quantity'] -= o['filled_quantity']
+                pos['sell_quantity'] += o['filled_quantity']
+                pos['sell_value'] += value
+        for pos in net.values():
+            last = self.market.prices[pos['tradingsymbol']]
+            pos['last_price'] = last
+            pos['average_price'] = pos['buy_value'] / pos['buy_quantity'] if pos['buy_quantity'] else 0.0
+            pos['pnl'] = pos['sell_value'] - pos['buy_value'] + pos['quantity'] * last
+        positions = list(net.values())
+        return {'net': positions, 'day': [dict(p) for p in positions]}
+
+
+class OfflineKiteTicker:
+    """In-process replacement for :class:`kiteconnect.KiteTicker`.
+
+    Every ``interval`` seconds the subscribed instruments take a price step
+    and one tick each is delivered to ``on_ticks``; the market's simulated
+    clock (if any) moves ``interval * speed`` seconds per step. A fraction
+    ``drop_rate`` of ticks is discarded to mimic a lossy feed.
+    """
+
+    MODE_FULL = 'full'
+    MODE_QUOTE = 'quote'
+    MODE_LTP = 'ltp'
+
+    def __init__(self, market, interval=1.0, speed=1.0, drop_rate=0.0, seed=0, *args, **kwargs):
+        self.market = market
+        self.interval = interval
+        self.speed = speed
+        self.drop_rate = drop_rate
+        self._rng = random.Random(seed)
+        self.on_ticks = None
+        self.on_connect = None
+        self.on_close = None
+        self.on_error = None
+        self.modes = {}
+        self._running = threading.Event()
+        self._thread = None
+        self.ticks_sent = 0
+
+    def subscribe(self, tokens):
+        for tok in tokens:
+            if tok in self.market.symbols:
+                self.modes.setdefault(tok, self.MODE_QUOTE)
+        return True
+
+    def unsubscribe(self, tokens):
+        for tok in tokens:
+            self.modes.pop(tok, None)
+        return True
+
+    def set_mode(self, mode, tokens):
+        for tok in tokens:
+            if tok in self.modes:
+                self.modes[tok] = mode
+        return True
+
+    def is_connected(self):
+        return self._running.is_set()
+
+    def connect(self, threaded=False, **kwargs):
+        self._running.set()
+        if self.on_connect:
+            self.on_connect(self, {})
+        if threaded:
+            self._thread = threading.Thread(target=self._run, name="offline-ticker", daemon=True)
+            self._thread.start()
+        else:
+            self._run()
+
+    def emit(self):
+        """Advance the market one step and deliver a batch of ticks."""
+        modes = dict(self.modes)
+        symbols = [self.market.symbols[tok] for tok in modes]
+        self.market.step(symbols)
+        self.market.advance(self.interval * self.speed)
+        ticks = [
+            self.market.tick(sym, mode)
+            for sym, mode in zip(symbols, modes.values())
+            if not self.drop_rate or self._rng.random() >= self.drop_rate
+        ]
+        self.ticks_sent += len(ticks)
+        if ticks and self.on_ticks:
+            try:
+                self.on_ticks(self, ticks)
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(self, 0, str(e))
+                else:
+                    log.error("[ERROR] Offline tick handler failed: %s", e)
+        return ticks
+
+    def _run(self):
+        while self._running.is_set():
+            self.emit()
+            if self.interval > 0:
+                time.sleep(self.interval)
+
+    def close(self, code=None, reason=None):
+        self._running.clear()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(max(self.interval, 0.1) * 2)
+        if self.on_close:
+            self.on_close(self, code, reason)
+
+    def stop(self):
+        self.close()
+
+
+class OfflineBroker:
+    """In-process replacement for ``broker.zerodha.ZerodhaBroker`` in paper mode.
+
+    Every order fills at once at the price given. ``orders`` lists them and
+    ``holdings`` keeps the net quantity and average buy price per symbol.
+    """
+
+    def __init__(self, mode="paper"):
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._order_ids = itertools.count(1)
+        self.orders = []
+        self.holdings = {}
+
+    def place_order(self, symbol, qty, price, side):
+        side = side.lower()
+        if side not in ('buy', 'sell'):
+            raise ValueError(f"Invalid side: {side}")
+        with self._lock:
+            order_id = str(next(self._order_ids))
+            self.orders.append({'order_id': order_id, 'symbol': symbol, 'qty': qty,
+                                'price': price, 'side': side, 'status': 'COMPLETE'})
+            holding = self.holdings.setdefault(symbol, {'qty': 0, 'avg_price': 0.0})
+            if side == 'buy':
+                cost = holding['qty'] * holding['avg_price'] + qty * price
+                holding['qty'] += qty
+                holding['avg_price'] = cost / holding['qty']
+            else:
+                holding['qty'] -= qty
+            if holding['qty'] == 0:
+                del self.holdings[symbol]
+        return order_id
+
+
+def offline_client(market, store=None, rate_limit=None, **kwargs):
+    """Return a :class:`ZerodhaKiteClient` backed by :class:`OfflineKiteConnect`.
+
+    ``rate_limit`` is the client-side pacing (defaults to the client's own);
+    other ``kwargs`` go to :class:`OfflineKiteConnect`. The instrument master
+    is built from the market and never written to the shared disk cache.
+    """
+    from data.live_fetch.kite_client import ZerodhaKiteClient
+
+    kite = OfflineKiteConnect(market, **kwargs)
+    extra = {'rate_limit': rate_limit} if rate_limit else {}
+    return ZerodhaKiteClient("offline", "offline", "offline", store=store, kite=kite,
+                             instrument_path=None, **extra)
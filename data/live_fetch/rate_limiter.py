@@ -0,0 +1,60 @@
+# rs_outperformance_kite_system/data/live_fetch/rate_limiter.py
+
+"""Thread-safe token bucket used to pace Kite Connect API calls."""
+
+import threading
+import time
+
+# Kite Connect allows 3 historical-data requests per second per API key.
+HISTORICAL_RATE_LIMIT = 3.0
+
+
+class TokenBucket:
+    """Token bucket limiter with adaptive backoff.
+
+    ``acquire`` blocks until a token is available. When the API answers with
+    HTTP 429, :meth:`throttled` halves the refill rate and pauses all callers;
+    every successful call then recovers the rate additively towards the
+    configured maximum.
+    """
+
+    def __init__(self, rate=HISTORICAL_RATE_LIMIT, capacity=1, min_rate=None):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = float(min_rate) if min_rate else self.max_rate / 8
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def throttled(self, retry_after=None):
+        """Record a rate-limit rejection and back off."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
+            pause = retry_after if retry_after else 1.0 / self.rate
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+
+    def succeeded(self):
+        """Record a successful call, slowly restoring the configured rate."""
+        if self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
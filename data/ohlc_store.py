@@ -0,0 +1,187 @@
+# rs_outperformance_kite_system/data/ohlc_store.py
+
+"""On-disk columnar store for historical OHLC bars.
+
+Bars are partitioned by interval and symbol. Each partition is a directory
+holding one ``.npy`` file per column (``date`` as int64 UTC nanoseconds plus
+``open``/``high``/``low``/``close``/``volume``) and a small ``meta.json``
+recording the timezone and how far the partition has been fetched. Columns
+are memory-mapped on read so loading a partition is cheap.
+"""
+
+import json
+import os
+from datetime import date, datetime, time as dtime, timedelta
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ROOT = os.path.join("data", "cache", "ohlc")
+PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+MARKET_CLOSE = dtime(15, 30)
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, pd.Timestamp):
+        return value.date()
+    return value
+
+
+def _day_start_ns(day, tz):
+    """UTC nanoseconds of local midnight on ``day`` (naive when ``tz`` is None)."""
+    stamp = pd.Timestamp(_as_date(day))
+    return (stamp.tz_localize(tz) if tz else stamp).value
+
+
+class OHLCStore:
+    """Persistent per-symbol bar store used by :class:`ZerodhaKiteClient`."""
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+
+    def _path(self, symbol, interval):
+        safe = symbol.upper().replace(os.sep, "_").replace(" ", "_")
+        return os.path.join(self.root, interval, safe)
+
+    def meta(self, symbol, interval="day"):
+        """Return the partition metadata, or an empty dict if nothing is stored."""
+        path = os.path.join(self._path(symbol, interval), "meta.json")
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
+
+    def read(self, symbol, interval="day", start=None, end=None):
+        """Return stored bars for ``symbol`` between ``start`` and ``end`` (inclusive dates)."""
+        meta = self.meta(symbol, interval)
+        path = self._path(symbol, interval)
+        date_file = os.path.join(path, "date.npy")
+        if not meta or not os.path.exists(date_file):
+            return pd.DataFrame()
+
+        stamps = np.load(date_file, mmap_mode="r")
+        tz = meta.get("tz")
+
+        # Slice on the raw stamps so only the requested bars become an index.
+        lo, hi = 0, len(stamps)
+        if start is not None:
+            lo = np.searchsorted(stamps, _day_start_ns(start, tz), side="left")
+        if end is not None:
+            next_day = pd.Timestamp(_as_date(end)) + pd.Timedelta(days=1)
+            hi = np.searchsorted(stamps, _day_start_ns(next_day, tz), side="left")
+        index = pd.DatetimeIndex(np.asarray(stamps[lo:hi]).view("M8[ns]"))
+        if tz:
+            index = index.tz_localize("UTC").tz_convert(tz)
+
+        data = {}
+        for col in meta.get("columns", PRICE_COLUMNS):
+            col_file = os.path.join(path, f"{col}.npy")
+            if os.path.exists(col_file):
+                data[col] = np.load(col_file, mmap_mode="r")[lo:hi]
+        df = pd.DataFrame(data, index=index)
+        df.index.name = "date"
+        return df
+
+    def write(self, symbol, interval, df, requested_from=None, fetched_to=None):
+        """Merge ``df`` into the stored partition, replacing overlapping bars."""
+        path = self._path(symbol, interval)
+        meta = self.meta(symbol, interval)
+        existing = self.read(symbol, interval)
+
+        if df is not None and not df.empty:
+            columns = [c for c in PRICE_COLUMNS if c in df.columns]
+            new = df[columns].astype(float)
+            if not existing.empty:
+                if new.index.tz is not None and existing.index.tz is not None:
+                    new.index = new.index.tz_convert(existing.index.tz)
+                existing = existing[~existing.index.isin(new.index)]
+                merged = pd.concat([existing, new]).sort_index()
+            else:
+                merged = new.sort_index()
+        else:
+            merged = existing
+
+        os.makedirs(path, exist_ok=True)
+        if not merged.empty:
+            index = merged.index
+            tz = str(index.tz) if index.tz is not None else None
+            stamps = (index.tz_convert("UTC") if tz else index).asi8
+            self._save(path, "date", stamps)
+            for col in merged.columns:
+                self._save(path, col, merged[col].to_numpy(dtype=float))
+            meta["columns"] = list(merged.columns)
+            meta["tz"] = tz
+
+        if requested_from is not None:
+            prev = meta.get("requested_from")
+            value = _as_date(requested_from).isoformat()
+            meta["requested_from"] = min(prev, value) if prev else value
+        if fetched_to is not None:
+            value = _as_date(fetched_to).isoformat()
+            if value >= meta.get("fetched_to", ""):
+                meta["fetched_to"] = value
+                meta["fetched_at"] = datetime.now().isoformat(timespec="seconds")
+
+        tmp = os.path.join(path, "meta.json.tmp")
+        with open(tmp, "w") as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, os.path.join(path, "meta.json"))
+        return merged
+
+    @staticmethod
+    def _save(path, name, values):
+        tmp = os.path.join(path, f"{name}.tmp.npy")
+        np.save(tmp, np.ascontiguousarray(values))
+        os.replace(tmp, os.path.join(path, f"{name}.npy"))
+
+    def missing_ranges(self, symbol, from_date, to_date, interval="day"):
+        """Return the ``(start, end)`` date ranges that still need fetching.
+
+        A head range is returned only when ``from_date`` is earlier than any
+        range requested before. The tail is re-fetched from the last stored
+        fetched day (which may have been a partial session) unless the
+        partition is already current for ``to_date``. Both ranges join the
+        stored span, even when ``from_date`` lies after ``fetched_to``, so the
+        partition never has an unfetched gap inside ``requested_from``..``fetched_to``.
+        """
+        from_date, to_date = _as_date(from_date), _as_date(to_date)
+        meta = self.meta(symbol, interval)
+        if not meta.get("fetched_to"):
+            return [(from_date, to_date)]
+
+        ranges = []
+        requested_from = date.fromisoformat(meta["requested_from"])
+        fetched_to = date.fromisoformat(meta["fetched_to"])
+        if from_date < requested_from:
+            ranges.append((from_date, requested_from - timedelta(days=1)))
+
+        if not self._is_current(meta, to_date):
+            ranges.append((fetched_to, to_date))
+        return ranges
+
+    @staticmethod
+    def _is_current(meta, to_date):
+        fetched_to = date.fromisoformat(meta["fetched_to"])
+        fetched_at = datetime.fromisoformat(meta["fetched_at"])
+        if to_date < fetched_to:
+            return True
+
+        # Bars fetched for a session that had not closed yet must be refreshed.
+        settled = fetched_at.date() > fetched_to or fetched_at.time() >= MARKET_CLOSE
+        if not settled:
+            return False
+        if to_date == fetched_to:
+            return True
+
+        # Nothing new can exist if every later day falls on a weekend.
+        day = fetched_to + timedelta(days=1)
+        while day <= to_date:
+            if day.weekday() < 5:
+                return False
+            day += timedelta(days=1)
+        return True
@@ -1,115 +1,202 @@
 # rs_outperformance_kite_system/main.py
 
-from data.live_fetch.kite_client import ZerodhaKiteClient
-from strategy.rs_entry_engine import run_daily_entry_engine
-from output.trade_list_exporter import save_trade_report
-from output.telegram_bot import send_telegram_message, send_file_to_telegram
-from tools.charting import plot_rs_chart
-from core.rs_calculator import add_ama, add_donchian_channel
-
-import yaml
-
-from tools.secrets import load_secrets
-from datetime import datetime, timedelta
-
-# Load config and secrets
-secrets = load_secrets()
-
-with open("config/params.yaml", "r") as f:
-    config = yaml.safe_load(f)
-
-# Credentials
-api_key = secrets['kite_api_key']
-api_secret = secrets['kite_api_secret']
-access_token = secrets['kite_access_token']
-
-# Initialize Kite
-kite = ZerodhaKiteClient(api_key, api_secret, access_token)
-
-# Load symbols from params.yaml
-symbols = config.get('stock_list', [])
-index_symbol = config.get('index_symbol', 'NIFTY')
-top_n = config.get('top_n', 50)
-use_sector_filter = config.get('use_sector_filter', True)
-print(f"[📦] Loaded {len(symbols)} symbols from config.")
-
-# Define date range for OHLC
-days_of_data = 50
-holiday_buffer = 30
-today = datetime.now().date()
-start = today - timedelta(days=days_of_data + holiday_buffer)
-end = today
-print(f"[🗓️] Date range: {start} to {end}")
-
-# Step 1: Fetch OHLCV Data
-print("[INFO] Fetching stock data...")
-stock_data_dict = kite.fetch_multiple_ohlc(symbols)
-
-print("[INFO] Fetching index data...")
-index_df = kite.fetch_index_data(index_symbol, start=start, end=end)
-
-# Step 2: Run RS Screener
-print("[INFO] Running RS entry screener...")
-entry_df = run_daily_entry_engine(
-    api_key, api_secret, access_token,
-    stock_data_dict=stock_data_dict,
-    index_df=index_df,
-    top_n=top_n,
-    use_sector_filter=use_sector_filter
-)
-
-# Step 3: Save Report + Charts + Telegram
-if not entry_df.empty:
-    save_trade_report(entry_df, report_name="RS_Trade_List", filetype="xlsx", send_telegram=True)
-
-    for _, row in entry_df.iterrows():
-        symbol = row['symbol']
-        pattern = row['RS Pattern']
-        alpha = row['RS Alpha']
-        fusion = row.get('Fusion Score', '?')
-        volume_ok = row.get('Volume Confirm', False)
-        volume_text = "✅ Confirmed" if volume_ok else "❌ Weak"
-
-        stock_df = stock_data_dict[symbol]  # ✅ This must come before using stock_df
-        latest_price = stock_df['close'].iloc[-1]
-
-        # Ensure required indicators are available
-        stock_df = add_ama(stock_df)
-        stock_df = add_donchian_channel(stock_df)
-
-        try:
-            close = stock_df['close'].iloc[-1]
-            ama = stock_df['ama'].iloc[-1]
-            donchian_high = stock_df['donchian_high'].iloc[-1]
-            swing_low = stock_df['low'].rolling(window=5).min().iloc[-1]
-            target = round(donchian_high * 1.01, 2)
-            stoploss = round(min(ama, swing_low), 2)
-            message = (
-                f"🚀 RS Entry: {symbol}\n"
-                f"📊 Pattern: {pattern}\n"
-                f"📈 Alpha: {alpha:.4f}\n"
-                f"🧠 Fusion Score: {fusion}/5\n\n"
-                f"📦 Volume: {volume_text}\n"
-                f"💰 Current: ₹{latest_price} (Latest Close)\n"
-                f"✅ Decision: ENTRY CANDIDATE\n\n"
-                f"🎯 Target: ₹{target} (Donchian High + buffer)\n"
-                f"🛡️ Stoploss: ₹{stoploss} (Below AMA or last swing low)"
-            )
-        except Exception as e:
-            print(f"[ERROR] Message formatting failed for {symbol}: {e}")
-            message = (
-                f"⚠️ RS Entry: {symbol}\n"
-                f"Pattern: {pattern}\n"
-                f"Alpha: {alpha:.4f}"
-            )
-
-        send_telegram_message(message)
-
-        #chart_path = plot_rs_chart(symbol, stock_df, index_df, pattern=pattern)
-        #if chart_path:
-        #    send_file_to_telegram(chart_path)
-
-else:
-    send_telegram_message("📭 *No RS entries found today.*")
-
-print("[✅] RS System run complete.")
+"""Command line entry point for the scanner.
+
+    python main.py                    # daily RS scan (same as ``scan``)
+    python main.py backtest --start 2025-05-01 --end 2025-05-15
+    python main.py sweep
+    python main.py paper
+    python main.py --profile-startup scan
+
+Each command imports the modules it needs when it runs. ``--help``, and a scan
+served from the OHLC cache, never load matplotlib or the Kite ticker, and
+never download the instrument dump. ``--profile-startup`` prints how long
+the imports took, per module and per package.
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+
+def _entry_message(symbol, row, stock_df):
+    from core.feature_store import feature_store
+
+    pattern = row['RS Pattern']
+    alpha = row['RS Alpha']
+    fusion = row.get('Fusion Score', '?')
+    volume_ok = row.get('Volume Confirm', False)
+    volume_text = "✅ Confirmed" if volume_ok else "❌ Weak"
+    latest_price = stock_df['close'].iloc[-1]
+
+    # Ensure required indicators are available
+    stock_df = feature_store.add_indicators(symbol, stock_df)
+
+    try:
+        ama = stock_df['ama'].iloc[-1]
+        donchian_high = stock_df['donchian_high'].iloc[-1]
+        swing_low = stock_df['low'].rolling(window=5).min().iloc[-1]
+        target = round(donchian_high * 1.01, 2)
+        stoploss = round(min(ama, swing_low), 2)
+        return (
+            f"🚀 RS Entry: {symbol}\n"
+            f"📊 Pattern: {pattern}\n"
+            f"📈 Alpha: {alpha:.4f}\n"
+            f"🧠 Fusion Score: {fusion}/5\n\n"
+            f"📦 Volume: {volume_text}\n"
+            f"💰 Current: ₹{latest_price} (Latest Close)\n"
+            f"✅ Decision: ENTRY CANDIDATE\n\n"
+            f"🎯 Target: ₹{target} (Donchian High + buffer)\n"
+            f"🛡️ Stoploss: ₹{stoploss} (Below AMA or last swing low)"
+        )
+    except Exception as e:
+        print(f"[ERROR] Message formatting failed for {symbol}: {e}")
+        return (
+            f"⚠️ RS Entry: {symbol}\n"
+            f"Pattern: {pattern}\n"
+            f"Alpha: {alpha:.4f}"
+        )
+
+
+def scan(args):
+    """Run the daily RS entry scan with live (or cached) data."""
+    from core.feature_store import feature_store
+    from data.live_fetch.kite_client import ZerodhaKiteClient
+    from data.ohlc_store import OHLCStore
+    from output.telegram_bot import send_telegram_message, get_notifier
+    from output.trade_list_exporter import save_trade_report
+    from strategy.rs_entry_engine import run_daily_entry_engine
+    from tools.config import get_config
+    from tools.log import configure_from
+    from tools.metrics import metrics
+
+    # Load config and secrets
+    config = get_config()
+    params = config.params
+    secrets = config.secrets
+    configure_from(params)
+
+    # Credentials
+    api_key = secrets['kite_api_key']
+    api_secret = secrets['kite_api_secret']
+    access_token = secrets['kite_access_token']
+
+    # The client talks to Kite only for bars missing from the OHLC store.
+    kite = ZerodhaKiteClient(api_key, api_secret, access_token, store=OHLCStore())
+
+    symbols = list(params.stock_list)
+    if params.metrics:
+        metrics.enable()
+    print(f"[📦] Loaded {len(symbols)} symbols from config.")
+
+    # Define date range for OHLC
+    days_of_data = 50
+    holiday_buffer = 30
+    today = datetime.now().date()
+    start = today - timedelta(days=days_of_data + holiday_buffer)
+    end = today
+    print(f"[🗓️] Date range: {start} to {end}")
+
+    # Step 1: Fetch OHLCV Data
+    print("[INFO] Fetching stock data...")
+    stock_data_dict = kite.fetch_multiple_ohlc(symbols)
+
+    print("[INFO] Fetching index data...")
+    index_df = kite.fetch_index_data(params.index_symbol, start=start, end=end)
+
+    # Step 2: Run RS Screener
+    print("[INFO] Running RS entry screener...")
+    entry_df = run_daily_entry_engine(
+        api_key, api_secret, access_token,
+        stock_data_dict=stock_data_dict,
+        index_df=index_df,
+        top_n=params.top_n,
+        use_sector_filter=params.use_sector_filter,
+        client=kite,
+    )
+
+    # Step 3: Save Report + Charts + Telegram
+    if not entry_df.empty:
+        save_trade_report(entry_df, report_name="RS_Trade_List", filetype="xlsx", send_telegram=True)
+
+        for _, row in entry_df.iterrows():
+            symbol = row['symbol']
+            send_telegram_message(_entry_message(symbol, row, stock_data_dict[symbol]))
+
+            #from tools.charting import plot_rs_chart
+            #chart_path = plot_rs_chart(symbol, stock_data_dict[symbol], index_df, pattern=row['RS Pattern'])
+            #if chart_path:
+            #    send_file_to_telegram(chart_path)
+
+    else:
+        send_telegram_message("📭 *No RS entries found today.*")
+
+    stats = feature_store.stats()
+    print(f"[INFO] Feature cache: {stats['hits']} hits, {stats['misses']} misses "
+          f"({stats['hit_rate']:.0%} hit rate)")
+    # Alerts were queued during the run; wait for them before exiting.
+    notifier = get_notifier()
+    notifier.close()
+    print(f"[INFO] Telegram: {notifier.sent} sent, {notifier.failed} failed")
+    if metrics.enabled:
+        metrics.write_json(os.path.join("output", "metrics", f"run_report_{today}.json"))
+        metrics.write_prometheus(os.path.join("output", "metrics", "rs_scan.prom"))
+    print("[✅] RS System run complete.")
+
+
+def backtest(args):
+    """Backtest the strategy over ``--start``..``--end``."""
+    import backtest_runner
+
+    backtest_runner.run(args.start or backtest_runner.START_DATE, args.end or backtest_runner.END_DATE)
+
+
+def sweep(args):
+    """Sweep the default parameter grid with the vectorised backtester."""
+    from strategy.param_sweep import main as run_sweep
+
+    run_sweep(args.start, args.end)
+
+
+def paper(args):
+    """Paper trade the watchlist on live ticks until interrupted."""
+    import paper_trader
+
+    paper_trader.main()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="RS outperformance scanner for NSE stocks.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print an import-time breakdown when the command finishes")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    commands.add_parser("scan", help=scan.__doc__).set_defaults(func=scan)
+    for name, func in (("backtest", backtest), ("sweep", sweep)):
+        sub = commands.add_parser(name, help=func.__doc__)
+        sub.add_argument("--start", type=date.fromisoformat, help="first day, YYYY-MM-DD")
+        sub.add_argument("--end", type=date.fromisoformat, help="last day, YYYY-MM-DD")
+        sub.set_defaults(func=func)
+    commands.add_parser("paper", help=paper.__doc__).set_defaults(func=paper)
+    parser.set_defaults(func=scan)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not args.profile_startup:
+        return args.func(args)
+
+    from tools.startup import ImportProfiler
+
+    profiler = ImportProfiler()
+    try:
+        with profiler:
+            return args.func(args)
+    finally:
+        print("\n".join(profiler.report()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,48 +1,321 @@
 # rs_outperformance_kite_system/output/telegram_bot.py
 
-import requests
+"""Telegram alerts sent from a background queue over one keep-alive session.
 
-from tools.secrets import load_secrets
+:func:`send_telegram_message` and :func:`send_file_to_telegram` only enqueue
+and return at once. A worker thread collects the messages that arrive within
+``batch_window`` seconds, joins them per chat into as few messages as fit in
+Telegram's 4096-character limit, and sends them while respecting Telegram's
+rate limits: about one message per second per chat and 30 per second
+overall. A 429 reply is retried after its ``retry_after``. If Telegram
+rejects a merged batch (e.g. a Markdown entity it cannot parse), its
+alerts are re-sent one by one, and any alert rejected again is sent as
+plain text.
+"""
 
+import atexit
+import queue
+import threading
+import time
 
-def send_telegram_message(message):
-    secrets = load_secrets()
-    token = secrets['telegram_bot_token']
-    chat_ids = secrets['telegram_chat_id']
-    if isinstance(chat_ids, str):
-        chat_ids = [chat_ids]  # support single string or list
-
-    for chat_id in chat_ids:
-        url = f"https://api.telegram.org/bot{token}/sendMessage"
-        payload = {"chat_id": chat_id, "text": message, "parse_mode": "Markdown"}
-        try:
-            response = requests.post(url, data=payload)
-            if response.status_code == 200:
-                print(f"[SUCCESS] Telegram alert sent to {chat_id}.")
+from tools.log import get_logger
+from tools.config import get_config
+
+log = get_logger(__name__)
+
+API_URL = "https://api.telegram.org/bot{token}/{method}"
+MAX_MESSAGE_LENGTH = 4096
+PER_CHAT_INTERVAL = 1.0     # seconds between messages to one chat
+GLOBAL_INTERVAL = 1.0 / 30  # seconds between any two requests
+BATCH_WINDOW = 0.5
+MAX_RETRIES = 3
+SEPARATOR = "\n\n"
+
+
+def _cut_position(text, limit):
+    """Where to cut ``text`` (longer than ``limit``) without splitting a Markdown entity.
+
+    Prefers the last line break before ``limit`` that is outside ``*bold*``,
+    ``_italic_``, `` `code` `` and fenced blocks, then any such position,
+    then ``limit`` itself.
+    """
+    newline = closed = 0
+    mark, i = None, 0
+    while i < limit:
+        if mark is None:
+            closed = i
+            if text[i] == "\n":
+                newline = i
+        if text.startswith("```", i) and mark in (None, "```"):
+            mark = None if mark else "```"
+            i += 3
+            continue
+        char = text[i]
+        if mark is None and char == "\\":
+            i += 2  # escaped marker
+            continue
+        if mark is None and char in "*_`":
+            mark = char
+        elif char == mark:
+            mark = None
+        i += 1
+    if mark is None and i == limit:
+        closed = limit
+    return newline or closed or limit
+
+
+def split_message(text, limit=MAX_MESSAGE_LENGTH):
+    """Split ``text`` into chunks of at most ``limit`` characters.
+
+    Cuts at line breaks if possible, and never inside a Markdown entity
+    unless the entity alone is longer than ``limit``.
+    """
+    chunks = []
+    while len(text) > limit:
+        cut = _cut_position(text, limit)
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip("\n")
+    if text:
+        chunks.append(text)
+    return chunks
+
+
+def _batches(messages, limit=MAX_MESSAGE_LENGTH, separator=SEPARATOR):
+    batches, current, size = [], [], 0
+    for message in messages:
+        for part in split_message(message, limit):
+            if current and size + len(separator) + len(part) <= limit:
+                current.append(part)
+                size += len(separator) + len(part)
             else:
-                print(f"[ERROR] Telegram failed for {chat_id}: {response.text}")
-        except Exception as e:
-            print(f"[ERROR] Telegram exception for {chat_id}: {e}")
-
-
-def send_file_to_telegram(file_path):
-    secrets = load_secrets()
-    token = secrets['telegram_bot_token']
-    chat_ids = secrets['telegram_chat_id']
-    if isinstance(chat_ids, str):
-        chat_ids = [chat_ids]  # support single string or list
-
-    url = f"https://api.telegram.org/bot{token}/sendDocument"
-
-    for chat_id in chat_ids:
-        try:
-            with open(file_path, 'rb') as file:
-                response = requests.post(url,
-                                         data={'chat_id': chat_id},
-                                         files={'document': file})
-            if response.status_code == 200:
-                print(f"[SUCCESS] Sent file to {chat_id}: {file_path}")
+                if current:
+                    batches.append(current)
+                current, size = [part], len(part)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def coalesce(messages, limit=MAX_MESSAGE_LENGTH, separator=SEPARATOR):
+    """Join ``messages`` in order into as few texts of at most ``limit`` characters as possible."""
+    return [separator.join(parts) for parts in _batches(messages, limit, separator)]
+
+
+def _rejected(status):
+    # A 4xx other than 429 means Telegram refused this request as sent.
+    return status is not None and 400 <= status < 500 and status != 429
+
+
+class TelegramNotifier:
+    """Queue-backed Telegram sender; see the module docstring."""
+
+    def __init__(self, token, chat_ids, session=None, batch_window=BATCH_WINDOW,
+                 per_chat_interval=PER_CHAT_INTERVAL, global_interval=GLOBAL_INTERVAL,
+                 parse_mode="Markdown"):
+        self.update_credentials(token, chat_ids)
+        self.batch_window = batch_window
+        self.per_chat_interval = per_chat_interval
+        self.global_interval = global_interval
+        self.parse_mode = parse_mode
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session = session
+        self._queue = queue.Queue()
+        self._next_chat = {}
+        self._next_any = 0.0
+        self._thread = None
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+        self.enqueued = 0
+
+    def update_credentials(self, token, chat_ids):
+        self.token = token
+        self.chat_ids = [chat_ids] if isinstance(chat_ids, (str, int)) else list(chat_ids or [])
+
+    @property
+    def enabled(self):
+        return bool(self.token and self.chat_ids)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="telegram-notifier", daemon=True)
+                self._thread.start()
+
+    def notify(self, message, chat_ids=None):
+        """Queue a text message; returns immediately."""
+        self._put(('message', message, chat_ids))
+
+    def send_file(self, file_path, chat_ids=None):
+        """Queue a document upload; returns immediately."""
+        self._put(('file', file_path, chat_ids))
+
+    def _put(self, item):
+        if not self.enabled:
+            log.warning("[WARN] Telegram is not configured; dropping %s", item[0])
+            return
+        self.enqueued += 1
+        self._queue.put(item)
+        self._ensure_worker()
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far has been sent (or ``timeout`` passes)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout=30):
+        """Send what is queued, then close the HTTP session."""
+        if self._thread is not None:
+            self.flush(timeout)
+        self.session.close()
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            # Gather whatever else arrives within the batching window.
+            deadline = time.monotonic() + self.batch_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._send_batch(items)
+            except Exception as e:
+                log.error("[ERROR] Telegram worker failed: %s", e)
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    def _send_batch(self, items):
+        texts, files = {}, []
+        for kind, payload, chat_ids in items:
+            targets = self.chat_ids if chat_ids is None else (
+                [chat_ids] if isinstance(chat_ids, (str, int)) else list(chat_ids))
+            if kind == 'message':
+                for chat_id in targets:
+                    texts.setdefault(chat_id, []).append(payload)
             else:
-                print(f"[ERROR] Failed to send file to {chat_id}: {response.text}")
-        except Exception as e:
-            print(f"[ERROR] Exception sending file to {chat_id}: {e}")
+                files.append((payload, targets))
+        for chat_id, messages in texts.items():
+            for parts in _batches(messages):
+                self._send_text(chat_id, parts)
+        for file_path, targets in files:
+            for chat_id in targets:
+                try:
+                    with open(file_path, 'rb') as fh:
+                        status = self._post(chat_id, "sendDocument", data={'chat_id': chat_id},
+                                            files={'document': fh}, what=file_path)
+                except OSError as e:
+                    status = None
+                    log.error("[ERROR] Exception sending file to %s: %s", chat_id, e)
+                if status != 200:
+                    self.failed += 1
+
+    def _send_text(self, chat_id, parts):
+        data = {"chat_id": chat_id, "text": SEPARATOR.join(parts), "parse_mode": self.parse_mode}
+        status = self._post(chat_id, "sendMessage", data=data)
+        if status == 200:
+            return
+        if not _rejected(status):
+            self.failed += 1
+            return
+        if len(parts) > 1:
+            # One bad alert must not take the rest of the batch down with it.
+            log.warning("[RETRY] Re-sending %d merged alerts to %s one by one", len(parts), chat_id)
+            for part in parts:
+                self._send_text(chat_id, [part])
+            return
+        if self.parse_mode:
+            log.warning("[RETRY] Re-sending an alert to %s as plain text", chat_id)
+            status = self._post(chat_id, "sendMessage", data={"chat_id": chat_id, "text": parts[0]})
+        if status != 200:
+            self.failed += 1
+
+    def _wait_turn(self, chat_id):
+        now = time.monotonic()
+        ready = max(self._next_chat.get(chat_id, 0.0), self._next_any)
+        if ready > now:
+            time.sleep(ready - now)
+        now = time.monotonic()
+        self._next_chat[chat_id] = now + self.per_chat_interval
+        self._next_any = now + self.global_interval
+
+    def _post(self, chat_id, method, data, files=None, what="alert"):
+        """POST with rate limiting and 429 retries; return the final status code (``None`` on error)."""
+        url = API_URL.format(token=self.token, method=method)
+        for attempt in range(MAX_RETRIES + 1):
+            self._wait_turn(chat_id)
+            if files:
+                for fh in files.values():
+                    fh.seek(0)
+            try:
+                response = self.session.post(url, data=data, files=files, timeout=30)
+            except Exception as e:
+                log.error("[ERROR] Telegram exception for %s: %s", chat_id, e)
+                return None
+            if response.status_code == 200:
+                self.sent += 1
+                log.info("[SUCCESS] Telegram %s sent to %s.", what, chat_id)
+                return 200
+            if response.status_code == 429 and attempt < MAX_RETRIES:
+                retry_after = _retry_after(response)
+                log.warning("[THROTTLED] Telegram asked to wait %ss for %s", retry_after, chat_id)
+                self._next_chat[chat_id] = time.monotonic() + retry_after
+                continue
+            log.error("[ERROR] Telegram failed for %s: %s", chat_id, response.text)
+            return response.status_code
+
+    def stats(self):
+        return {'enqueued': self.enqueued, 'sent': self.sent, 'failed': self.failed,
+                'pending': self._queue.unfinished_tasks}
+
+
+def _retry_after(response):
+    try:
+        return float(response.json().get('parameters', {}).get('retry_after', 1))
+    except Exception:
+        return float(response.headers.get('Retry-After', 1))
+
+
+_notifier = None
+_notifier_version = None
+_notifier_lock = threading.Lock()
+
+
+def get_notifier():
+    """Return the process-wide notifier, following secret changes in the config."""
+    global _notifier, _notifier_version
+    config = get_config()
+    with _notifier_lock:
+        token = config.secrets.get('telegram_bot_token')
+        chat_ids = config.secrets.get('telegram_chat_id')
+        if _notifier is None:
+            _notifier = TelegramNotifier(token, chat_ids)
+            atexit.register(_notifier.close)
+        elif _notifier_version != config.version:
+            _notifier.update_credentials(token, chat_ids)
+        _notifier_version = config.version
+        return _notifier
+
+
+def send_telegram_message(message):
+    get_notifier().notify(message)
+
+
+def send_file_to_telegram(file_path, chat_ids=None):
+    get_notifier().send_file(file_path, chat_ids)
@@ -1,42 +1,76 @@
 """Simple paper trading script with auto entry, exit and live P&L."""
 
+import threading
 import time
 from datetime import datetime, timedelta
 
-from broker.zerodha import ZerodhaBroker
 from data.live_fetch.kite_client import ZerodhaKiteClient
+from data.live_fetch.offline_kite import OfflineBroker, OfflineKiteConnect
+from data.ohlc_store import OHLCStore
 from data.live_fetch.kite_websocket import LivePriceStreamer
+from data.live_fetch.bar_buffer import BarBuffer
+from data.live_fetch.bar_aggregator import IntradayBarAggregator, DEFAULT_INTERVALS
 from strategy.rs_entry_engine import run_daily_entry_engine
-from strategy.rs_exit_engine import evaluate_exit
+from core.streaming import LiveExitEvaluator
 from strategy.rotation_model import rotate_portfolio
 from tools.watchlist import load_latest_watchlist
-from tools.secrets import load_secrets
+from tools.config import get_config
+from tools.log import configure_from, get_logger
+
+log = get_logger(__name__)
+
+
+def paper_broker(kite=None):
+    """Return the paper broker: offline for an offline Kite, else Zerodha's."""
+    if isinstance(kite, OfflineKiteConnect):
+        return OfflineBroker()
+    try:
+        from broker.zerodha import ZerodhaBroker
+    except ImportError:
+        log.warning("[WARN] broker package unavailable. Filling paper orders offline.")
+        return OfflineBroker()
+    return ZerodhaBroker(mode="paper")
 
 
 class PaperTrader:
-    def __init__(self):
-        self.secrets = load_secrets()
-        self.kite = ZerodhaKiteClient(
+    def __init__(self, bar_intervals=DEFAULT_INTERVALS, exit_interval=5, client=None, streamer=None,
+                 broker=None):
+        # ``client``/``streamer``/``broker`` replace the Kite-backed defaults,
+        # e.g. with the offline stand-ins from data.live_fetch.offline_kite.
+        self.secrets = get_config().secrets
+        self.kite = client or ZerodhaKiteClient(
             self.secrets['kite_api_key'],
             self.secrets['kite_api_secret'],
             self.secrets['kite_access_token'],
+            store=OHLCStore(),
         )
-        self.broker = ZerodhaBroker(mode="paper")
+        self.broker = broker or paper_broker(getattr(self.kite, 'kite', None))
         self.positions = {}
         self.index_df = None
+        # The benchmark is streamed with the positions; its latest price per
+        # session is what a committed daily bar's RS is measured against.
+        self.index_symbol = get_config().params.index_symbol
+        self._index_closes = {}
         self.token_map = self.kite.instrument_cache
-        self.streamer = LivePriceStreamer(
+        self.streamer = streamer or LivePriceStreamer(
             self.secrets['kite_api_key'],
             self.secrets['kite_access_token'],
             self.token_map,
         )
+        # Exits are evaluated once per completed ``exit_interval``-minute bar
+        # rather than on every tick.
+        self.exit_interval = exit_interval
+        self.bars = IntradayBarAggregator(bar_intervals, on_bar=self.on_bar)
+        self.streamer.add_tick_listener(self.bars.on_kite_tick)
+        self._closed_bars = {}
+        self._bar_lock = threading.Lock()
 
     def load_watchlist(self):
         watchlist = load_latest_watchlist()
         if watchlist:
-            print(f"[INFO] Loaded {len(watchlist)} symbols from watchlist file")
+            log.info("[INFO] Loaded %d symbols from watchlist file", len(watchlist))
             return watchlist
-        print("[WARN] No watchlist found, running entry engine")
+        log.warning("[WARN] No watchlist found, running entry engine")
         stock_data = self.kite.fetch_multiple_ohlc(self.token_map.keys())
         self.index_df = self.kite.fetch_index_data()
         entries = run_daily_entry_engine(
@@ -45,6 +79,7 @@ class PaperTrader:
             self.secrets['kite_access_token'],
             stock_data_dict=stock_data,
             index_df=self.index_df,
+            client=self.kite,
         )
         return entries['symbol'].tolist()
 
@@ -58,28 +93,47 @@ class PaperTrader:
                 continue
             price = df['close'].iloc[-1]
             self.broker.place_order(sym, 1, price, 'buy')
-            self.positions[sym] = {
-                'entry': price,
-                'data': df,
-            }
-            print(f"[ENTRY] {sym} @ {price}")
+            self._open_position(sym, price, df)
+            log.info("[ENTRY] %s @ %s", sym, price)
+
+    def _open_position(self, sym, price, df):
+        self.positions[sym] = {
+            'entry': price,
+            'data': df,
+            'bars': BarBuffer.from_frame(df),
+            'live_bar': False,
+            # Indicator state is seeded once; ticks are then O(1) to check.
+            'exit': LiveExitEvaluator(df, self.index_df, sym),
+        }
+
+    def _record_tick(self, info, price, now):
+        """Fold a tick into today's bar, opening a new bar on the first tick of a day."""
+        bars = info['bars']
+        if bars.last_time().date() < now.date():
+            if info['live_bar']:
+                # Yesterday's live bar is closed; commit it to the indicators
+                # together with the benchmark's close for the same session.
+                index_close = self._index_closes.get(bars.last_time().date())
+                info['exit'].update(bars.close[-1], bars.high[-1], index_close=index_close)
+            bars.append(now, price)
+            info['live_bar'] = True
+        else:
+            bars.apply_tick(price)
 
     def check_exits(self, prices):
         to_exit = []
         for sym, info in self.positions.items():
-            df = info['data']
             price = prices.get(sym)
             if price is None:
                 continue
-            df.loc[datetime.now()] = price
-            signal = evaluate_exit(df, self.index_df, sym)
+            signal = info['exit'].evaluate(price, self._index_closes.get(datetime.now().date()))
             if signal:
                 to_exit.append(sym)
         for sym in to_exit:
             price = prices[sym]
             self.broker.place_order(sym, 1, price, 'sell')
             del self.positions[sym]
-            print(f"[EXIT] {sym} @ {price}")
+            log.info("[EXIT] %s @ %s", sym, price)
 
     def print_pnl(self, prices):
         total = 0.0
@@ -89,12 +143,12 @@ class PaperTrader:
                 continue
             pnl = price - info['entry']
             total += pnl
-        print(f"[P&L] {total:.2f}")
+        log.info("[P&L] %.2f", total)
 
     def run(self):
         symbols = self.load_watchlist()
         if not symbols:
-            print("[INFO] Nothing to trade")
+            log.info("[INFO] Nothing to trade")
             return
         self.enter_positions(symbols)
 
@@ -111,7 +165,7 @@ class PaperTrader:
             price = self.positions[sym]['entry']
             self.broker.place_order(sym, 1, price, 'sell')
             del self.positions[sym]
-            print(f"[ROTATE EXIT] {sym}")
+            log.info("[ROTATE EXIT] %s", sym)
         for entry_item in rotation['entries']:
             sym = entry_item['symbol']
             if sym not in self.positions:
@@ -119,25 +173,52 @@ class PaperTrader:
                 if not df.empty:
                     price = df['close'].iloc[-1]
                     self.broker.place_order(sym, 1, price, 'buy')
-                    self.positions[sym] = {'entry': price, 'data': df}
-                    print(f"[ROTATE ENTRY] {sym} @ {price}")
+                    self._open_position(sym, price, df)
+                    log.info("[ROTATE ENTRY] %s @ %s", sym, price)
+
+        self.streamer.start(list(self.positions.keys()) + [self.index_symbol], self.on_tick)
+
+    def on_bar(self, symbol, interval, bar):
+        # Runs on the socket thread: only note the close for on_tick.
+        if interval == self.exit_interval:
+            with self._bar_lock:
+                self._closed_bars[symbol] = bar['close']
 
-        self.streamer.start(list(self.positions.keys()), self.on_tick)
+    def _record_index_tick(self, price, now):
+        day = now.date()
+        if day not in self._index_closes:
+            # Keep the last week so a bar committed after a holiday finds its session.
+            self._index_closes = {d: p for d, p in self._index_closes.items() if d >= day - timedelta(days=7)}
+        self._index_closes[day] = price
 
     def on_tick(self, prices):
-        self.check_exits(prices)
+        now = datetime.now()
+        index_price = prices.get(self.index_symbol)
+        if index_price is not None:
+            self._record_index_tick(index_price, now)
+        for sym, price in prices.items():
+            info = self.positions.get(sym)
+            if info is not None:
+                self._record_tick(info, price, now)
+        with self._bar_lock:
+            closed, self._closed_bars = self._closed_bars, {}
+        if closed:
+            self.check_exits(closed)
         self.print_pnl(prices)
 
 
 def main():
+    configure_from(get_config().params)
     trader = PaperTrader()
     try:
         trader.run()
         while True:
             time.sleep(1)
+            # Close bars of symbols that have gone quiet.
+            trader.bars.close_due()
     except KeyboardInterrupt:
         trader.streamer.stop()
-        print("\n[STOP] Trading halted")
+        log.info("[STOP] Trading halted")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,359 @@
+# rs_outperformance_kite_system/strategy/backtest_engine.py
+
+"""Vectorised multi-day backtest of the RS entry, exit and rotation rules.
+
+Entry and exit signals are computed for every date and symbol in one pass
+over a :class:`~core.panel.Panel`. Only the portfolio simulation then steps
+through the days, and it does O(holdings) work per day.
+
+The signals follow ``run_daily_entry_engine`` (breadth gate and fusion score
+of at least 4 with 21+ RS points) and ``evaluate_exit``. They use all
+history up to each date, on the benchmark's calendar. A stock's missing
+bars are therefore gaps in its rolling windows, rather than being squeezed
+out as the per-day engines do.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from core.breadth import compute_breadth_metrics
+from core.panel import Panel
+from core.pattern_recognizer import PATTERN_LOOKBACK, classify_rs_patterns
+from core.rs_calculator import compute_rs_alpha_matrix
+from strategy.rotation_model import _exit_reason, _rotate
+
+ENTRY_PATTERNS = ["Flying", "Star", "Lion"]
+EXIT_PATTERNS = ["Drowning", "Cat"]
+
+DEFAULT_CACHE_BYTES = 512 * 1024 * 1024
+
+
+def rolling_rs_patterns(rs_matrix, lookback=PATTERN_LOOKBACK, block=128, **kwargs):
+    """Label every row of a ``(dates × symbols)`` RS matrix.
+
+    Row ``t`` gets the pattern :func:`classify_rs_patterns` assigns to the
+    window ending at ``t`` (``kwargs`` are passed through to it). Windows are
+    classified ``block`` dates at a time as the columns of one matrix, which
+    bounds memory for long histories.
+    """
+    values = np.asarray(rs_matrix, dtype=float)
+    rows, cols = values.shape
+    labels = np.empty((rows, cols), dtype=object)
+    padded = np.vstack([np.full((lookback - 1, cols), np.nan), values])
+    windows = sliding_window_view(padded, lookback, axis=0)  # (rows, cols, lookback)
+    for lo in range(0, rows, block):
+        chunk = windows[lo:lo + block]
+        labels[lo:lo + block] = classify_rs_patterns(chunk.reshape(-1, lookback).T, **kwargs).reshape(-1, cols)
+    return labels
+
+
+def _weekly_points(dates, traded, period):
+    """Weekly RS points as of each day, counting the current partial week."""
+    dates = pd.DatetimeIndex(dates)
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    week = dates.to_period('W').asi8
+    new_week = np.r_[True, week[1:] != week[:-1]]
+    week_no = np.cumsum(new_week) - 1
+    starts = np.flatnonzero(new_week)
+    ends = np.r_[starts[1:] - 1, len(week) - 1]
+
+    cum = np.cumsum(traded, axis=0)
+    zero = np.zeros((1, traded.shape[1]))
+    before = np.vstack([zero, cum[ends[:-1]]])        # bars traded before each week
+    week_any = cum[ends] - before > 0
+    weeks_before = np.cumsum(week_any, axis=0) - week_any
+    in_week = cum - before[week_no] > 0               # traded so far this week
+    weeks = weeks_before[week_no] + in_week
+    return np.clip(weeks - period, 0, None)
+
+
+def _nbytes(value):
+    if isinstance(value, tuple):
+        return sum(_nbytes(item) for item in value)
+    return int(getattr(value, 'nbytes', 64))
+
+
+class SignalCache:
+    """Memo of the indicator matrices behind :func:`compute_signals`.
+
+    Each matrix depends on only one or two parameters (e.g. AMA on its
+    period). Configurations that share those parameters then share the
+    work, and only the cheap combining step runs per configuration.
+    Matrices are evicted least-recently-used once they take more than
+    ``max_bytes``, so a random search over float parameters does not grow
+    the memo without bound.
+    """
+
+    def __init__(self, panel, index_df, max_bytes=DEFAULT_CACHE_BYTES):
+        self.panel = panel
+        self.index_df = index_df
+        self.max_bytes = max_bytes
+        self._memo = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def get(self, key, compute):
+        value = self._memo.get(key)
+        if value is not None:
+            self._memo.move_to_end(key)
+            return value
+        value = compute()
+        size = _nbytes(value)
+        if key not in self._memo and size <= self.max_bytes:
+            self._memo[key] = value
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._memo.popitem(last=False)
+                self._bytes -= _nbytes(evicted)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        self._memo.clear()
+        self._bytes = 0
+
+    def index_close(self):
+        return self.get(('index_close',), lambda: self.panel.align(self.index_df))
+
+    def bars(self):
+        return self.get(('bars',), lambda: np.cumsum(self.panel.mask, axis=0))
+
+    def rs_alpha(self, period):
+        def compute():
+            alpha = compute_rs_alpha_matrix(self.panel.close, self.index_close(), period)
+            return alpha, np.cumsum(~np.isnan(alpha), axis=0), pd.DataFrame(alpha).ffill().to_numpy()
+        return self.get(('rs_alpha', period), compute)
+
+    def weekly_points(self, period):
+        def compute():
+            traded = self.panel.mask & ~np.isnan(self.index_close())[:, None]
+            return _weekly_points(self.panel.dates, traded, period)
+        return self.get(('weekly_points', period), compute)
+
+    def entry_pattern(self, period, spike_threshold):
+        def compute():
+            alpha, rs_points, _ = self.rs_alpha(period)
+            labels = rolling_rs_patterns(alpha, spike_threshold=spike_threshold)
+            return np.isin(labels, ENTRY_PATTERNS) & (rs_points > 0)
+        return self.get(('entry_pattern', period, spike_threshold), compute)
+
+    def exit_pattern(self, spike_threshold):
+        """RS-ratio pattern exits as ``(mask, reason strings)``."""
+        def compute():
+            with np.errstate(invalid='ignore', divide='ignore'):
+                ratio = self.panel.close / self.index_close()[:, None]
+            labels = rolling_rs_patterns(ratio, spike_threshold=spike_threshold)
+            return np.isin(labels, EXIT_PATTERNS), np.char.add("RS pattern = ", labels.astype(str))
+        return self.get(('exit_pattern', spike_threshold), compute)
+
+    def ama(self, period):
+        def compute():
+            close = self.panel.field_frame('close')
+            ama = close.ewm(span=period, adjust=False, ignore_na=True).mean().to_numpy()
+            return np.where(self.bars() >= period, ama, np.nan)
+        return self.get(('ama', period), compute)
+
+    def prior_high(self, lookback):
+        def compute():
+            high = self.panel.field_frame('high')
+            prior = high.rolling(window=lookback).max().shift(1).to_numpy()
+            return np.where(self.bars() >= lookback, prior, np.nan)
+        return self.get(('prior_high', lookback), compute)
+
+    def sma(self, window):
+        return self.get(('sma', window),
+                        lambda: self.panel.field_frame('close').rolling(window=window).mean().to_numpy())
+
+    def breadth(self, ma_days):
+        def compute():
+            metrics = compute_breadth_metrics(self.panel, ma_windows=(ma_days,))
+            return metrics[f'pct_above_{ma_days}ma'].to_numpy()
+        return self.get(('breadth', ma_days), compute)
+
+
+def compute_signals(panel, index_df, rs_period=21, ama_period=10, donchian_lookback=20,
+                    sma_window=50, rs_threshold=0.01, breadth_ma=50, breadth_threshold=0.55,
+                    min_score=4, spike_threshold=0.05, cache=None):
+    """Return daily entry/exit signal matrices for the whole panel.
+
+    Keys of the returned dict: ``rs_alpha`` (latest RS alpha as of each
+    day), ``score`` (fusion score), ``entry`` (bool), ``exit_reason``
+    (object array, ``None`` where no exit fires), ``breadth`` (bool per day)
+    and ``close``. Pass a :class:`SignalCache` to reuse indicators across
+    calls with different parameters.
+    """
+    cache = cache or SignalCache(panel, index_df)
+    own = panel.mask
+    values = panel.close
+
+    # Step 1: RS alpha (daily) and its running point count
+    _, rs_points, latest_alpha = cache.rs_alpha(rs_period)
+
+    # Step 2: RS alpha (weekly) points
+    weekly_points = cache.weekly_points(rs_period)
+
+    # Step 3: Patterns on RS alpha (entry) and on the RS ratio (exit)
+    entry_pattern = cache.entry_pattern(rs_period, spike_threshold)
+    exit_pattern, pattern_reason = cache.exit_pattern(spike_threshold)
+
+    # Step 4: AMA, Donchian breakout and 50-bar mean
+    ama = cache.ama(ama_period)
+    sma = cache.sma(sma_window)
+    with np.errstate(invalid='ignore'):
+        above_ama = values > ama
+        breakout = values > cache.prior_high(donchian_lookback)
+
+        score = ((rs_points > 20).astype(int) + (weekly_points > 20)
+                 + entry_pattern + above_ama + breakout)
+
+        breadth_ok = cache.breadth(breadth_ma) >= breadth_threshold
+        entry = own & breadth_ok[:, None] & (score >= min_score) & (rs_points >= 21)
+
+        # Exit rules in evaluate_exit's order of precedence
+        exit_reason = np.select(
+            [latest_alpha < rs_threshold, exit_pattern, values < ama, values < sma],
+            ["RS Alpha weak", pattern_reason, "Price below AMA", "Price below 50 EMA"],
+            default='',
+        ).astype(object)
+    exit_reason[(exit_reason == '') | ~own] = None
+
+    return {
+        'rs_alpha': latest_alpha,
+        'score': score,
+        'entry': entry,
+        'exit_reason': exit_reason,
+        'breadth': breadth_ok,
+        'close': values,
+    }
+
+
+def run_backtest(stock_data, index_df, start=None, end=None, max_holdings=10, top_n=50,
+                 initial_capital=1_000_000.0, cost_bps=0.0, cache=None, **signal_kwargs):
+    """Simulate the RS rotation strategy over ``[start, end]``.
+
+    ``stock_data`` is a ``dict`` of daily frames or a Panel; history before
+    ``start`` is used as indicator warm-up. Each day, holdings are exited on
+    an exit signal or when they drop out of the top ``top_n`` by RS alpha.
+    Free slots are then filled with that day's entry signals in RS-alpha
+    order (see :func:`strategy.rotation_model._rotate`), skipping the
+    symbols exited that day. Trades fill at the
+    close, and each new position gets ``equity / max_holdings``.
+
+    Returns a dict with ``trades`` (DataFrame), ``equity`` and ``turnover``
+    (daily Series) and ``summary`` (dict).
+    """
+    panel = stock_data if isinstance(stock_data, Panel) else Panel.from_frames(stock_data, calendar=index_df)
+    signals = compute_signals(panel, index_df, cache=cache, **signal_kwargs)
+    dates = panel.dates
+    symbols = panel.symbols
+    close = signals['close']
+    mark = pd.DataFrame(close).ffill().to_numpy()
+    alpha = signals['rs_alpha']
+    cost = cost_bps / 10_000
+
+    lo = 0 if start is None else dates.searchsorted(_stamp(start, dates), side='left')
+    hi = len(dates) if end is None else dates.searchsorted(_stamp(end, dates), side='right')
+
+    cash = float(initial_capital)
+    positions = {}
+    trades, equity, turnover = [], [], []
+
+    def close_position(sym, t, reason):
+        nonlocal cash
+        pos = positions.pop(sym)
+        price = mark[t, panel.columns[sym]]
+        cash += pos['shares'] * price * (1 - cost)
+        trades.append({
+            'symbol': sym,
+            'entry_date': pos['date'],
+            'entry_price': pos['price'],
+            'exit_date': dates[t],
+            'exit_price': price,
+            'shares': pos['shares'],
+            'pnl': pos['shares'] * (price * (1 - cost) - pos['price'] * (1 + cost)),
+            'return': price * (1 - cost) / (pos['price'] * (1 + cost)) - 1,
+            'reason': reason,
+        })
+        return pos['shares'] * price
+
+    for t in range(lo, hi):
+        row_alpha = np.where(np.isnan(alpha[t]), -np.inf, alpha[t])
+        ranked = np.argsort(-row_alpha, kind='stable')
+        ranked = ranked[np.isfinite(row_alpha[ranked])]
+        top_rs = {symbols[j] for j in ranked[:top_n]}
+        candidates = [symbols[j] for j in ranked if signals['entry'][t, j]]
+
+        exit_reasons = {}
+        for sym in positions:
+            j = panel.columns[sym]
+            if panel.mask[t, j]:
+                exit_reasons[sym] = signals['exit_reason'][t, j]
+
+        held = list(positions)
+        # A position sold at today's close is not bought back at the same close.
+        exited = {sym for sym in held if _exit_reason(sym, exit_reasons, top_rs)}
+        candidates = [sym for sym in candidates if sym not in exited]
+        value = cash + sum(p['shares'] * mark[t, panel.columns[s]] for s, p in positions.items())
+        rotation = _rotate(held, exit_reasons, top_rs, max_holdings, candidates)
+
+        traded = 0.0
+        for item in rotation['exits']:
+            traded += close_position(item['symbol'], t, item['reason'])
+        for item in rotation['entries']:
+            sym = item['symbol']
+            price = close[t, panel.columns[sym]]
+            budget = min(value / max_holdings, cash)
+            shares = np.floor(budget / (price * (1 + cost)))
+            if shares <= 0:
+                continue
+            cash -= shares * price * (1 + cost)
+            positions[sym] = {'shares': shares, 'price': price, 'date': dates[t]}
+            traded += shares * price
+
+        value = cash + sum(p['shares'] * mark[t, panel.columns[s]] for s, p in positions.items())
+        equity.append(value)
+        turnover.append(traded / value if value else 0.0)
+
+    if hi > lo:
+        for sym in list(positions):
+            close_position(sym, hi - 1, 'End of backtest')
+
+    index = dates[lo:hi]
+    equity = pd.Series(equity, index=index, name='equity', dtype=float)
+    turnover = pd.Series(turnover, index=index, name='turnover', dtype=float)
+    trades = pd.DataFrame(trades, columns=['symbol', 'entry_date', 'entry_price', 'exit_date',
+                                           'exit_price', 'shares', 'pnl', 'return', 'reason'])
+    return {
+        'trades': trades,
+        'equity': equity,
+        'turnover': turnover,
+        'summary': summarize(equity, trades, turnover, initial_capital),
+    }
+
+
+def _stamp(value, dates):
+    stamp = pd.Timestamp(value)
+    if dates.tz is not None and stamp.tz is None:
+        stamp = stamp.tz_localize(dates.tz)
+    return stamp
+
+
+def summarize(equity, trades, turnover, initial_capital):
+    if equity.empty:
+        return {'total_return': 0.0, 'cagr': 0.0, 'max_drawdown': 0.0, 'trades': 0,
+                'win_rate': 0.0, 'avg_turnover': 0.0}
+    total_return = equity.iloc[-1] / initial_capital - 1
+    years = max((equity.index[-1] - equity.index[0]).days / 365.25, 1 / 365.25)
+    drawdown = equity / equity.cummax() - 1
+    return {
+        'total_return': float(total_return),
+        'cagr': float((1 + total_return) ** (1 / years) - 1),
+        'max_drawdown': float(drawdown.min()),
+        'trades': int(len(trades)),
+        'win_rate': float((trades['pnl'] > 0).mean()) if len(trades) else 0.0,
+        'avg_turnover': float(turnover.mean()),
+    }
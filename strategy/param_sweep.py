@@ -0,0 +1,184 @@
+# rs_outperformance_kite_system/strategy/param_sweep.py
+
+"""Evaluate many strategy configurations with the vectorised backtester.
+
+Configurations come from a full grid (:func:`expand_grid`) or are sampled
+at random from a search space (:func:`sample_space`). They are sorted so
+that configurations sharing indicator parameters sit next to each other,
+and the sorted list is split into contiguous chunks across a process pool.
+Every worker attaches to one shared-memory copy of the panel (see
+:mod:`core.parallel`) and keeps a :class:`SignalCache`, so an indicator
+matrix is computed once per worker for all the configurations that use it.
+"""
+
+import itertools
+import os
+import random
+import time
+import pandas as pd
+
+from core.panel import Panel
+from core.parallel import SharedPanel, attach_panel, process_pool, resolve_workers
+from strategy.backtest_engine import SignalCache, run_backtest
+from tools.log import get_logger
+
+log = get_logger(__name__)
+
+DEFAULT_GRID = {
+    'rs_period': [21],
+    'ama_period': [10, 20],
+    'donchian_lookback': [20, 55],
+    'breadth_ma': [50],
+    'breadth_threshold': [0.45, 0.55],
+    'min_score': [3, 4],
+    'spike_threshold': [0.05],
+    'rs_threshold': [0.0, 0.01],
+    'max_holdings': [10],
+}
+
+# Parameters ordered from most to least expensive to recompute; configs are
+# sorted on them so neighbours reuse the costliest cached matrices.
+_COST_ORDER = ('rs_period', 'spike_threshold', 'ama_period', 'donchian_lookback', 'sma_window',
+               'breadth_ma')
+_BACKTEST_ARGS = ('max_holdings', 'top_n', 'cost_bps', 'initial_capital')
+
+# Per-worker state set up by _init_worker.
+_WORKER = {}
+
+
+def expand_grid(grid):
+    """Return every combination of ``{name: [values]}`` as a list of dicts."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def sample_space(space, samples, seed=0):
+    """Draw ``samples`` random configurations from ``space``.
+
+    Each entry is a list (picked from uniformly) or a ``(low, high)`` tuple
+    (uniform; integers when both bounds are ints). Duplicates are dropped.
+    """
+    rng = random.Random(seed)
+    configs, seen = [], set()
+    for _ in range(samples * 10):
+        config = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    config[name] = rng.randint(low, high)
+                else:
+                    config[name] = rng.uniform(low, high)
+            else:
+                config[name] = rng.choice(list(values))
+        key = tuple(sorted(config.items()))
+        if key not in seen:
+            seen.add(key)
+            configs.append(config)
+        if len(configs) == samples:
+            break
+    return configs
+
+
+def _sort_key(config):
+    return tuple((config.get(name) is None, config.get(name) or 0) for name in _COST_ORDER)
+
+
+def _evaluate(config, panel, index_df, cache, start, end):
+    backtest_args = {k: v for k, v in config.items() if k in _BACKTEST_ARGS}
+    signal_args = {k: v for k, v in config.items() if k not in _BACKTEST_ARGS}
+    started = time.perf_counter()
+    try:
+        result = run_backtest(panel, index_df, start=start, end=end, cache=cache,
+                              **backtest_args, **signal_args)
+        summary = result['summary']
+    except Exception as e:
+        log.error("[ERROR] Sweep config %s failed: %s", config, e)
+        summary = {'error': str(e)}
+    return {**config, **summary, 'seconds': time.perf_counter() - started}
+
+
+def _init_worker(spec, index_df, start, end):
+    # The block stays attached for the life of the worker process.
+    shm, panel = attach_panel(spec)
+    _WORKER.update(shm=shm, panel=panel, index_df=index_df, start=start, end=end,
+                   cache=SignalCache(panel, index_df))
+
+
+def _run_configs(configs):
+    w = _WORKER
+    return [_evaluate(c, w['panel'], w['index_df'], w['cache'], w['start'], w['end']) for c in configs]
+
+
+def run_sweep(stock_data, index_df, configs, start=None, end=None, workers=None,
+              metric='cagr', output=os.path.join("output", "param_sweep.csv")):
+    """Backtest every configuration and return a table ranked by ``metric``.
+
+    ``configs`` is a list of dicts of :func:`compute_signals` and
+    :func:`run_backtest` keyword arguments. With ``workers`` > 1 (or ``-1``
+    for all cores) configurations are evaluated in a process pool. The ranked
+    table is written to ``output`` as CSV unless ``output`` is ``None``.
+    """
+    panel = stock_data if isinstance(stock_data, Panel) else Panel.from_frames(stock_data, calendar=index_df)
+    configs = sorted(configs, key=_sort_key)
+    workers = min(resolve_workers(workers), max(len(configs), 1))
+    started = time.perf_counter()
+
+    if workers == 1:
+        cache = SignalCache(panel, index_df)
+        rows = [_evaluate(c, panel, index_df, cache, start, end) for c in configs]
+    else:
+        size = -(-len(configs) // workers)
+        chunks = [configs[i:i + size] for i in range(0, len(configs), size)]
+        with SharedPanel(panel) as shared, process_pool(
+            workers, initializer=_init_worker,
+            initargs=(shared.spec(0, len(panel.symbols)), index_df, start, end),
+        ) as pool:
+            rows = [row for part in pool.map(_run_configs, chunks) for row in part]
+
+    table = pd.DataFrame(rows)
+    if metric in table.columns:
+        table = table.sort_values(metric, ascending=False, kind='stable').reset_index(drop=True)
+    table.index = pd.RangeIndex(1, len(table) + 1, name='rank')
+    log.info("[INFO] Swept %d configurations in %.1fs with %d worker(s)",
+             len(configs), time.perf_counter() - started, workers)
+
+    if output:
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        table.to_csv(output)
+        log.info("[✅] Sweep results saved to %s", output)
+    return table
+
+
+def main(start_date=None, end_date=None):
+    """Sweep :data:`DEFAULT_GRID` over the configured universe."""
+    from datetime import datetime
+
+    from data.backtest_provider import BacktestDataProvider
+    from data.live_fetch.kite_client import ZerodhaKiteClient
+    from data.ohlc_store import OHLCStore
+    from tools.config import get_config
+
+    config = get_config()
+    secrets, params = config.secrets, config.params
+
+    kite = ZerodhaKiteClient(secrets['kite_api_key'], secrets['kite_api_secret'],
+                             secrets['kite_access_token'], store=OHLCStore())
+    start_date = start_date or datetime(2023, 1, 1).date()
+    end_date = end_date or datetime(2025, 5, 15).date()
+    provider = BacktestDataProvider(kite, list(params.stock_list), params.index_symbol,
+                                    start_date, end_date, lookback_days=400).load()
+    stock_data, index_df = provider.snapshot(end_date)
+
+    table = run_sweep(stock_data, index_df, expand_grid(DEFAULT_GRID), start=start_date,
+                      end=end_date, workers=params.workers)
+    log.info("[SWEEP] Top configurations:\n%s", table.head(10).to_string())
+    return table
+
+
+if __name__ == "__main__":
+    from tools.config import get_config
+    from tools.log import configure_from
+
+    configure_from(get_config().params)
+    main()
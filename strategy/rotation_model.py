@@ -2,8 +2,7 @@
 
 from strategy.rs_exit_engine import evaluate_exit
 from core.rs_calculator import compute_rs_rank
-from core.pattern_recognizer import get_rs_pattern
-import pandas as pd
+from data.live_fetch.bar_buffer import apply_live_prices
 import time
 
 def rotate_portfolio(
@@ -35,8 +34,9 @@ def rotate_portfolio(
     max_holdings : int
         Maximum number of holdings after rotation.
     live_prices : dict[str, float], optional
-        Latest live prices from a websocket stream. When supplied the prices
-        are appended to ``stock_data_dict`` before evaluating exits.
+        Latest live prices from a websocket stream. When supplied each price
+        is added as a provisional bar before evaluating exits; the frames in
+        ``stock_data_dict`` are left untouched.
     """
 
     if rs_alpha_dict and top_rs_list is None:
@@ -48,37 +48,58 @@ def rotate_portfolio(
 
     # Apply live prices to stock data if given
     if live_prices:
-        ts = pd.Timestamp.now()
-        for sym, price in live_prices.items():
-            df = stock_data_dict.get(sym)
-            if df is not None:
-                df.loc[ts] = {'close': price}
-
-    updated_portfolio = portfolio.copy()
-    exit_log = []
-    entry_log = []
+        stock_data_dict = apply_live_prices(stock_data_dict, live_prices)
 
     # Step 1: Evaluate exits
+    exit_reasons = {}
     for symbol in portfolio:
         stock_df = stock_data_dict.get(symbol)
         if stock_df is None:
             continue
-
         exit_signal = evaluate_exit(stock_df, index_df, symbol)
-        if exit_signal or symbol not in top_rs_list:
-            exit_log.append({'symbol': symbol, 'reason': exit_signal['Exit Reason'] if exit_signal else 'RS Rank dropped'})
+        exit_reasons[symbol] = exit_signal['Exit Reason'] if exit_signal else None
+
+    return _rotate(portfolio, exit_reasons, top_rs_list, max_holdings)
+
+
+def _exit_reason(symbol, exit_reasons, top_rs_list):
+    """Why ``symbol`` leaves the portfolio under the rotation rules, or ``None``."""
+    if symbol not in exit_reasons:
+        return None
+    reason = exit_reasons[symbol]
+    if reason or symbol not in top_rs_list:
+        return reason or 'RS Rank dropped'
+    return None
+
+
+def _rotate(portfolio, exit_reasons, top_rs_list, max_holdings, candidates=None):
+    """Apply the rotation rules given each holding's exit reason (or ``None``).
+
+    Holdings missing from ``exit_reasons`` (no data) are kept; holdings not
+    in ``top_rs_list`` are exited. New positions are taken from
+    ``candidates`` (default ``top_rs_list``) in order. Shared by
+    :func:`rotate_portfolio` and the backtest engine.
+    """
+    updated_portfolio = portfolio.copy()
+    exit_log = []
+    entry_log = []
+
+    for symbol in portfolio:
+        reason = _exit_reason(symbol, exit_reasons, top_rs_list)
+        if reason:
+            exit_log.append({'symbol': symbol, 'reason': reason})
             if symbol in updated_portfolio:
                 updated_portfolio.remove(symbol)
 
     # Step 2: Add new top-ranked RS stocks
-    for candidate in top_rs_list:
+    for candidate in (top_rs_list if candidates is None else candidates):
+        if len(updated_portfolio) >= max_holdings:
+            break
+
         if candidate not in updated_portfolio:
             updated_portfolio.append(candidate)
             entry_log.append({'symbol': candidate, 'reason': 'Top RS Alpha'})
 
-        if len(updated_portfolio) >= max_holdings:
-            break
-
     return {
         'new_portfolio': updated_portfolio,
         'exits': exit_log,
@@ -1,14 +1,22 @@
 # rs_outperformance_kite_system/strategy/rs_entry_engine.py
 
 import pandas as pd
-import yaml
-from core.rs_calculator import compute_rs_alpha, compute_rs_rank, add_ama, add_donchian_channel
-from core.pattern_recognizer import get_rs_pattern
-from core.breadth import evaluate_breadth
+from core.breadth_engine import BreadthEngine
 from core.sector_analysis import filter_by_sector_strength
-from core.multi_timeframe_fusion import compute_fusion_score, resample_to_weekly
+from core.multi_timeframe_fusion import compute_fusion_scores, resample_to_weekly
+from core.panel import Panel
+from core.parallel import map_panel
+from data.live_fetch.bar_buffer import apply_live_prices
 from data.live_fetch.kite_client import ZerodhaKiteClient
+from data.ohlc_store import OHLCStore
 from output.telegram_bot import send_telegram_message
+from tools.config import get_config
+from tools.log import get_logger
+from tools.metrics import metrics
+
+log = get_logger(__name__)
+
+breadth_engine = BreadthEngine()
 
 
 def run_daily_entry_engine(
@@ -20,6 +28,8 @@ def run_daily_entry_engine(
     top_n=50,
     use_sector_filter=True,
     live_prices=None,
+    client=None,
+    workers=None,
 ):
     """Run the daily RS entry scan.
 
@@ -27,104 +37,110 @@ def run_daily_entry_engine(
     ----------
     live_prices : dict[str, float], optional
         Latest live prices from a websocket stream. If supplied these prices are
-        appended to the OHLC data before calculating indicators.
+        added as a provisional bar before calculating indicators; the frames
+        passed in are not modified.
+    client : ZerodhaKiteClient, optional
+        Existing client to reuse. One is created from the credentials when
+        omitted.
+    workers : int, optional
+        Processes used to score the universe (``-1`` for all cores).
+        Defaults to ``workers`` in ``config/params.yaml``, else serial.
     """
 
-    kite = ZerodhaKiteClient(api_key, api_secret, access_token)
+    kite = client or ZerodhaKiteClient(api_key, api_secret, access_token, store=OHLCStore())
 
-    # Load symbols from config
-    with open("config/params.yaml") as f:
-        params = yaml.safe_load(f)
+    # Load symbols from the shared config snapshot
+    params = get_config().params
 
-    all_symbols = params['stock_list']
-    index_symbol = params['index_symbol']
-    top_n = params.get('top_n', 50)
+    all_symbols = list(params.stock_list)
+    index_symbol = params.index_symbol
+    top_n = params.top_n
+    if workers is None:
+        workers = params.workers
 
     # Fetch stock data if not supplied
     if stock_data_dict is None:
-        stock_data_dict = kite.fetch_multiple_ohlc(all_symbols)
+        with metrics.span("entry.fetch", symbols=len(all_symbols)):
+            stock_data_dict = kite.fetch_multiple_ohlc(all_symbols)
 
     # Apply live prices if provided
     if live_prices:
         ts = pd.Timestamp.now()
-        for sym, price in live_prices.items():
-            if sym == index_symbol:
-                # update index live price
-                if index_df is not None:
-                    index_df.loc[ts] = {'close': price}
-                continue
-            df = stock_data_dict.get(sym)
-            if df is not None:
-                df.loc[ts] = {'close': price}
-
-    # ✅ Step 1: Breadth Filter
-    if not evaluate_breadth(stock_data_dict):
+        stock_prices = {s: p for s, p in live_prices.items() if s != index_symbol}
+        stock_data_dict = apply_live_prices(stock_data_dict, stock_prices, ts)
+        if index_symbol in live_prices and index_df is not None:
+            # update index live price
+            index_df = apply_live_prices(
+                {index_symbol: index_df}, {index_symbol: live_prices[index_symbol]}, ts
+            )[index_symbol]
+
+    # ✅ Step 1: Breadth Filter, gated on % above the 50-day MA with the full
+    # metric set (20/50/200-day MA, A/D line, new highs/lows, McClellan) logged
+    with metrics.span("entry.breadth", symbols=len(stock_data_dict)):
+        universe = Panel.from_frames(stock_data_dict)
+        closes = universe.field_frame('close').copy()
+        # A live bar exists only for the symbols that ticked; the others are
+        # counted on their last close rather than dropping out of the row.
+        closes.iloc[-1:] = closes.ffill().iloc[-1:]
+        breadth = breadth_engine.compute(closes)
+    breadth_ok = not breadth.empty and bool(breadth_engine.strong_days(breadth).iloc[-1])
+    latest_breadth = breadth.iloc[-1].to_dict() if not breadth.empty else {}
+    log.info("[📊] Breadth: %s", ", ".join(
+        f"{name} {value:.2f}" for name, value in latest_breadth.items() if value == value))
+    if not breadth_ok:
         send_telegram_message("🚫 Market breadth is weak. Avoid new entries today.")
-        return pd.DataFrame()
+        gated = pd.DataFrame()
+        gated.attrs['breadth'] = latest_breadth
+        return gated
 
-    # ✅ Step 2: Sector RS Filtering (optional)
-    if use_sector_filter:
-        sector_etf_map = {
-            "NIFTYIT": "INFY",
-            "NIFTYAUTO": "M&M",
-            "NIFTYPHARMA": "SUNPHARMA",
-            "NIFTYFMCG": "ITC",
-            "NIFTYENERGY": "NTPC",
-            "NIFTYFIN": "HDFCBANK",
-            "NIFTYINFRA": "LT"
-        }
-        sector_index_data = {
-            sector: stock_data_dict.get(etf_symbol)
-            for sector, etf_symbol in sector_etf_map.items()
-            if etf_symbol in stock_data_dict
-        }
-
-        filtered_symbols = filter_by_sector_strength(stock_data_dict, sector_index_data, top_n_sectors=3)
-        print(f"[INFO] Filtered {len(filtered_symbols)} symbols after sector RS filtering.")
-        stock_data_dict = {s: stock_data_dict[s] for s in filtered_symbols if s in stock_data_dict}
-
-    # Fetch index data for RS Alpha calc if not supplied
+    # Fetch index data for sector ranking and RS Alpha calc if not supplied
     if index_df is None:
-        index_df = kite.fetch_index_data(index_symbol)
+        with metrics.span("entry.index_fetch"):
+            index_df = kite.fetch_index_data(index_symbol)
 
-    index_weekly = resample_to_weekly(index_df)
+    # ✅ Step 2: Sector RS Filtering (optional), on indices built from the
+    # constituents in config/sector_map.yaml
+    if use_sector_filter:
+        with metrics.span("entry.sector_filter", symbols=len(stock_data_dict)):
+            filtered_symbols = filter_by_sector_strength(stock_data_dict, index_df, top_n_sectors=3)
+        log.info("[INFO] Filtered %d symbols after sector RS filtering.", len(filtered_symbols))
+        stock_data_dict = {s: stock_data_dict[s] for s in filtered_symbols}
+
+    with metrics.span("entry.weekly_resample"):
+        index_weekly = resample_to_weekly(index_df)
     results = []
 
-    for symbol, df in stock_data_dict.items():
-        if df.empty or index_df.empty:
-            continue
+    if index_df.empty:
+        return pd.DataFrame(results)
+
+    # Score the whole universe at once; candidates reuse the components
+    # computed for the score instead of recomputing RS, pattern and AMA.
+    with metrics.span("entry.fusion", symbols=len(stock_data_dict)):
+        if len(stock_data_dict) == len(universe.symbols):
+            panel = universe
+        else:
+            panel = Panel.from_frames(stock_data_dict)
+        scores = map_panel(compute_fusion_scores, panel, workers,
+                           index_df=index_df, index_weekly=index_weekly)
+    metrics.count("entry.symbols_scored", len(scores))
 
-        weekly_df = resample_to_weekly(df)
-        fusion_score = compute_fusion_score(df, weekly_df, index_df, index_weekly)
+    for symbol, row in scores.iterrows():
+        fusion_score = int(row['Fusion Score'])
 
         if fusion_score >= 4:
-            rs_alpha = compute_rs_alpha(df, index_df).dropna()
-            if len(rs_alpha) < 21:
+            if row['RS Points'] < 21:
                 continue
 
-            pattern = get_rs_pattern(rs_alpha)
-            df = add_ama(df)
-            df = add_donchian_channel(df)
-
-            close = df['close'].iloc[-1]
-            ama = df['ama'].iloc[-1]
-            donchian_breakout = df['donchian_breakout'].iloc[-1]
-
-            # ✅ Volume confirmation logic
-            vol_confirm = False
-            if 'volume' in df.columns:
-                recent_volume = df['volume'].iloc[-1]
-                avg_volume = df['volume'].rolling(window=20).mean().iloc[-1]
-                vol_confirm = recent_volume > avg_volume
-
             results.append({
                 'symbol': symbol,
-                'RS Alpha': rs_alpha.iloc[-1],
-                'RS Pattern': pattern,
-                'Close': close,
-                'AMA': ama,
+                'RS Alpha': row['RS Alpha'],
+                'RS Pattern': row['RS Pattern'],
+                'Close': row['Close'],
+                'AMA': row['AMA'],
                 'Fusion Score': fusion_score,
-                'Volume Confirm': vol_confirm
+                'Volume Confirm': bool(row['Volume Confirm'])
             })
 
-    return pd.DataFrame(results)
+    entries = pd.DataFrame(results)
+    entries.attrs['breadth'] = latest_breadth
+    return entries
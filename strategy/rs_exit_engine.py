@@ -1,18 +1,18 @@
 # rs_outperformance_kite_system/strategy/rs_exit_engine.py
 
-from core.rs_calculator import compute_rs_alpha, add_ama, add_donchian_channel
+from core.feature_store import feature_store
 from core.pattern_recognizer import get_rs_pattern
+from core.streaming import LiveExitEvaluator
 import pandas as pd
 
 def evaluate_exit(stock_df, index_df, symbol, rs_threshold=0.01):
     """Return a dict with exit details if an exit is suggested, otherwise `None`."""
     rs_series = stock_df['close'] / index_df['close']
-    rs_alpha_series = compute_rs_alpha(stock_df, index_df)
+    rs_alpha_series = feature_store.rs_alpha(symbol, stock_df, index_df)
     latest_rs = rs_alpha_series.dropna().iloc[-1]
 
     pattern = get_rs_pattern(rs_series)
-    stock_df = add_ama(stock_df)
-    stock_df = add_donchian_channel(stock_df)
+    stock_df = feature_store.add_indicators(symbol, stock_df)
 
     close = stock_df['close'].iloc[-1]
     ama = stock_df['ama'].iloc[-1]
@@ -44,17 +44,14 @@ def evaluate_exit(stock_df, index_df, symbol, rs_threshold=0.01):
 
 
 def evaluate_exit_live(stock_df, index_df, symbol, live_price, index_live_price=None, rs_threshold=0.01):
-    """Evaluate exit signals using a live price snapshot."""
-    df_live = stock_df.copy()
-    ts = pd.Timestamp.now()
-    df_live.loc[ts] = {'close': live_price}
+    """Evaluate exit signals using a live price snapshot.
 
-    index_df_live = index_df
-    if index_live_price is not None:
-        index_df_live = index_df.copy()
-        index_df_live.loc[ts] = {'close': index_live_price}
-
-    return evaluate_exit(df_live, index_df_live, symbol, rs_threshold)
+    The live price is treated as a provisional bar on top of the history
+    without copying either frame. For repeated checks on the same history,
+    keep a :class:`core.streaming.LiveExitEvaluator` instead.
+    """
+    evaluator = LiveExitEvaluator(stock_df, index_df, symbol, rs_threshold)
+    return evaluator.evaluate(live_price, index_live_price)
 
 def check_exit_signals(portfolio, stock_data_dict, index_df):
     """Evaluate exit signals for a given portfolio"""
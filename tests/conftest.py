@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _mixed_universe(n=40, periods=200, seed=3):
+    """Random-walk stocks with trading gaps and recent listings, plus an index."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2023-01-02", periods=periods, tz="Asia/Kolkata")
+    index_close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, periods)))
+    index_df = pd.DataFrame({"open": index_close, "high": index_close, "low": index_close,
+                             "close": index_close, "volume": 0}, index=dates)
+    frames = {}
+    for i in range(n):
+        close = 100 * np.exp(np.cumsum(rng.normal(0.002 * (i % 3), 0.02, periods)))
+        df = pd.DataFrame({"open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+                           "volume": rng.integers(1_000, 2_000, periods)}, index=dates)
+        if i % 5 == 1:
+            df = df.drop(df.index[rng.choice(periods - 1, 8, replace=False)])  # trading gaps
+        if i % 7 == 2:
+            df = df.iloc[-rng.integers(12, 60):]                                # recent listing
+        frames[f"S{i}"] = df
+    return frames, index_df
+
+
+@pytest.fixture
+def mixed_universe():
+    """Builder ``(n, periods, seed) -> (frames, index_df)`` shared by the panel tests."""
+    return _mixed_universe
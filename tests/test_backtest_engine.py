@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.multi_timeframe_fusion import compute_fusion_scores, resample_to_weekly
+from core.panel import Panel
+from core.pattern_recognizer import get_rs_pattern
+from strategy.backtest_engine import compute_signals, rolling_rs_patterns, run_backtest
+from strategy.rotation_model import _rotate
+
+
+@pytest.fixture
+def clean_universe(mixed_universe):
+    def build(n=30, periods=320, seed=4):
+        frames, index_df = mixed_universe(n=n, periods=periods, seed=seed)
+        return {s: df for s, df in frames.items() if len(df) == periods}, index_df
+    return build
+
+
+def test_rolling_patterns_match_scalar():
+    rng = np.random.default_rng(1)
+    rs = rng.normal(0, 0.02, (80, 3)).cumsum(axis=0)
+    labels = rolling_rs_patterns(rs)
+    for t in range(1, 80):
+        for j in range(3):
+            assert labels[t, j] == get_rs_pattern(pd.Series(rs[:t + 1, j]))
+
+
+def test_signal_scores_match_daily_fusion_scores(clean_universe):
+    frames, index_df = clean_universe()
+    signals = compute_signals(Panel.from_frames(frames, calendar=index_df), index_df)
+    for cut in (200, 260, 320):
+        window = {s: df.iloc[:cut] for s, df in frames.items()}
+        index_cut = index_df.iloc[:cut]
+        daily = compute_fusion_scores(window, index_cut, resample_to_weekly(index_cut))
+        np.testing.assert_array_equal(signals['score'][cut - 1], daily['Fusion Score'].to_numpy())
+
+
+def test_backtest_respects_holdings_and_accounts_cash(clean_universe):
+    frames, index_df = clean_universe(n=40)
+    result = run_backtest(frames, index_df, start=index_df.index[250], max_holdings=5)
+    trades, equity = result['trades'], result['equity']
+
+    assert len(equity) == 70
+    assert not trades.empty
+    assert trades['exit_date'].max() <= equity.index[-1]
+    # All positions are closed at the end, so final equity is cash plus realised P&L.
+    assert np.isclose(equity.iloc[-1], 1_000_000 + trades['pnl'].sum())
+    for day in equity.index:
+        open_on_day = ((trades['entry_date'] <= day) & (trades['exit_date'] > day)).sum()
+        assert open_on_day <= 5
+    assert result['summary']['trades'] == len(trades)
+
+
+def test_exited_symbols_are_not_reentered_the_same_day(clean_universe):
+    frames, index_df = clean_universe(seed=11)
+    trades = run_backtest(frames, index_df, start=index_df.index[250], max_holdings=5)['trades']
+    assert len(trades) > 20
+    exits = trades[trades['reason'] != 'End of backtest']
+    reentered = exits.merge(trades, left_on=['symbol', 'exit_date'], right_on=['symbol', 'entry_date'])
+    assert reentered.empty
+
+
+def test_rotate_does_not_exceed_max_holdings():
+    rotation = _rotate(["A", "B"], {"A": None, "B": None}, ["A", "B", "C"], max_holdings=2)
+    assert rotation['new_portfolio'] == ["A", "B"]
+    rotation = _rotate(["A", "B"], {"A": "Price below AMA"}, {"A", "B"}, 2, candidates=["C", "D"])
+    assert rotation['new_portfolio'] == ["B", "C"]
+    assert rotation['exits'] == [{'symbol': 'A', 'reason': 'Price below AMA'}]
@@ -0,0 +1,47 @@
+import warnings
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from data.backtest_provider import BacktestDataProvider
+
+
+def _frame(seed):
+    idx = pd.bdate_range("2024-01-01", "2024-06-28", tz="Asia/Kolkata")
+    close = 100 + np.random.default_rng(seed).normal(size=len(idx)).cumsum()
+    return pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1000}, index=idx)
+
+
+class StubClient:
+    def __init__(self):
+        self.frames = {"AAA": _frame(1), "BBB": _frame(2), "NIFTY": _frame(3)}
+        self.requests = 0
+
+    def fetch_multiple_ohlc(self, symbol_list, workers=4, start=None, end=None):
+        self.requests += len(symbol_list)
+        return {s: self.frames[s] for s in symbol_list}
+
+    def fetch_historical_ohlc(self, symbol, from_date, to_date, interval="day"):
+        self.requests += 1
+        return self.frames[symbol]
+
+
+def test_snapshot_matches_date_window_without_copying():
+    client = StubClient()
+    provider = BacktestDataProvider(client, ["AAA", "BBB"], "NIFTY", date(2024, 5, 1), date(2024, 5, 31)).load()
+    days = provider.trading_days()
+    assert days[0] == date(2024, 5, 1) and days[-1] == date(2024, 5, 31)
+
+    stock_data, index_df = provider.snapshot(date(2024, 5, 15))
+    expected = client.frames["AAA"].loc["2024-03-01":"2024-05-15"]
+    pd.testing.assert_frame_equal(stock_data["AAA"], expected, check_freq=False, check_dtype=False)
+    assert len(index_df) == len(expected)
+    assert np.shares_memory(stock_data["AAA"].to_numpy(), provider._frames["AAA"][0])
+
+    # Indicator code adds columns to the views without touching the source.
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        stock_data["AAA"]["ama"] = stock_data["AAA"]["close"].ewm(span=10).mean()
+    assert "ama" not in provider.snapshot(date(2024, 5, 15))[0]["AAA"].columns
+    assert client.requests == 3
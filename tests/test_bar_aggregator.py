@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from data.live_fetch.bar_aggregator import IntradayBarAggregator
+
+
+def test_ticks_build_bars_on_exchange_boundaries():
+    events = []
+    agg = IntradayBarAggregator((1, 5), on_bar=lambda s, i, bar: events.append((s, i, bar)))
+    ticks = [
+        ("09:15:05", 100.0, 1000), ("09:15:40", 102.0, 1300), ("09:15:59", 99.0, 1350),
+        ("09:16:10", 101.0, 1400), ("09:19:59", 103.0, 1500), ("09:20:00", 104.0, 1550),
+    ]
+    for clock, price, volume in ticks:
+        agg.update("AAA", price, datetime.fromisoformat(f"2024-05-02T{clock}"), volume)
+
+    one_min = [bar for _, i, bar in events if i == 1]
+    assert [b['time'].strftime("%H:%M") for b in one_min] == ["09:15", "09:16", "09:19"]
+    first = one_min[0]
+    assert (first['open'], first['high'], first['low'], first['close']) == (100.0, 102.0, 99.0, 99.0)
+    assert first['volume'] == 350  # the first tick only sets the volume baseline
+
+    five_min = [bar for _, i, bar in events if i == 5]
+    assert len(five_min) == 1
+    assert five_min[0]['high'] == 103.0 and five_min[0]['close'] == 103.0
+    assert agg.bars("AAA", 5)['close'].tolist() == [103.0, 104.0]
+
+
+def test_close_due_emits_quiet_symbols_once():
+    events = []
+    agg = IntradayBarAggregator((5,), on_bar=lambda s, i, bar: events.append(s))
+    agg.update("AAA", 10.0, datetime(2024, 5, 2, 9, 21))
+    agg.close_due(datetime(2024, 5, 2, 9, 24))
+    assert events == []
+    agg.close_due(datetime(2024, 5, 2, 9, 25))
+    agg.close_due(datetime(2024, 5, 2, 9, 26))
+    assert events == ["AAA"]
+    agg.update("AAA", 11.0, datetime(2024, 5, 2, 9, 26))
+    assert events == ["AAA"]
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from data.live_fetch.bar_buffer import BarBuffer, LiveBars, apply_live_prices
+
+
+def _frame(n=30, tz=None):
+    idx = pd.date_range("2024-01-01", periods=n, freq="B", tz=tz)
+    close = np.arange(n, dtype=float) + 100
+    return pd.DataFrame({"open": close, "high": close + 1, "low": close - 1,
+                         "close": close, "volume": np.full(n, 1000.0)}, index=idx)
+
+
+def test_from_frame_round_trips():
+    df = _frame(tz="Asia/Kolkata")
+    buf = BarBuffer.from_frame(df)
+    pd.testing.assert_frame_equal(buf.frame(), df, check_freq=False)
+    assert buf.last_time() == df.index[-1]
+
+
+def test_append_keeps_latest_bars_in_flat_memory():
+    buf = BarBuffer.from_frame(_frame(), capacity=50)
+    storage = buf._data
+    start = pd.Timestamp("2024-03-01")
+    for i in range(1000):
+        buf.append(start + pd.Timedelta(minutes=i), 200.0 + i)
+    assert len(buf) == 50
+    assert buf._data is storage
+    np.testing.assert_array_equal(buf.close, 200.0 + np.arange(950, 1000))
+    assert buf.index()[-1] == start + pd.Timedelta(minutes=999)
+
+
+def test_views_share_memory_and_ticks_update_last_bar():
+    buf = BarBuffer.from_frame(_frame())
+    close = buf.close
+    buf.append("2024-03-01 09:15", 150.0)
+    buf.apply_tick(152.0, volume=10)
+    buf.apply_tick(149.0)
+    frame = buf.frame()
+    assert np.shares_memory(frame.to_numpy(), buf._data)
+    assert frame.iloc[-1].tolist() == [150.0, 152.0, 149.0, 149.0, 10.0]
+    assert np.shares_memory(close, buf._data)
+
+
+def test_apply_live_prices_leaves_inputs_untouched():
+    df = _frame()[["close", "high"]]
+    out = apply_live_prices({"ABC": df, "XYZ": df}, {"ABC": 140.0}, ts=pd.Timestamp("2024-03-01"))
+    assert len(df) == 30
+    assert out["XYZ"] is df
+    assert list(out["ABC"].columns) == ["close", "high"]
+    assert out["ABC"].iloc[-1].tolist() == [140.0, 140.0]
+
+
+def test_live_prices_rewrite_one_buffer_per_symbol():
+    df = _frame(tz="Asia/Kolkata")
+    bars = LiveBars()
+    first = apply_live_prices({"ABC": df}, {"ABC": 140.0}, pd.Timestamp("2024-03-01 10:00"), bars)["ABC"]
+    buf = bars.buffer("ABC", df)
+    second = apply_live_prices({"ABC": df}, {"ABC": 141.0}, pd.Timestamp("2024-03-01 10:05"), bars)["ABC"]
+
+    assert bars.buffer("ABC", df) is buf
+    assert np.shares_memory(second.to_numpy(), buf._data)
+    assert len(second) == 31 and second["close"].iloc[-1] == 141.0
+    assert second.index[-1] == pd.Timestamp("2024-03-01 10:05", tz="Asia/Kolkata")
+    pd.testing.assert_frame_equal(second.iloc[:-1], df, check_freq=False)
+    assert first["close"].iloc[-1] == 141.0  # a view on the same buffer
+
+    # A new history (e.g. after the daily fetch) seeds a new buffer.
+    longer = _frame(31, tz="Asia/Kolkata")
+    third = apply_live_prices({"ABC": longer}, {"ABC": 150.0}, pd.Timestamp("2024-03-01 10:10"), bars)["ABC"]
+    assert bars.buffer("ABC", longer) is not buf
+    assert len(third) == 32
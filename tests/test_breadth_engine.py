@@ -20,3 +20,54 @@ def test_engine_false_when_threshold_not_met():
     engine = BreadthEngine(ma_days=50, threshold=0.75)
     assert engine.evaluate({"A": df1, "B": df2}) is False
 
+
+def test_compute_returns_metric_time_series():
+    df1 = _make_df(range(1, 61))
+    df2 = _make_df([1] * 30 + list(range(30, 0, -1)))
+    engine = BreadthEngine(ma_days=50, threshold=0.5)
+    metrics = engine.compute({"A": df1, "B": df2})
+
+    assert len(metrics) == 60
+    assert {"pct_above_20ma", "pct_above_50ma", "pct_above_200ma", "ad_line", "new_highs",
+            "new_lows", "mcclellan"} <= set(metrics.columns)
+    assert metrics["pct_above_50ma"].iloc[-1] == 0.5
+    assert metrics["pct_above_50ma"].iloc[:49].isna().all()
+    assert metrics["pct_above_200ma"].isna().all()
+    assert metrics["advances"].iloc[-1] == 1 and metrics["declines"].iloc[-1] == 1
+    assert metrics["ad_line"].iloc[10] == 10
+    assert engine.strong_days(metrics).iloc[-1]
+
+
+def test_entry_engine_gates_on_the_full_breadth_metrics(monkeypatch):
+    from strategy import rs_entry_engine
+    from tools.synthetic import generate_universe
+
+    sent = []
+    monkeypatch.setattr(rs_entry_engine, "send_telegram_message", sent.append)
+    for regime, gated in (("bull", False), ("bear", True)):
+        stocks, index_df = generate_universe(60, 250, regime=regime, seed=1)
+        entries = rs_entry_engine.run_daily_entry_engine(
+            None, None, None, stock_data_dict=stocks, index_df=index_df,
+            use_sector_filter=False, client=object(), workers=1)
+        assert bool(sent) == gated
+        if not gated:
+            assert set(entries.attrs["breadth"]) >= {"pct_above_20ma", "pct_above_200ma", "ad_line",
+                                                     "new_highs", "new_lows", "mcclellan"}
+
+
+def test_breadth_gate_counts_symbols_without_a_live_price(monkeypatch):
+    from strategy import rs_entry_engine
+    from tools.synthetic import generate_universe
+
+    monkeypatch.setattr(rs_entry_engine, "send_telegram_message", lambda message: None)
+    stocks, index_df = generate_universe(60, 250, regime="bull", seed=1)
+    run = lambda **kwargs: rs_entry_engine.run_daily_entry_engine(
+        None, None, None, stock_data_dict=stocks, index_df=index_df,
+        use_sector_filter=False, client=object(), workers=1, **kwargs)
+    closed = run().attrs["breadth"]
+    # Three symbols tick 10% lower; the other 57 have no bar on the live row.
+    live = run(live_prices={s: df["close"].iloc[-1] * 0.9 for s, df in list(stocks.items())[:3]})
+
+    breadth = live.attrs["breadth"]
+    assert breadth["advances"] + breadth["declines"] == 3
+    assert abs(breadth["pct_above_50ma"] - closed["pct_above_50ma"]) <= 3 / 60
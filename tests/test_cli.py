@@ -0,0 +1,41 @@
+import subprocess
+import sys
+from datetime import date
+
+import main
+from tools.startup import ImportProfiler
+
+
+def test_parser_defaults_to_scan_and_parses_dates():
+    args = main.build_parser().parse_args([])
+    assert args.func is main.scan and not args.profile_startup
+
+    args = main.build_parser().parse_args(["--profile-startup", "backtest", "--start", "2025-05-01"])
+    assert args.func is main.backtest and args.profile_startup
+    assert args.start == date(2025, 5, 1) and args.end is None
+
+
+def test_help_imports_no_heavy_modules():
+    code = ("import sys, main; main.build_parser().format_help(); "
+            "print(sorted(m for m in ('pandas', 'numpy', 'kiteconnect', 'matplotlib', 'requests') "
+            "if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_import_profiler_records_new_modules(tmp_path, monkeypatch):
+    (tmp_path / "slow_child.py").write_text("import time\ntime.sleep(0.02)\n")
+    (tmp_path / "slow_parent.py").write_text("import slow_child\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    with ImportProfiler() as profiler:
+        __import__("slow_parent")
+
+    cumulative, own, depth = profiler.records["slow_parent"]
+    assert depth == 0 and profiler.records["slow_child"][2] == 1
+    assert cumulative >= profiler.records["slow_child"][0] >= 0.02
+    assert own < 0.02
+    assert "slow_parent" in profiler.by_package()
+    assert profiler.report()[0].startswith("[⏱️] Startup:")
+    monkeypatch.delitem(sys.modules, "slow_parent")
+    monkeypatch.delitem(sys.modules, "slow_child")
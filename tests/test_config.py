@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from tools.config import ConfigError, ConfigStore, parse_params
+
+
+def _store(tmp_path, params="index_symbol: NIFTY\nstock_list: [INFY, TCS]\ntop_n: 5\n"):
+    (tmp_path / "params.yaml").write_text(params)
+    (tmp_path / "sector_map.yaml").write_text("INFY: IT\nTCS: IT\n")
+    (tmp_path / "secrets.yaml").write_text("telegram_bot_token: abc\ntelegram_chat_id: [1, 2]\n")
+    return ConfigStore(str(tmp_path / "params.yaml"), str(tmp_path / "sector_map.yaml"),
+                       str(tmp_path / "secrets.yaml"))
+
+
+def test_snapshot_is_cached_until_a_file_changes(tmp_path):
+    store = _store(tmp_path)
+    first = store.get()
+    assert store.get() is first
+    assert store.loads == 1
+    assert first.params.stock_list == ("INFY", "TCS")
+    assert first.params.top_n == 5
+    assert first.sector_map["TCS"] == "IT"
+    assert first.secrets["telegram_chat_id"] == (1, 2)
+
+    path = tmp_path / "params.yaml"
+    path.write_text("index_symbol: NIFTY\nstock_list: [INFY]\ntop_n: 5\n")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    second = store.get()
+    assert second is not first
+    assert second.version == first.version + 1
+    assert second.params.stock_list == ("INFY",)
+
+
+def test_snapshot_is_immutable(tmp_path):
+    snapshot = _store(tmp_path).get()
+    with pytest.raises(Exception):
+        snapshot.params.top_n = 10
+    with pytest.raises(TypeError):
+        snapshot.sector_map["WIPRO"] = "IT"
+
+
+def test_mistyped_values_are_rejected():
+    with pytest.raises(ConfigError, match="top_n"):
+        parse_params({"top_n": "fifty"})
+    with pytest.raises(ConfigError, match="workers"):
+        parse_params({"workers": True})
+    with pytest.raises(ConfigError, match="logging.level"):
+        parse_params({"logging": {"level": 10}})
+
+
+def test_unknown_keys_are_kept_in_extra():
+    params = parse_params({"stock_list": ["INFY"], "max_holdings": 10})
+    assert params.extra["max_holdings"] == 10
+    assert params.use_sector_filter is True
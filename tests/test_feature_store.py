@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from core.feature_store import FeatureStore
+from core.rs_calculator import add_ama, add_donchian_channel, compute_ama, compute_rs_alpha
+
+
+def _frame(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.normal(0, 1, n).cumsum()
+    idx = pd.date_range("2024-01-01", periods=n, freq="B")
+    return pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close}, index=idx)
+
+
+def test_add_indicators_matches_uncached_and_hits():
+    store = FeatureStore()
+    df = _frame()
+    expected = add_donchian_channel(add_ama(df.copy()))
+
+    first = store.add_indicators("ABC", df.copy())
+    second = store.add_indicators("ABC", df.copy())
+    for col in ("ama", "donchian_high", "donchian_low", "donchian_breakout"):
+        pd.testing.assert_series_equal(first[col], expected[col], check_names=False)
+        pd.testing.assert_series_equal(second[col], expected[col], check_names=False)
+    assert store.stats()["misses"] == 2
+    assert store.stats()["hits"] == 2
+
+
+def test_new_bar_invalidates_entry():
+    store = FeatureStore()
+    df = _frame()
+    index_df = _frame(seed=1)
+    store.rs_alpha("ABC", df, index_df)
+    longer = _frame(61)
+    result = store.rs_alpha("ABC", longer, _frame(61, seed=1))
+    pd.testing.assert_series_equal(result, compute_rs_alpha(longer, _frame(61, seed=1)))
+    assert store.stats()["hits"] == 0
+
+
+def test_lru_eviction_respects_memory_cap():
+    df = _frame()
+    size = int(compute_ama(df).memory_usage(index=True))
+    store = FeatureStore(max_bytes=size * 2)
+    for sym in ("A", "B", "C"):
+        store.ama(sym, df)
+    stats = store.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= size * 2
+
+    store.ama("B", df)  # still cached
+    assert store.stats()["hits"] == 1
+
+
+def test_anonymous_frames_are_not_cached():
+    store = FeatureStore()
+    store.ama(None, _frame())
+    assert store.stats()["entries"] == 0
+
+
+def test_restated_bar_with_same_last_bar_is_not_served_stale():
+    store = FeatureStore()
+    df = _frame()
+    store.ama("ABC", df)
+    restated = df.copy()
+    restated.iloc[10, restated.columns.get_loc("close")] += 5
+    pd.testing.assert_series_equal(store.ama("ABC", restated), compute_ama(restated))
+    assert store.stats()["hits"] == 0
+
+
+def test_provisional_live_frames_are_not_cached():
+    from data.live_fetch.bar_buffer import apply_live_prices
+
+    store = FeatureStore()
+    live = apply_live_prices({"ABC": _frame()}, {"ABC": 101.0})["ABC"]
+    store.ama("ABC", live)
+    store.ama("ABC", live)
+    assert store.stats()["entries"] == 0
+
+
+def test_rs_alpha_follows_the_live_price():
+    from data.live_fetch.bar_buffer import apply_live_prices
+
+    store = FeatureStore()
+    index_df = _frame(seed=1)
+    stamp = index_df.index[-1] + pd.offsets.BDay()
+    up = apply_live_prices({"ABC": _frame()}, {"ABC": 200.0}, stamp)["ABC"]
+    down = apply_live_prices({"ABC": _frame()}, {"ABC": 50.0}, stamp)["ABC"]
+    live_index = apply_live_prices({"NIFTY": index_df}, {"NIFTY": index_df["close"].iloc[-1]}, stamp)["NIFTY"]
+
+    first = store.rs_alpha("ABC", up, live_index)
+    second = store.rs_alpha("ABC", down, live_index)
+    assert first.iloc[-1] > second.iloc[-1]
+    pd.testing.assert_series_equal(second, compute_rs_alpha(down, live_index, 21))
+    assert store.stats()["entries"] == 0
@@ -0,0 +1,45 @@
+from datetime import date
+
+from data.live_fetch import instrument_master
+from data.live_fetch.instrument_master import InstrumentMaster
+
+
+class CountingKite:
+    def __init__(self):
+        self.calls = 0
+
+    def instruments(self):
+        self.calls += 1
+        return [
+            {"instrument_token": 738561, "tradingsymbol": "RELIANCE", "name": "RELIANCE INDUSTRIES",
+             "instrument_type": "EQ", "exchange": "NSE", "segment": "NSE"},
+            {"instrument_token": 256265, "tradingsymbol": "NIFTY 50", "name": "NIFTY 50",
+             "instrument_type": "Index", "exchange": "NSE", "segment": "INDICES"},
+        ]
+
+
+def test_master_is_downloaded_once_per_trading_day(tmp_path, monkeypatch):
+    monkeypatch.setattr(instrument_master, "_LOADED", {})
+    path = str(tmp_path / "instruments.pkl")
+    kite = CountingKite()
+    friday, saturday, monday = date(2024, 1, 5), date(2024, 1, 6), date(2024, 1, 8)
+
+    master = InstrumentMaster.load(kite, path, today=friday)
+    assert kite.calls == 1
+    assert master.token_map()["RELIANCE"] == 738561
+    assert master.index_token("nifty 50") == 256265
+    assert master.symbol_for_token(256265) == "NIFTY 50"
+
+    # A fresh process reads the pickle; weekends reuse Friday's dump.
+    monkeypatch.setattr(instrument_master, "_LOADED", {})
+    assert len(InstrumentMaster.load(kite, path, today=saturday)) == 2
+    assert kite.calls == 1
+
+    InstrumentMaster.load(kite, path, today=monday)
+    assert kite.calls == 2
+
+
+def test_token_map_copy_is_isolated():
+    master = InstrumentMaster(CountingKite().instruments(), date(2024, 1, 5))
+    master.token_map()["NIFTY"] = 1
+    assert "NIFTY" not in master.token_map()
@@ -1,9 +1,47 @@
+import threading
 import time
-from data.live_fetch.kite_websocket import LivePriceStreamer
+from data.live_fetch.kite_websocket import LivePriceStreamer, TickDispatcher
+from data.live_fetch.offline_kite import OfflineKiteTicker, OfflineMarket
 
 
 def test_snapshot_returns_prices():
-    token_map = {"AAA": 1}
-    streamer = LivePriceStreamer("key", "token", token_map)
+    market = OfflineMarket.synthetic(1, 30)
+    token_map = {"AAA": market.tokens["SYN0"]}
+    streamer = LivePriceStreamer("key", "token", token_map,
+                                 ticker=OfflineKiteTicker(market, interval=0.01))
     prices = streamer.snapshot(["AAA"], timeout=0.1)
     assert "AAA" in prices
+
+
+def test_parse_ticks_uses_reverse_index():
+    streamer = LivePriceStreamer("key", "token", {"NIFTY": 256265, "NIFTY 50": 256265, "AAA": 1})
+    data = streamer._parse_ticks([
+        {"instrument_token": 256265, "last_price": 22000.0},
+        {"instrument_token": 1, "last_price": 10.0},
+        {"instrument_token": 99, "last_price": 5.0},
+    ])
+    assert data == {"NIFTY": 22000.0, "NIFTY 50": 22000.0, "AAA": 10.0}
+
+
+def test_dispatcher_coalesces_while_callback_is_busy():
+    release = threading.Event()
+    batches = []
+
+    def slow_callback(data):
+        batches.append(dict(data))
+        release.wait(1)
+
+    dispatcher = TickDispatcher(slow_callback, max_pending=2).start()
+    dispatcher.submit({"AAA": 1.0})
+    time.sleep(0.05)  # consumer now blocked inside the callback
+    for price in (2.0, 3.0, 4.0):
+        dispatcher.submit({"AAA": price, "BBB": price})
+    dispatcher.submit({"CCC": 1.0})
+    release.set()
+    dispatcher.stop()
+
+    assert batches == [{"AAA": 1.0}, {"AAA": 4.0, "BBB": 4.0}]
+    stats = dispatcher.stats()
+    assert stats["coalesced"] == 4
+    assert stats["dropped"] == 1
+    assert stats["delivered"] == 3
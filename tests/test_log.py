@@ -0,0 +1,94 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tools import log as log_module
+from tools.log import get_logger, setup_logging, shutdown
+
+
+class CountingArg:
+    formatted = 0
+
+    def __str__(self):
+        CountingArg.formatted += 1
+        return "arg"
+
+
+def _lines(path):
+    shutdown()  # flush the background writer
+    return path.read_text().splitlines()
+
+
+def test_filtered_messages_are_never_formatted(tmp_path):
+    path = tmp_path / "run.log"
+    setup_logging("INFO", path=str(path))
+    log = get_logger("core.screener")
+    CountingArg.formatted = 0
+    for _ in range(100):
+        log.debug("[RS] %s", CountingArg())
+    log.info("[RS] summary %s", CountingArg())
+    assert _lines(path) == ["[RS] summary arg"]
+    assert CountingArg.formatted == 1
+    setup_logging()
+
+
+def test_module_levels_quiet_mode_and_json(tmp_path):
+    path = tmp_path / "run.log"
+    setup_logging("INFO", modules={"core.screener": "DEBUG"}, json_lines=True, path=str(path))
+    get_logger("core.screener").debug("[RS] %s: %d points", "INFY", 30)
+    get_logger("core.breadth").debug("hidden")
+    (record,) = [json.loads(line) for line in _lines(path)]
+    assert record['logger'] == "rs.core.screener"
+    assert record['level'] == "DEBUG"
+    assert record['message'] == "[RS] INFY: 30 points"
+
+    quiet = tmp_path / "quiet.log"
+    setup_logging(quiet=True, path=str(quiet))
+    get_logger("core.screener").info("hidden")
+    get_logger("core.screener").warning("[WARN] shown")
+    assert _lines(quiet) == ["[WARN] shown"]
+    setup_logging()
+    assert log_module._state['listener'] is not None
+
+
+def test_import_starts_no_listener_until_setup():
+    code = ("import threading; from tools.log import get_logger, _state; "
+            "get_logger('core.screener').info('[RS] before setup'); "
+            "print(threading.active_count(), _state['listener'])")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         env={**os.environ, 'RS_QUIET': '', 'RS_LOG_LEVEL': ''})
+    assert out.stdout.splitlines() == ["[RS] before setup", "1 None"]
+
+
+def _log_from_worker(n):
+    get_logger("core.parallel").info("[POOL] worker %d", n)
+    get_logger("core.parallel").debug("hidden")
+    return n
+
+
+def test_pool_workers_write_through_the_parent_listener(tmp_path):
+    from core.parallel import process_pool
+
+    path = tmp_path / "run.log"
+    setup_logging("INFO", path=str(path))
+    with process_pool(2) as pool:
+        assert sorted(pool.map(_log_from_worker, range(4))) == [0, 1, 2, 3]
+    assert sorted(_lines(path)) == [f"[POOL] worker {n}" for n in range(4)]
+    setup_logging()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_child_restarts_the_listener(tmp_path):
+    path = tmp_path / "run.log"
+    setup_logging("INFO", path=str(path))
+    pid = os.fork()
+    if pid == 0:
+        get_logger("core.parallel").info("[FORK] child")
+        shutdown()
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert _lines(path) == ["[FORK] child"]
+    setup_logging()
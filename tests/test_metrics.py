@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from tools.metrics import Histogram, Metrics
+
+
+def test_disabled_metrics_record_nothing():
+    m = Metrics(enabled=False)
+    with m.span("stage", symbols=10):
+        pass
+    m.count("calls")
+    m.observe("latency", 0.1)
+    assert m.timed("fn")(lambda x: x + 1)(1) == 2
+    report = m.report()
+    assert report['spans'] == report['histograms'] == report['counters'] == {}
+
+
+def test_spans_counters_and_per_symbol_cost():
+    m = Metrics(enabled=True)
+    for _ in range(3):
+        with m.span("entry.fusion", symbols=100):
+            pass
+    m.count("kite.historical_calls", 2)
+    m.count("kite.historical_calls")
+    m.observe("fetch.symbol_seconds", 0.002)
+
+    report = m.report()
+    assert report['spans']['entry.fusion']['count'] == 3
+    assert report['histograms']['entry.fusion.per_symbol']['count'] == 300
+    assert report['histograms']['fetch.symbol_seconds']['buckets']['0.005'] == 1
+    assert report['counters'] == {'kite.historical_calls': 3}
+
+    with pytest.raises(ValueError):
+        with m.span("failing"):
+            raise ValueError("boom")
+    assert m.report()['spans']['failing']['count'] == 1
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram(buckets=(1.0, 2.0))
+    for value in (0.5, 1.0, 1.5, 3.0):
+        h.observe(value)
+    assert h.cumulative()[-1][1] == 4
+    assert [n for _, n in h.cumulative()] == [2, 3, 4]
+
+
+def test_exports(tmp_path):
+    m = Metrics(enabled=True)
+    with m.span("screen.pattern", symbols=5):
+        pass
+    m.count("kite.quote_calls")
+
+    m.write_json(str(tmp_path / "run.json"))
+    assert json.loads((tmp_path / "run.json").read_text())['counters'] == {'kite.quote_calls': 1}
+
+    m.write_prometheus(str(tmp_path / "rs.prom"))
+    text = (tmp_path / "rs.prom").read_text()
+    assert '# TYPE rs_scan_stage_seconds histogram' in text
+    assert 'rs_scan_stage_seconds_count{stage="screen.pattern"} 1' in text
+    assert 'rs_scan_stage_seconds_bucket{stage="screen.pattern",le="+Inf"} 1' in text
+    assert 'rs_scan_distribution_count{name="screen.pattern.per_symbol"} 5' in text
+    assert 'rs_scan_events_total{name="kite.quote_calls"} 1' in text
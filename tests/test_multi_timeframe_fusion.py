@@ -0,0 +1,33 @@
+import numpy as np
+
+from core.multi_timeframe_fusion import compute_fusion_score, compute_fusion_scores, resample_to_weekly
+
+
+def test_batch_scores_match_scalar(mixed_universe):
+    frames, index_df = mixed_universe()
+    index_weekly = resample_to_weekly(index_df)
+    batch = compute_fusion_scores(frames, index_df, index_weekly)
+
+    for symbol, df in frames.items():
+        expected = compute_fusion_score(df.copy(), resample_to_weekly(df), index_df, index_weekly)
+        assert batch.loc[symbol, "Fusion Score"] == expected, symbol
+    assert batch["Fusion Score"].max() >= 4
+    assert list(batch.index) == list(frames)
+
+
+def test_batch_components_match_entry_engine_recomputation(mixed_universe):
+    from core.pattern_recognizer import get_rs_pattern
+    from core.rs_calculator import add_ama, compute_rs_alpha
+
+    frames, index_df = mixed_universe(seed=5)
+    batch = compute_fusion_scores(frames, index_df)
+    for symbol, df in frames.items():
+        rs_alpha = compute_rs_alpha(df, index_df).dropna()
+        row = batch.loc[symbol]
+        assert row["RS Points"] == len(rs_alpha)
+        if len(rs_alpha) >= 21:
+            assert row["RS Alpha"] == rs_alpha.iloc[-1]
+            assert row["RS Pattern"] == get_rs_pattern(rs_alpha)
+        assert np.isclose(row["AMA"], add_ama(df.copy())["ama"].iloc[-1])
+        avg_volume = df["volume"].rolling(window=20).mean().iloc[-1]
+        assert row["Volume Confirm"] == (df["volume"].iloc[-1] > avg_volume)
@@ -0,0 +1,82 @@
+import contextlib
+import io
+
+import pytest
+
+from data.live_fetch.bar_aggregator import IntradayBarAggregator
+from data.live_fetch.offline_kite import OfflineKiteConnect, OfflineKiteTicker, OfflineMarket, offline_client
+
+
+def _quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def test_client_fetches_from_offline_market():
+    market = OfflineMarket.synthetic(5, 60)
+    client = _quiet(offline_client, market, rate_limit=100, rate_limits={'historical': 100})
+    assert set(client.instrument_cache) == set(market.tokens)
+
+    data = _quiet(client.fetch_multiple_ohlc, ["SYN0", "SYN1", "MISSING"], workers=1)
+    assert set(data) == {"SYN0", "SYN1"}
+    source = market.bars['day']["SYN0"]
+    assert data["SYN0"]['close'].iloc[-1] == pytest.approx(source['close'].iloc[-1])
+    assert client.kite.stats()['calls']['historical'] == 2
+
+    index_df = _quiet(client.fetch_index_data, "NIFTY")
+    assert not index_df.empty
+    assert _quiet(client.fetch_live_prices, ["SYN0"]) == {"SYN0": market.prices["SYN0"]}
+
+
+def test_rate_limits_and_injected_errors():
+    market = OfflineMarket.synthetic(2, 30)
+    kite = OfflineKiteConnect(market, rate_limits={'quote': 2})
+    kite.ltp(["NSE:SYN0"])
+    kite.quote(["NSE:SYN1"])
+    with pytest.raises(Exception) as exc:
+        kite.ltp(["NSE:SYN0"])
+    assert exc.value.code == 429
+    assert kite.stats()['rejected'] == 1
+
+    failing = OfflineKiteConnect(market, error_rate={'historical': 1.0})
+    with pytest.raises(Exception) as exc:
+        failing.historical_data(market.tokens["SYN0"], "2020-01-01", "2020-02-01", "day")
+    assert exc.value.code == 503
+    with pytest.raises(Exception) as exc:
+        kite.historical_data(market.tokens["SYN0"], "2020-01-01", "2020-12-31", "5minute")
+    assert exc.value.code == 400
+
+
+def test_paper_orders_update_positions():
+    market = OfflineMarket.synthetic(2, 30)
+    kite = OfflineKiteConnect(market)
+    price = market.prices["SYN0"]
+    kite.place_order("regular", "NSE", "SYN0", "BUY", 3, "CNC", "MARKET")
+    kite.place_order("regular", "NSE", "SYN0", "SELL", 1, "CNC", "LIMIT", price=price + 10)
+
+    assert [o['status'] for o in kite.orders()] == ["COMPLETE", "COMPLETE"]
+    (pos,) = kite.positions()['net']
+    assert pos['quantity'] == 2
+    assert pos['pnl'] == pytest.approx(10)
+
+
+def test_ticker_feeds_bar_aggregator():
+    market = OfflineMarket.synthetic(3, 30, start_time="2024-06-03 09:15")
+    ticker = OfflineKiteTicker(market, interval=60)
+    bars = IntradayBarAggregator(intervals=(1, 5))
+    token = market.tokens["SYN0"]
+
+    def on_ticks(ws, ticks):
+        for tick in ticks:
+            bars.on_kite_tick(market.symbols[tick['instrument_token']], tick)
+
+    ticker.on_ticks = on_ticks
+    ticker.subscribe([token])
+    ticker.set_mode(ticker.MODE_FULL, [token])
+    for _ in range(11):
+        ticker.emit()
+
+    assert ticker.ticks_sent == 11
+    assert len(bars.bars("SYN0", 1)) == 11
+    assert len(bars.bars("SYN0", 5)) == 3
+    assert bars.bars("SYN0", 1)['close'].iloc[-1] == market.prices["SYN0"]
@@ -0,0 +1,40 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from data.live_fetch.offline_kite import OfflineBroker, OfflineKiteTicker, OfflineMarket, offline_client
+from data.live_fetch.kite_websocket import LivePriceStreamer
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_offline_pipeline_runs_end_to_end(tmp_path):
+    report = tmp_path / "report.json"
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.offline_pipeline", "--symbols", "5", "--periods", "60",
+         "--historical-rate", "100", "--client-rate", "100", "--stream-seconds", "0.3",
+         "--output", str(report)],
+        cwd=ROOT, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "[FETCH] 5/5 symbols" in result.stdout
+
+    stats = json.loads(report.read_text())
+    assert stats['fetch']['fetched'] == 5
+    assert stats['stream']['ticks_sent'] > 0
+
+
+def test_paper_trader_fills_orders_offline():
+    from paper_trader import PaperTrader
+
+    market = OfflineMarket.synthetic(3, 60)
+    client = offline_client(market, rate_limit=100, rate_limits={'historical': 100})
+    streamer = LivePriceStreamer(None, None, client.instrument_cache, ticker=OfflineKiteTicker(market))
+    trader = PaperTrader(client=client, streamer=streamer)
+    assert isinstance(trader.broker, OfflineBroker)
+
+    trader.enter_positions(["SYN0", "SYN1"])
+    assert set(trader.positions) == {"SYN0", "SYN1"}
+    assert [o['side'] for o in trader.broker.orders] == ["buy", "buy"]
+    assert trader.broker.holdings["SYN0"]['qty'] == 1
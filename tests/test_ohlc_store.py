@@ -0,0 +1,92 @@
+from datetime import date, datetime
+
+import pandas as pd
+
+import data.live_fetch.kite_client as kite_client
+from data.ohlc_store import OHLCStore
+
+
+class RecordingKite:
+    calls = []
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def set_access_token(self, token):
+        pass
+
+    def historical_data(self, instrument_token, from_date, to_date, interval="day"):
+        RecordingKite.calls.append((from_date, to_date))
+        days = pd.bdate_range(from_date, to_date, tz="Asia/Kolkata")
+        return [
+            {"date": d, "open": 1.0, "high": 2.0, "low": 0.5, "close": float(d.day), "volume": 100}
+            for d in days
+        ]
+
+
+def _client(monkeypatch, tmp_path):
+    RecordingKite.calls = []
+    monkeypatch.setattr(kite_client, "KiteConnect", RecordingKite)
+    monkeypatch.setattr(kite_client.ZerodhaKiteClient, "build_token_cache", lambda self: {"RELIANCE": 738561})
+    return kite_client.ZerodhaKiteClient("key", "secret", "token", store=OHLCStore(str(tmp_path)))
+
+
+def test_store_round_trip(tmp_path):
+    store = OHLCStore(str(tmp_path))
+    idx = pd.date_range("2024-01-01", periods=5, freq="D", tz="Asia/Kolkata")
+    df = pd.DataFrame({"open": 1.0, "high": 2.0, "low": 0.5, "close": range(5), "volume": 10}, index=idx)
+    store.write("ABC", "day", df, requested_from=date(2024, 1, 1), fetched_to=date(2024, 1, 5))
+
+    result = store.read("ABC", "day", start=date(2024, 1, 2), end=date(2024, 1, 4))
+    assert list(result["close"]) == [1.0, 2.0, 3.0]
+    assert str(result.index.tz) == "Asia/Kolkata"
+
+
+def test_second_fetch_only_requests_missing_tail(monkeypatch, tmp_path):
+    client = _client(monkeypatch, tmp_path)
+    first = client.fetch_historical_ohlc("RELIANCE", date(2024, 1, 1), date(2024, 1, 10))
+    assert RecordingKite.calls == [(date(2024, 1, 1), date(2024, 1, 10))]
+
+    second = client.fetch_historical_ohlc("RELIANCE", date(2024, 1, 1), date(2024, 1, 12))
+    assert RecordingKite.calls[-1] == (date(2024, 1, 10), date(2024, 1, 12))
+    assert len(second) == len(first) + 2
+    assert second.index.is_unique
+
+
+def test_current_store_makes_no_request(monkeypatch, tmp_path):
+    client = _client(monkeypatch, tmp_path)
+    client.fetch_historical_ohlc("RELIANCE", date(2024, 1, 1), date(2024, 1, 12))
+    calls = len(RecordingKite.calls)
+
+    # Fetch of a settled Friday, then a weekend request: nothing new can exist.
+    df = client.fetch_historical_ohlc("RELIANCE", date(2024, 1, 2), date(2024, 1, 14))
+    assert len(RecordingKite.calls) == calls
+    assert df.index[0].date() == date(2024, 1, 2)
+    assert client.store.meta("RELIANCE")["fetched_to"] == "2024-01-12"
+    assert datetime.fromisoformat(client.store.meta("RELIANCE")["fetched_at"])
+
+
+def test_cached_fetch_never_creates_kite_session_or_loads_instruments(monkeypatch, tmp_path):
+    def fail(*args, **kwargs):
+        raise AssertionError("network object used for a cached read")
+
+    client = _client(monkeypatch, tmp_path)
+    client.fetch_historical_ohlc("RELIANCE", date(2024, 1, 1), date(2024, 1, 12))
+
+    monkeypatch.setattr(kite_client, "KiteConnect", fail)
+    monkeypatch.setattr(kite_client.ZerodhaKiteClient, "build_token_cache", fail)
+    cold = kite_client.ZerodhaKiteClient("key", "secret", "token", store=OHLCStore(str(tmp_path)))
+    df = cold.fetch_historical_ohlc("RELIANCE", date(2024, 1, 2), date(2024, 1, 14))
+    assert df.index[0].date() == date(2024, 1, 2)
+    assert cold._kite is None and cold._instrument_cache is None
+
+
+def test_later_window_fetches_the_gap_after_the_stored_span(tmp_path):
+    store = OHLCStore(str(tmp_path))
+    idx = pd.bdate_range("2024-01-01", "2024-01-31", tz="Asia/Kolkata")
+    df = pd.DataFrame({"open": 1.0, "high": 2.0, "low": 0.5, "close": 1.0, "volume": 10}, index=idx)
+    store.write("ABC", "day", df, requested_from=date(2024, 1, 1), fetched_to=date(2024, 1, 31))
+
+    assert store.missing_ranges("ABC", date(2024, 3, 1), date(2024, 3, 31)) == [
+        (date(2024, 1, 31), date(2024, 3, 31))
+    ]
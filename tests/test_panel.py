@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from core.panel import Panel
+
+
+def _df(dates, values):
+    values = np.asarray(values, dtype=float)
+    return pd.DataFrame({"open": values, "high": values + 1, "low": values - 1,
+                         "close": values, "volume": values * 10}, index=pd.DatetimeIndex(dates))
+
+
+def test_from_frames_aligns_to_calendar_and_round_trips():
+    dates = pd.date_range("2024-01-01", periods=5, freq="D")
+    frames = {"A": _df(dates, range(5)), "B": _df(dates[[0, 2, 4]], [10, 12, 14])}
+    panel = Panel.from_frames(frames, calendar=dates)
+
+    assert panel.shape == (5, 2)
+    assert panel.columns == {"A": 0, "B": 1}
+    assert panel.close.flags["C_CONTIGUOUS"]
+    assert list(panel.mask[:, 1]) == [True, False, True, False, True]
+    assert np.isnan(panel.high[1, 1])
+
+    out = panel.to_frames()
+    pd.testing.assert_frame_equal(out["B"], frames["B"])
+    pd.testing.assert_frame_equal(out["A"], frames["A"], check_freq=False)
+
+
+def test_calendar_drops_off_calendar_bars_and_align_reindexes():
+    dates = pd.date_range("2024-01-01", periods=4, freq="D")
+    index_df = _df(dates[1:], [1, 2, 3])
+    panel = Panel.from_frames({"A": _df(dates, [5, 6, 7, 8])}, calendar=index_df)
+
+    assert list(panel.close[:, 0]) == [6, 7, 8]
+    assert list(panel.align(index_df)) == [1, 2, 3]
+    assert panel.upto(dates[2]).shape == (2, 1)
+    assert np.shares_memory(panel.upto(dates[2]).close, panel.close)
+    assert panel.select(["A"]).symbols == ["A"]
+
+
+def test_mixed_naive_and_aware_indexes_are_matched_on_wall_dates():
+    naive = pd.date_range("2024-01-01", periods=4, freq="D")
+    aware = naive.tz_localize("Asia/Kolkata")
+    frames = {"A": _df(naive, range(4)), "B": _df(aware, [10, 11, 12, 13])}
+
+    panel = Panel.from_frames(frames)
+    assert len(panel) == 4 and str(panel.dates.tz) == "Asia/Kolkata"
+    assert panel.mask.all()
+
+    on_naive = Panel.from_frames(frames, calendar=naive)
+    np.testing.assert_array_equal(on_naive.close[:, 1], [10, 11, 12, 13])
+    np.testing.assert_array_equal(on_naive.align(frames["B"]), [10, 11, 12, 13])
+    np.testing.assert_array_equal(panel.align(frames["A"]), [0, 1, 2, 3])
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+import core.parallel as parallel
+from core.multi_timeframe_fusion import compute_fusion_scores, resample_to_weekly
+from core.panel import Panel
+
+
+def test_map_panel_matches_serial(monkeypatch, mixed_universe):
+    monkeypatch.setattr(parallel, "MIN_PARALLEL_SYMBOLS", 0)
+    frames, index_df = mixed_universe(n=30)
+    panel = Panel.from_frames(frames)
+    index_weekly = resample_to_weekly(index_df)
+
+    serial = compute_fusion_scores(panel, index_df, index_weekly)
+    result = parallel.map_panel(compute_fusion_scores, panel, workers=3,
+                                index_df=index_df, index_weekly=index_weekly)
+    pd.testing.assert_frame_equal(result, serial)
+
+
+def test_pools_do_not_fork_the_threaded_parent():
+    assert parallel.pool_context().get_start_method() in ("forkserver", "spawn")
+
+
+def test_array_results_concatenate_by_symbol(monkeypatch, mixed_universe):
+    monkeypatch.setattr(parallel, "MIN_PARALLEL_SYMBOLS", 0)
+    frames, _ = mixed_universe(n=9)
+    panel = Panel.from_frames(frames)
+    result = parallel.map_panel(_closes, panel, workers=2, chunks_per_worker=2)
+    np.testing.assert_array_equal(result, panel.close)
+
+
+def _closes(panel):
+    return panel.close
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from core.panel import Panel
+from strategy.backtest_engine import SignalCache, compute_signals
+from strategy.param_sweep import expand_grid, run_sweep, sample_space
+
+
+def test_expand_grid_and_sample_space():
+    grid = expand_grid({'ama_period': [10, 20], 'min_score': [3, 4, 5]})
+    assert len(grid) == 6
+    assert {'ama_period': 20, 'min_score': 5} in grid
+
+    space = {'ama_period': (5, 30), 'breadth_threshold': (0.4, 0.6), 'min_score': [3, 4]}
+    configs = sample_space(space, 20, seed=1)
+    assert configs == sample_space(space, 20, seed=1)
+    assert len({tuple(sorted(c.items())) for c in configs}) == 20
+    assert all(5 <= c['ama_period'] <= 30 and isinstance(c['ama_period'], int) for c in configs)
+
+
+def test_cached_signals_match_fresh_computation(mixed_universe):
+    frames, index_df = mixed_universe(n=20, periods=260)
+    panel = Panel.from_frames(frames, calendar=index_df)
+    cache = SignalCache(panel, index_df)
+    compute_signals(panel, index_df, ama_period=20, cache=cache)
+    cached = compute_signals(panel, index_df, ama_period=10, min_score=3, cache=cache)
+    fresh = compute_signals(panel, index_df, ama_period=10, min_score=3)
+    for key in ('score', 'entry', 'exit_reason'):
+        np.testing.assert_array_equal(cached[key], fresh[key])
+    # RS alpha, patterns and breadth were shared between the two configs.
+    assert sum(1 for key in cache._memo if key[0] == 'rs_alpha') == 1
+    assert sum(1 for key in cache._memo if key[0] == 'ama') == 2
+
+
+def test_signal_cache_stays_within_its_byte_budget(mixed_universe):
+    frames, index_df = mixed_universe(n=20, periods=260)
+    panel = Panel.from_frames(frames, calendar=index_df)
+    cache = SignalCache(panel, index_df, max_bytes=panel.close.nbytes * 30)
+    for threshold in (0.03, 0.04, 0.05, 0.06, 0.07):
+        cached = compute_signals(panel, index_df, spike_threshold=threshold, cache=cache)
+        assert cache._bytes <= cache.max_bytes
+    fresh = compute_signals(panel, index_df, spike_threshold=0.07)
+    np.testing.assert_array_equal(cached['exit_reason'], fresh['exit_reason'])
+    assert cache.evictions > 0
+
+
+def test_parallel_sweep_matches_serial(tmp_path, mixed_universe):
+    frames, index_df = mixed_universe(n=20, periods=260)
+    configs = expand_grid({'ama_period': [10, 20], 'min_score': [3, 4], 'max_holdings': [5]})
+    start = index_df.index[200]
+    serial = run_sweep(frames, index_df, configs, start=start, workers=1, output=None)
+    output = tmp_path / "sweep.csv"
+    parallel = run_sweep(frames, index_df, configs, start=start, workers=2, output=str(output))
+
+    columns = [c for c in serial.columns if c != 'seconds']
+    pd.testing.assert_frame_equal(parallel[columns], serial[columns])
+    assert list(serial.index) == [1, 2, 3, 4]
+    assert serial['cagr'].is_monotonic_decreasing
+    assert len(pd.read_csv(output)) == 4
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from core.pattern_recognizer import classify_rs_patterns, classify_rs_window, compact_trailing, get_rs_pattern
+
+
+def _samples(rng):
+    """Random and hand-shaped RS series of varying length."""
+    yield rng.normal(0, 0.02, 40).cumsum()
+    yield np.linspace(0, 0.3, 30) + rng.normal(0, 0.001, 30)          # Flying
+    yield np.r_[np.zeros(25), 0.2]                                      # Lion
+    yield np.r_[np.full(12, 0.1) + rng.normal(0, 0.001, 12), 0.1 + np.linspace(0, 0.005, 10)]  # Star
+    yield np.r_[rng.normal(0, 0.02, 20), np.linspace(0.05, -0.05, 6)]  # Drowning
+    yield np.full(15, 0.02) + rng.normal(0, 0.001, 15)                  # Cat
+    yield rng.normal(0, 0.02, rng.integers(1, 12))                      # short history
+
+
+def test_batch_classifier_matches_scalar():
+    rng = np.random.default_rng(7)
+    series = [s for _ in range(40) for s in _samples(rng)]
+    length = max(len(s) for s in series)
+    matrix = np.full((length, len(series)), np.nan)
+    for j, s in enumerate(series):
+        matrix[length - len(s):, j] = s
+
+    labels = classify_rs_patterns(matrix)
+    expected = [get_rs_pattern(pd.Series(s)) for s in series]
+    assert list(labels) == expected
+    assert {"Flying", "Lion", "Star", "Drowning", "Cat"} <= set(expected)
+
+
+def test_compact_trailing_matches_dropna():
+    dates = pd.date_range("2024-01-01", periods=30, freq="D")
+    rng = np.random.default_rng(1)
+    frame = pd.DataFrame(rng.normal(0, 0.01, (30, 3)).cumsum(axis=0), index=dates, columns=list("ABC"))
+    frame.iloc[[3, 25, 27], 0] = np.nan
+    frame.iloc[:22, 1] = np.nan
+
+    compact = compact_trailing(frame)
+    for j, col in enumerate(frame):
+        tail = frame[col].dropna().to_numpy()[-20:]
+        np.testing.assert_array_equal(compact[20 - len(tail):, j], tail)
+        assert np.isnan(compact[:20 - len(tail), j]).all()
+
+    labels = classify_rs_patterns(pd.DataFrame(compact, columns=frame.columns))
+    assert list(labels.index) == ["A", "B", "C"]
+    assert labels["A"] == get_rs_pattern(frame["A"].dropna())
+
+
+def test_classify_rs_window_matches_vectorised():
+    rng = np.random.default_rng(7)
+    windows = [
+        np.cumsum(rng.normal(0.003, 0.002, 20)),
+        np.r_[1 + rng.normal(0, 0.001, 19), 1.1],
+        np.r_[1 + rng.normal(0, 0.002, 10), 1 + np.cumsum(rng.uniform(0, 0.001, 10))],
+        -np.cumsum(rng.uniform(0, 0.01, 20)),
+        1 + rng.normal(0, 0.002, 20),
+        rng.normal(1, 0.05, 20),
+        np.r_[np.nan, rng.normal(1, 0.05, 19)],
+    ]
+    for x in windows:
+        assert classify_rs_window(x) == classify_rs_patterns(x)[0]
+
+
+def test_flat_windows_with_float_noise_trend_match_scalar():
+    # Flat bases whose last ten bars return to where they started: the Star
+    # trend is zero up to rounding, so only identical arithmetic agrees.
+    rng = np.random.default_rng(3)
+    n = 600
+    windows = np.empty((20, n))
+    windows[:10] = rng.choice([0.3, 1 / 3, 0.7], n) + rng.normal(0, 1e-3, (10, n))
+    windows[10:] = rng.choice([0.1, 0.2, 0.3, 0.7, 1.1, 1 / 3], (10, n))
+    windows[-1] = windows[-10]
+
+    expected = [get_rs_pattern(pd.Series(windows[:, j])) for j in range(n)]
+    assert list(classify_rs_patterns(windows)) == expected
+    assert [classify_rs_window(windows[:, j]) for j in range(n)] == expected
+    assert "Star" in expected
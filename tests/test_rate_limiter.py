@@ -0,0 +1,53 @@
+import time
+from datetime import date
+
+import data.live_fetch.kite_client as kite_client
+from data.live_fetch.rate_limiter import TokenBucket
+
+
+class ThrottledError(Exception):
+    code = 429
+
+
+class FlakyKite:
+    def __init__(self, *args, **kwargs):
+        self.calls = 0
+
+    def set_access_token(self, token):
+        pass
+
+    def historical_data(self, instrument_token, from_date, to_date, interval="day"):
+        self.calls += 1
+        if self.calls == 1:
+            raise ThrottledError("Too many requests")
+        return [{"date": "2024-01-01", "open": 1, "high": 2, "low": 0.5, "close": 1.5}]
+
+
+def test_token_bucket_paces_calls():
+    bucket = TokenBucket(rate=50, capacity=1)
+    started = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    # First token is free, the remaining five need 1/50 s each.
+    assert time.monotonic() - started >= 5 / 50 * 0.9
+
+
+def test_throttled_halves_rate_and_recovers():
+    bucket = TokenBucket(rate=4)
+    bucket.throttled(retry_after=0)
+    assert bucket.rate == 2
+    bucket.succeeded()
+    assert bucket.rate == 2.4
+
+
+def test_download_retries_after_429(monkeypatch):
+    monkeypatch.setattr(kite_client, "KiteConnect", FlakyKite)
+    monkeypatch.setattr(kite_client.ZerodhaKiteClient, "build_token_cache", lambda self: {"RELIANCE": 738561})
+    client = kite_client.ZerodhaKiteClient("key", "secret", "token", rate_limit=100)
+    client.limiter.throttled = lambda retry_after=None: None
+
+    frames = client.fetch_multiple_ohlc(["RELIANCE"], workers=2)
+    assert frames["RELIANCE"]["close"].iloc[0] == 1.5
+    assert client.kite.calls == 2
+    assert len(client.latencies) == 2
+    assert client.fetch_historical_ohlc("UNKNOWN", date(2024, 1, 1), date(2024, 1, 2)).empty
@@ -54,3 +54,19 @@ def test_add_donchian_channel_short_df():
     assert (result["donchian_breakout"] == 0).all()
     assert result["donchian_high"].isna().all()
     assert result["donchian_low"].isna().all()
+
+
+def test_compute_rs_alpha_matrix_matches_per_symbol():
+    from core.rs_calculator import compute_rs_alpha_matrix
+
+    dates = pd.date_range("2020-01-01", periods=60, freq="D")
+    rng = np.random.default_rng(0)
+    closes = pd.DataFrame(100 + rng.normal(size=(60, 3)).cumsum(axis=0), index=dates, columns=["A", "B", "C"])
+    index_df = pd.DataFrame({"close": 200 + rng.normal(size=60).cumsum()}, index=dates)
+
+    batch = compute_rs_alpha_matrix(closes, index_df["close"], period=[5, 21])
+    for period, result in batch.items():
+        for sym in closes:
+            expected = compute_rs_alpha(closes[[sym]].rename(columns={sym: "close"}), index_df, period)
+            np.testing.assert_allclose(result[sym].to_numpy(), expected.to_numpy(), equal_nan=True)
+    assert batch[21].iloc[:21].isna().all().all()
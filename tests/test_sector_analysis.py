@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from core.sector_analysis import SectorIndexEngine, filter_by_sector_strength
+
+SECTORS = {"A1": "UP", "A2": "UP", "B1": "DOWN", "B2": "DOWN", "C1": "FLAT"}
+
+
+def _df(dates, closes, volume=1000.0):
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({"open": closes, "high": closes, "low": closes, "close": closes,
+                         "volume": volume}, index=dates)
+
+
+def _universe(periods=40):
+    dates = pd.bdate_range("2024-01-01", periods=periods)
+    steps = np.arange(periods)
+    data = {
+        "A1": _df(dates, 100 * 1.01 ** steps),
+        "A2": _df(dates, 50 * 1.02 ** steps),
+        "B1": _df(dates, 100 * 0.99 ** steps),
+        "B2": _df(dates, 80 * 0.995 ** steps),
+        "C1": _df(dates, np.full(periods, 20.0)),
+        "XX": _df(dates, np.full(periods, 10.0)),  # not in the sector map
+    }
+    return data, _df(dates, np.full(periods, 1000.0))
+
+
+def test_equal_weighted_levels_and_ranking():
+    data, index_df = _universe()
+    engine = SectorIndexEngine(SECTORS).build(data)
+
+    assert engine.sectors == ["DOWN", "FLAT", "UP"]
+    assert "XX" not in engine.symbols
+    up = engine.frame()["UP"]
+    assert up.iloc[0] == 100.0
+    assert np.isclose(up.iloc[1], 100 * (1 + (0.01 + 0.02) / 2))
+
+    ranking = engine.rank(index_df)
+    assert list(ranking.index) == ["UP", "FLAT", "DOWN"]
+    assert ranking.loc["UP", "Constituents"] == 2
+
+
+def test_missing_bar_drops_out_of_the_average():
+    data, _ = _universe()
+    data["A2"] = data["A2"].drop(data["A2"].index[5])
+    engine = SectorIndexEngine(SECTORS).build(data)
+    up = engine.frame()["UP"]
+    assert engine.counts[5, engine.sectors.index("UP")] == 1
+    assert np.isclose(up.iloc[5] / up.iloc[4], 1.01)
+    # The return across the gap is taken from A2's last close.
+    assert np.isclose(up.iloc[6] / up.iloc[5], 1 + (0.01 + (1.02 ** 2 - 1)) / 2)
+
+
+def test_volume_weighting_uses_traded_value():
+    data, _ = _universe()
+    data["A1"]["volume"] = 3000.0
+    data["A2"]["volume"] = 0.0
+    engine = SectorIndexEngine(SECTORS, weighting="volume").build(data)
+    up = engine.frame()["UP"]
+    assert np.isclose(up.iloc[1] / up.iloc[0], 1.01)
+
+
+def test_incremental_update_matches_full_build():
+    data, _ = _universe(60)
+    head = {s: df.iloc[:45] for s, df in data.items()}
+    engine = SectorIndexEngine(SECTORS).build(head)
+    engine.sync(data)
+    full = SectorIndexEngine(SECTORS).build(data)
+
+    assert len(engine.dates) == 60
+    np.testing.assert_allclose(engine.levels, full.levels)
+    np.testing.assert_array_equal(engine.counts, full.counts)
+
+
+def test_sync_rebuilds_when_a_used_bar_changes():
+    data, _ = _universe()
+    engine = SectorIndexEngine(SECTORS).build(data)
+    before = engine.levels.copy()
+    revised = {s: df.copy() for s, df in data.items()}
+    revised["A1"].iloc[-1, revised["A1"].columns.get_loc("close")] *= 1.1
+    engine.sync(revised)
+    assert engine.levels[-1, engine.sectors.index("UP")] > before[-1, engine.sectors.index("UP")]
+
+
+def test_filter_keeps_members_of_the_top_sectors():
+    data, index_df = _universe()
+    engine = SectorIndexEngine(SECTORS)
+    assert filter_by_sector_strength(data, index_df, top_n_sectors=1, engine=engine) == ["A1", "A2"]
+    membership = engine.membership(["UP", "FLAT"])
+    assert membership == {"A1": True, "A2": True, "B1": False, "B2": False, "C1": True}
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from core.streaming import LiveExitEvaluator, RollingExtreme, StreamingEMA, StreamingSMA
+from strategy.rs_exit_engine import evaluate_exit
+
+
+def _frame(n, seed, drift=0.0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(drift, 0.02, n)))
+    idx = pd.date_range("2024-01-01", periods=n, freq="B")
+    return pd.DataFrame({"open": close, "high": close * 1.01, "low": close * 0.99, "close": close}, index=idx)
+
+
+def test_streaming_indicators_match_batch():
+    values = _frame(120, 0)["close"]
+    ema, sma = StreamingEMA(10), StreamingSMA(50)
+    high, low = RollingExtreme(20, "max"), RollingExtreme(20, "min")
+    got = np.array([[ema.update(x), sma.update(x), high.update(x), low.update(x)] for x in values])
+
+    expected = np.column_stack([
+        values.ewm(span=10, adjust=False).mean(),
+        values.rolling(50).mean(),
+        values.rolling(20).max(),
+        values.rolling(20).min(),
+    ])
+    np.testing.assert_allclose(got, expected, rtol=1e-12)
+
+
+def test_peek_does_not_commit():
+    values = _frame(60, 1)["close"].to_numpy()
+    high = RollingExtreme(20, "max", values[:-1])
+    sma = StreamingSMA(50, values[:-1])
+    assert high.peek(values[-1]) == pd.Series(values).rolling(20).max().iloc[-1]
+    assert np.isclose(sma.peek(values[-1]), values[-50:].mean())
+    assert high.count == len(values) - 1
+
+
+def test_live_evaluator_matches_evaluate_exit():
+    reasons = set()
+    for seed in range(30):
+        stock = _frame(80, seed, drift=0.002 * (seed % 3 - 1))
+        index_df = _frame(80, seed + 100)
+        evaluator = LiveExitEvaluator(stock, index_df, "ABC")
+        for price in stock["close"].iloc[-1] * np.array([0.9, 0.99, 1.0, 1.02, 1.1]):
+            index_price = index_df["close"].iloc[-1] * 1.001
+            ts = stock.index[-1] + pd.Timedelta(hours=10)
+            live = pd.concat([stock, pd.DataFrame(
+                {"open": price, "high": price, "low": price, "close": price}, index=[ts])])
+            live_index = pd.concat([index_df, pd.DataFrame({"close": index_price}, index=[ts])])
+
+            expected = evaluate_exit(live, live_index, "ABC")
+            result = evaluator.evaluate(price, index_price)
+            if expected is None:
+                assert result is None
+                continue
+            reasons.add(expected["Exit Reason"])
+            assert result["Exit Reason"] == expected["Exit Reason"]
+            assert result["RS Pattern"] == expected["RS Pattern"]
+            assert np.isclose(result["RS Alpha"], expected["RS Alpha"])
+            assert np.isclose(result["AMA"], expected["AMA"])
+    assert len(reasons) >= 2
+
+
+def test_update_commits_bar():
+    stock = _frame(81, 3)
+    index_df = _frame(81, 4)
+    evaluator = LiveExitEvaluator(stock.iloc[:-1], index_df.iloc[:-1], "ABC")
+    last = stock.iloc[-1]
+    evaluator.update(last["close"], last["high"], index_df["close"].iloc[-1])
+    fresh = LiveExitEvaluator(stock, index_df, "ABC")
+    assert np.isclose(evaluator.ama.value, fresh.ama.value)
+    assert evaluator.donchian_high.value == fresh.donchian_high.value
+    assert evaluator.evaluate(last["close"] * 0.95) == fresh.evaluate(last["close"] * 0.95)
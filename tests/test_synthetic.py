@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from benchmarks.run_benchmarks import compare_results
+from tools.synthetic import generate_universe
+
+
+def test_generate_universe_is_deterministic():
+    a, index_a = generate_universe(5, 60, seed=7)
+    b, index_b = generate_universe(5, 60, seed=7)
+    assert list(a) == list(b) == ["SYN0", "SYN1", "SYN2", "SYN3", "SYN4"]
+    for symbol in a:
+        pd.testing.assert_frame_equal(a[symbol], b[symbol])
+    pd.testing.assert_frame_equal(index_a, index_b)
+
+    c, _ = generate_universe(5, 60, seed=8)
+    assert not a["SYN0"].equals(c["SYN0"])
+
+
+def test_generate_universe_shapes_and_gaps():
+    data, index_df = generate_universe(20, 80, regime="volatile", seed=1, gap_rate=0.1)
+    assert len(index_df) == 80
+    assert list(index_df.columns) == ["open", "high", "low", "close", "volume"]
+    for df in data.values():
+        assert len(df) <= 80
+        assert df.index[-1] == index_df.index[-1]
+        assert (df["high"] >= df[["open", "close"]].max(axis=1)).all()
+        assert (df["low"] <= df[["open", "close"]].min(axis=1)).all()
+    assert any(len(df) < 80 for df in data.values())
+
+    with pytest.raises(ValueError):
+        generate_universe(2, 10, regime="crash")
+
+
+def test_compare_results_flags_regressions():
+    baseline = {"results": [
+        {"benchmark": "screen_stocks", "symbols": 500, "seconds": 1.0},
+        {"benchmark": "evaluate_breadth", "symbols": 500, "seconds": 0.01},
+    ]}
+    current = {"results": [
+        {"benchmark": "screen_stocks", "symbols": 500, "seconds": 1.5},
+        {"benchmark": "evaluate_breadth", "symbols": 500, "seconds": 0.02},
+        {"benchmark": "evaluate_exit", "symbols": 500, "seconds": 3.0},
+    ]}
+    rows = compare_results(current, baseline, tolerance=0.2)
+    assert [(r["benchmark"], r["regression"]) for r in rows] == [
+        ("screen_stocks", True),
+        ("evaluate_breadth", False),  # doubled, but below the noise floor
+    ]
@@ -0,0 +1,99 @@
+import time
+
+from output.telegram_bot import TelegramNotifier, coalesce, split_message
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, payload=None):
+        self.status_code = status_code
+        self._payload = payload or {'ok': status_code == 200}
+        self.text = str(self._payload)
+        self.headers = {}
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    def __init__(self, responses=()):
+        self.responses = list(responses)
+        self.posts = []
+        self.closed = False
+
+    def post(self, url, data=None, files=None, timeout=None):
+        self.posts.append((url, dict(data), time.monotonic()))
+        return self.responses.pop(0) if self.responses else FakeResponse()
+
+    def close(self):
+        self.closed = True
+
+
+def test_coalesce_respects_length_limit():
+    assert coalesce(["a", "b", "c"], limit=10) == ["a\n\nb\n\nc"]
+    assert coalesce(["aaaa", "bbbb", "cccc"], limit=10) == ["aaaa\n\nbbbb", "cccc"]
+    assert split_message("line1\nline2\nline3", limit=11) == ["line1", "line2\nline3"]
+    assert all(len(part) <= 5 for part in coalesce(["x" * 12], limit=5))
+
+
+def test_split_message_keeps_markdown_entities_whole():
+    text = "intro\n*bold line\nmore bold* end\ntail"
+    assert split_message(text, limit=26) == ["intro", "*bold line\nmore bold* end", "tail"]
+    assert split_message("a `x\ny` b\nc", limit=8) == ["a `x\ny` ", "b\nc"]
+    assert split_message("```\ncode\nblock```\nnext", limit=18) == ["```\ncode\nblock```", "next"]
+
+
+def test_notifier_batches_messages_per_chat():
+    session = FakeSession()
+    notifier = TelegramNotifier("token", ["1", "2"], session=session, batch_window=0.2,
+                                per_chat_interval=0, global_interval=0)
+    started = time.monotonic()
+    for i in range(30):
+        notifier.notify(f"entry {i}")
+    assert time.monotonic() - started < 0.1  # enqueueing never blocks
+    assert notifier.flush(timeout=5)
+    notifier.close()
+
+    assert len(session.posts) == 2
+    assert {data['chat_id'] for _, data, _ in session.posts} == {"1", "2"}
+    assert session.posts[0][1]['text'].count("entry") == 30
+    assert session.closed
+    assert notifier.stats()['sent'] == 2
+
+
+def test_notifier_retries_after_429():
+    throttled = FakeResponse(429, {'ok': False, 'parameters': {'retry_after': 0.2}})
+    session = FakeSession([throttled])
+    notifier = TelegramNotifier("token", "1", session=session, batch_window=0,
+                                per_chat_interval=0, global_interval=0)
+    notifier.notify("hello")
+    assert notifier.flush(timeout=5)
+
+    assert len(session.posts) == 2
+    assert session.posts[1][2] - session.posts[0][2] >= 0.2
+    assert notifier.stats() == {'enqueued': 1, 'sent': 1, 'failed': 0, 'pending': 0}
+
+
+def test_unconfigured_notifier_drops_messages():
+    notifier = TelegramNotifier(None, [], session=FakeSession())
+    notifier.notify("ignored")
+    assert notifier.stats()['enqueued'] == 0
+    assert notifier.flush(timeout=0.1)
+
+
+def test_rejected_batch_is_resent_per_alert_then_as_plain_text():
+    rejected = FakeResponse(400, {'ok': False, 'description': "can't parse entities"})
+    session = FakeSession([rejected, FakeResponse(), rejected, FakeResponse()])
+    notifier = TelegramNotifier("token", "1", session=session, batch_window=0.2,
+                                per_chat_interval=0, global_interval=0)
+    notifier.notify("🚀 RS Entry: *INFY*")
+    notifier.notify("📊 Pattern: *Lion")
+    assert notifier.flush(timeout=5)
+
+    texts = [(data['text'], data.get('parse_mode')) for _, data, _ in session.posts]
+    assert texts == [
+        ("🚀 RS Entry: *INFY*\n\n📊 Pattern: *Lion", "Markdown"),
+        ("🚀 RS Entry: *INFY*", "Markdown"),
+        ("📊 Pattern: *Lion", "Markdown"),
+        ("📊 Pattern: *Lion", None),
+    ]
+    assert notifier.stats() == {'enqueued': 2, 'sent': 2, 'failed': 0, 'pending': 0}
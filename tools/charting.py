@@ -1,16 +1,14 @@
 # rs_outperformance_kite_system/tools/charting.py
 
 import matplotlib.pyplot as plt
-import pandas as pd
 import os
-from core.rs_calculator import add_ama, add_donchian_channel
+from core.feature_store import feature_store
 
 def plot_rs_chart(symbol, stock_df, index_df, pattern=None, show=False):
     try:
         df = stock_df.copy()
         index = index_df.copy()
-        df = add_ama(df)
-        df = add_donchian_channel(df)
+        df = feature_store.add_indicators(symbol, df)
 
         # RS ratio
         df['rs'] = df['close'] / index['close']
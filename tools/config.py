@@ -0,0 +1,165 @@
+# rs_outperformance_kite_system/tools/config.py
+
+"""One cached, validated snapshot of the YAML configuration per process.
+
+:func:`get_config` parses ``config/params.yaml``, ``config/sector_map.yaml``
+and the secrets (via :func:`tools.secrets.load_secrets`) the first time it is
+called and returns the same immutable :class:`ConfigSnapshot` afterwards. On
+each call the files' modification times are checked; only when one changed
+is a new snapshot built. Environment variable overrides for secrets are read
+when a snapshot is built.
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+
+import yaml
+
+from tools.secrets import load_secrets
+
+PARAMS_PATH = os.path.join("config", "params.yaml")
+SECTOR_MAP_PATH = os.path.join("config", "sector_map.yaml")
+SECRETS_PATH = os.path.join("config", "secrets.yaml")
+# libyaml's loader parses the 500-symbol params file several times faster.
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _empty():
+    return MappingProxyType({})
+
+
+class ConfigError(ValueError):
+    """A configuration file has a missing or mistyped value."""
+
+
+@dataclass(frozen=True)
+class LoggingConfig:
+    level: str = None
+    quiet: bool = False
+    json: bool = False
+    path: str = None
+    modules: MappingProxyType = field(default_factory=_empty)
+
+
+@dataclass(frozen=True)
+class Params:
+    """Typed view of ``config/params.yaml``; unknown keys stay in ``extra``."""
+
+    stock_list: tuple = ()
+    index_symbol: str = "NIFTY"
+    top_n: int = 50
+    use_sector_filter: bool = True
+    use_volume_filter: bool = True
+    workers: int = 1
+    metrics: bool = False
+    logging: LoggingConfig = field(default_factory=LoggingConfig)
+    extra: MappingProxyType = field(default_factory=_empty)
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    params: Params
+    sector_map: MappingProxyType
+    secrets: MappingProxyType
+    version: int
+    loaded_at: datetime
+
+
+def _check(source, name, value, kind):
+    if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+        raise ConfigError(f"{source}: '{name}' must be {kind.__name__}, got {type(value).__name__}")
+    return value
+
+
+def parse_params(raw, source=PARAMS_PATH):
+    """Validate a parsed ``params.yaml`` mapping into :class:`Params`."""
+    raw = dict(raw or {})
+    values = {}
+    if 'stock_list' in raw:
+        stocks = _check(source, 'stock_list', raw.pop('stock_list') or [], list)
+        values['stock_list'] = tuple(str(s) for s in stocks)
+    for name, kind in (('index_symbol', str), ('top_n', int), ('use_sector_filter', bool),
+                       ('use_volume_filter', bool), ('workers', int), ('metrics', bool)):
+        if raw.get(name) is not None:
+            values[name] = _check(source, name, raw.pop(name), kind)
+        else:
+            raw.pop(name, None)
+    if values.get('top_n', 1) < 1:
+        raise ConfigError(f"{source}: 'top_n' must be at least 1")
+
+    section = _check(source, 'logging', raw.pop('logging', None) or {}, dict)
+    log_values = {}
+    for name, kind in (('level', str), ('quiet', bool), ('json', bool), ('path', str)):
+        if section.get(name) is not None:
+            log_values[name] = _check(source, f"logging.{name}", section[name], kind)
+    modules = _check(source, 'logging.modules', section.get('modules') or {}, dict)
+    log_values['modules'] = MappingProxyType({str(k): str(v) for k, v in modules.items()})
+
+    return Params(logging=LoggingConfig(**log_values), extra=MappingProxyType(raw), **values)
+
+
+def _read_yaml(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=_Loader) or {}
+
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ConfigStore:
+    """Holds the current snapshot and rebuilds it when a source file changes."""
+
+    def __init__(self, params_path=PARAMS_PATH, sector_map_path=SECTOR_MAP_PATH,
+                 secrets_path=SECRETS_PATH):
+        self.params_path = params_path
+        self.sector_map_path = sector_map_path
+        self.secrets_path = secrets_path
+        self._paths = (params_path, sector_map_path, secrets_path,
+                       secrets_path.replace('.yaml', '.example.yaml'))
+        self._snapshot = None
+        self._stamps = None
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def get(self):
+        stamps = tuple(_stamp(p) for p in self._paths)
+        snapshot = self._snapshot
+        if snapshot is not None and stamps == self._stamps:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or stamps != self._stamps:
+                self._snapshot = self._load()
+                self._stamps = stamps
+            return self._snapshot
+
+    def _load(self):
+        params = parse_params(_read_yaml(self.params_path), self.params_path)
+        sector_map = _check(self.sector_map_path, 'sector_map', _read_yaml(self.sector_map_path), dict)
+        secrets = {k: tuple(v) if isinstance(v, list) else v
+                   for k, v in load_secrets(self.secrets_path).items()}
+        self.loads += 1
+        return ConfigSnapshot(
+            params=params,
+            sector_map=MappingProxyType({str(k): str(v) for k, v in sector_map.items()}),
+            secrets=MappingProxyType(secrets),
+            version=self.loads,
+            loaded_at=datetime.now(),
+        )
+
+
+_store = ConfigStore()
+
+
+def get_config():
+    """Return the process-wide :class:`ConfigSnapshot`, reloading changed files."""
+    return _store.get()
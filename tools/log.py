@@ -0,0 +1,215 @@
+# rs_outperformance_kite_system/tools/log.py
+
+"""Queue-backed, level-gated logging for the scanner.
+
+Modules log through ``log = get_logger(__name__)`` with %-style arguments
+(``log.debug("[RS] %s: %d points", symbol, n)``), so a message below the
+logger's level is discarded before it is formatted. Records that pass are put
+on a queue by the calling thread and written by one background listener, so
+console and file I/O never block the scan loops.
+
+Per-symbol lines are logged at DEBUG and each stage logs an INFO summary.
+Levels can be set per module (``{"core.screener": "DEBUG"}``), and quiet mode
+(``RS_QUIET=1``) keeps only warnings and errors. Importing this module starts
+no threads: until an entry point calls :func:`setup_logging` (or
+:func:`configure_from`), records are written to stdout directly, at the
+levels from the environment.
+
+Other processes write through the parent's listener too. Pool workers are
+started with :func:`worker_config` as their initializer arguments and put
+their records on a multiprocessing queue the parent drains. A child created
+with a bare ``fork`` gets a fresh listener of its own, since the parent's
+thread does not survive the fork.
+"""
+
+import atexit
+import contextlib
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+ROOT = "rs"
+DEFAULT_LEVEL = "INFO"
+QUIET_LEVEL = "WARNING"
+
+_state = {'listener': None, 'handler': None, 'configured': False, 'levels': (DEFAULT_LEVEL, {}),
+          'worker_queue': None, 'worker_listener': None}
+_setup_lock = threading.Lock()
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to whatever ``sys.stdout`` is when a record is emitted."""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and ``extra`` fields."""
+
+    _RESERVED = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in self._RESERVED})
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def _env_flag(name):
+    return os.getenv(name, "").lower() in ("1", "true", "yes", "on")
+
+
+def setup_logging(level=None, modules=None, quiet=None, json_lines=False, path=None):
+    """(Re)configure the ``rs`` loggers and start the background writer.
+
+    ``level`` defaults to ``RS_LOG_LEVEL`` or INFO. ``quiet`` (default
+    ``RS_QUIET``) raises it to WARNING. ``modules`` maps module names to their
+    own levels. Records go to stdout, or are appended to ``path``. With
+    ``json_lines`` each record is written as one JSON object.
+    """
+    if quiet is None:
+        quiet = _env_flag("RS_QUIET")
+    level = QUIET_LEVEL if quiet else (level or os.getenv("RS_LOG_LEVEL") or DEFAULT_LEVEL)
+
+    with _setup_lock:
+        shutdown()
+        handler = logging.FileHandler(path) if path else _StdoutHandler()
+        handler.setFormatter(JsonFormatter() if json_lines else logging.Formatter("%(message)s"))
+        records = queue.SimpleQueue()
+        listener = QueueListener(records, handler)
+        listener.start()
+
+        logging.getLogger(ROOT).handlers[:] = [QueueHandler(records)]
+        levels = (str(level).upper(), {m: str(v).upper() for m, v in (modules or {}).items()})
+        _apply_levels(*levels)
+
+        _state.update(listener=listener, handler=handler, configured=True, levels=levels)
+    return listener
+
+
+def _apply_levels(level, modules):
+    root = logging.getLogger(ROOT)
+    root.setLevel(level)
+    root.propagate = False
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith(ROOT + "."):
+            logging.getLogger(name).setLevel(logging.NOTSET)
+    for module, module_level in modules.items():
+        logging.getLogger(f"{ROOT}.{module}").setLevel(module_level)
+
+
+def shutdown():
+    """Flush queued records and stop the background writers."""
+    listener, handler = _state['listener'], _state['handler']
+    worker_listener = _state['worker_listener']
+    _state.update(worker_queue=None, worker_listener=None)
+    if worker_listener is not None:
+        worker_listener.stop()
+    if listener is not None:
+        _state.update(listener=None, handler=None)
+        listener.stop()
+        handler.close()
+
+
+def worker_config(context):
+    """Return the arguments for :func:`attach_worker` in a pool of ``context``.
+
+    Records the workers log are put on a ``context`` queue and written by
+    this process's handler, at this process's levels.
+    """
+    if _state['handler'] is None:
+        setup_logging()
+    with _setup_lock:
+        if _state['worker_queue'] is None:
+            records = context.Queue()
+            listener = QueueListener(records, _state['handler'])
+            listener.start()
+            _state.update(worker_queue=records, worker_listener=listener)
+        return _state['worker_queue'], _state['levels']
+
+
+def attach_worker(records, levels):
+    """Send this (worker) process's records to the parent; see :func:`worker_config`."""
+    with _setup_lock:
+        shutdown()
+        logging.getLogger(ROOT).handlers[:] = [QueueHandler(records)]
+        _apply_levels(*levels)
+        _state.update(configured=True, levels=levels)
+
+
+def _after_fork_in_child():
+    # The listener threads stayed in the parent; restart ours on a new queue
+    # so the child's records are still written.
+    global _setup_lock
+    _setup_lock = threading.Lock()
+    _state.update(worker_queue=None, worker_listener=None)
+    handler = _state['handler']
+    if _state['listener'] is None or handler is None:
+        return
+    records = queue.SimpleQueue()
+    listener = QueueListener(records, handler)
+    listener.start()
+    logging.getLogger(ROOT).handlers[:] = [QueueHandler(records)]
+    _state['listener'] = listener
+
+
+def _install_default():
+    # Synchronous stdout until setup_logging starts the background writer.
+    handler = _StdoutHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.getLogger(ROOT).handlers[:] = [handler]
+    level = QUIET_LEVEL if _env_flag("RS_QUIET") else (os.getenv("RS_LOG_LEVEL") or DEFAULT_LEVEL)
+    levels = (level.upper(), {})
+    _apply_levels(*levels)
+    _state.update(handler=handler, levels=levels)
+
+
+def configure_from(params):
+    """Apply the ``logging`` section of a :class:`tools.config.Params`."""
+    section = params.logging
+    return setup_logging(section.level, dict(section.modules), section.quiet or None,
+                         section.json, section.path)
+
+
+@contextlib.contextmanager
+def quiet(*modules, level=QUIET_LEVEL):
+    """Log only ``level`` and above from ``modules`` within the block."""
+    loggers = [logging.getLogger(f"{ROOT}.{m}") for m in modules]
+    saved = [lg.level for lg in loggers]
+    for lg in loggers:
+        lg.setLevel(level)
+    try:
+        yield
+    finally:
+        for lg, previous in zip(loggers, saved):
+            lg.setLevel(previous)
+
+
+def get_logger(name):
+    """Return the logger for module ``name`` under the ``rs`` hierarchy."""
+    return logging.getLogger(f"{ROOT}.{name}")
+
+
+_install_default()
+atexit.register(shutdown)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
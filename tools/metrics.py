@@ -0,0 +1,228 @@
+# rs_outperformance_kite_system/tools/metrics.py
+
+"""Lightweight stage timings, histograms and counters for the scan pipeline.
+
+Instrumented code wraps each stage in ``with metrics.span("entry.breadth"):``
+and bumps counters with ``metrics.count("kite.historical_calls")``. While
+metrics are disabled (the default) ``span`` returns one shared no-op context
+manager and ``count``/``observe`` return immediately, so the calls cost a
+few attribute lookups. Enable with ``metrics.enable()`` or ``RS_METRICS=1``.
+
+Collected values export as a JSON run report (:meth:`Metrics.write_json`) or
+a Prometheus textfile (:meth:`Metrics.write_prometheus`) for node_exporter's
+textfile collector. Work done inside :func:`core.parallel.map_panel` worker
+processes is timed as one span in the parent only.
+"""
+
+import bisect
+import functools
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime
+
+# Histogram upper bounds in seconds, from 10µs to a minute.
+DEFAULT_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+PROMETHEUS_PREFIX = "rs_scan"
+
+
+class Histogram:
+    """Count, sum, min/max and cumulative bucket counts of observed values."""
+
+    __slots__ = ("buckets", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value, n=1):
+        self.counts[bisect.bisect_left(self.buckets, value)] += n
+        self.count += n
+        self.sum += value * n
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def cumulative(self):
+        """Return ``[(upper_bound, count <= bound), ...]`` ending with ``+Inf``."""
+        total, out = 0, []
+        for bound, n in zip(self.buckets + (math.inf,), self.counts):
+            total += n
+            out.append((bound, total))
+        return out
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total': self.sum,
+            'mean': self.sum / self.count if self.count else None,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'buckets': {('+Inf' if math.isinf(b) else repr(b)): n for b, n in self.cumulative()},
+        }
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "symbols", "started")
+
+    def __init__(self, metrics, name, symbols):
+        self.metrics = metrics
+        self.name = name
+        self.symbols = symbols
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics._record_span(self.name, time.perf_counter() - self.started, self.symbols)
+        return False
+
+
+class Metrics:
+    """Process-wide registry of span timings, histograms and counters."""
+
+    def __init__(self, enabled=None):
+        if enabled is None:
+            enabled = os.getenv("RS_METRICS", "").lower() in ("1", "true", "yes", "on")
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.started = datetime.now()
+            self.spans = {}
+            self.histograms = {}
+            self.counters = {}
+
+    def span(self, name, symbols=None):
+        """Time a ``with`` block as stage ``name``.
+
+        With ``symbols`` the duration divided by the symbol count is also
+        recorded in the ``<name>.per_symbol`` histogram.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, symbols)
+
+    def timed(self, name):
+        """Decorator form of :meth:`span` for a whole function."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, name, None):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def _record_span(self, name, seconds, symbols):
+        with self._lock:
+            hist = self.spans.get(name)
+            if hist is None:
+                hist = self.spans[name] = Histogram()
+            hist.observe(seconds)
+            if symbols:
+                self._observe(f"{name}.per_symbol", seconds / symbols, symbols)
+
+    def _observe(self, name, value, n=1):
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = Histogram()
+        hist.observe(value, n)
+
+    def observe(self, name, value):
+        """Add one value (e.g. a per-symbol fetch time in seconds) to histogram ``name``."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._observe(name, value)
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self):
+        """Return everything collected so far as a JSON-serialisable dict."""
+        with self._lock:
+            return {
+                'started': self.started.isoformat(timespec='seconds'),
+                'finished': datetime.now().isoformat(timespec='seconds'),
+                'spans': {name: h.summary() for name, h in self.spans.items()},
+                'histograms': {name: h.summary() for name, h in self.histograms.items()},
+                'counters': dict(self.counters),
+            }
+
+    def write_json(self, path):
+        _write_atomic(path, json.dumps(self.report(), indent=2))
+        print(f"[📊] Metrics report saved to {path}")
+
+    def prometheus_text(self, prefix=PROMETHEUS_PREFIX):
+        """Render the metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            groups = (
+                (f"{prefix}_stage_seconds", "Wall time per pipeline stage.", "stage", self.spans),
+                (f"{prefix}_distribution", "Per-item costs, e.g. seconds per symbol.", "name",
+                 self.histograms),
+            )
+            for metric, help_text, label, hists in groups:
+                if not hists:
+                    continue
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+                for name, hist in sorted(hists.items()):
+                    for bound, n in hist.cumulative():
+                        le = "+Inf" if math.isinf(bound) else repr(bound)
+                        lines.append(f'{metric}_bucket{{{label}="{name}",le="{le}"}} {n}')
+                    lines.append(f'{metric}_sum{{{label}="{name}"}} {hist.sum!r}')
+                    lines.append(f'{metric}_count{{{label}="{name}"}} {hist.count}')
+            if self.counters:
+                metric = f"{prefix}_events_total"
+                lines += [f"# HELP {metric} Counted events such as API calls.", f"# TYPE {metric} counter"]
+                for name, n in sorted(self.counters.items()):
+                    lines.append(f'{metric}{{name="{name}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path, prefix=PROMETHEUS_PREFIX):
+        # The textfile collector may read at any time, so replace atomically.
+        _write_atomic(path, self.prometheus_text(prefix))
+        print(f"[📊] Prometheus metrics saved to {path}")
+
+
+def _write_atomic(path, text):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+metrics = Metrics()
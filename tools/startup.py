@@ -0,0 +1,77 @@
+# rs_outperformance_kite_system/tools/startup.py
+
+"""Import-time breakdown for the command line entry points.
+
+:class:`ImportProfiler` wraps ``builtins.__import__`` while it is active and
+records, for every module loaded for the first time, the cumulative time of
+its import and the part spent in the module itself (excluding the imports it
+triggered). This is what ``python main.py --profile-startup ...`` prints.
+"""
+
+import builtins
+import sys
+import time
+
+
+class ImportProfiler:
+    """Context manager timing first-time imports; see the module docstring."""
+
+    def __init__(self):
+        self.records = {}  # module -> [cumulative seconds, self seconds, depth]
+        self.started = None
+        self.finished = None
+        self._original = None
+        self._stack = []
+
+    def __enter__(self):
+        self._original = builtins.__import__
+        builtins.__import__ = self._import
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        builtins.__import__ = self._original
+        self.finished = time.perf_counter()
+        return False
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original(name, globals, locals, fromlist, level)
+        self._stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            if name in sys.modules:
+                self.records[name] = [elapsed, elapsed - children, len(self._stack)]
+
+    @property
+    def total(self):
+        """Seconds spent in top-level imports."""
+        return sum(cum for cum, _, depth in self.records.values() if depth == 0)
+
+    def by_package(self):
+        """Return ``{top-level package: self seconds}``, largest first."""
+        totals = {}
+        for name, (_, own, _) in self.records.items():
+            package = name.split('.')[0]
+            totals[package] = totals.get(package, 0.0) + own
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def report(self, limit=15):
+        """Return the breakdown as printable lines."""
+        wall = (self.finished or time.perf_counter()) - self.started
+        lines = [f"[⏱️] Startup: {self.total * 1000:.0f} ms importing "
+                 f"{len(self.records)} modules; command took {wall * 1000:.0f} ms"]
+        lines.append("    slowest imports (cumulative / self):")
+        ranked = sorted(self.records.items(), key=lambda item: item[1][0], reverse=True)
+        for name, (cum, own, depth) in ranked[:limit]:
+            lines.append(f"    {cum * 1000:8.1f} ms {own * 1000:8.1f} ms  {'  ' * min(depth, 4)}{name}")
+        lines.append("    by package (self):")
+        for package, own in list(self.by_package().items())[:limit]:
+            lines.append(f"    {own * 1000:8.1f} ms  {package}")
+        return lines
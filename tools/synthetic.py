@@ -0,0 +1,64 @@
+# rs_outperformance_kite_system/tools/synthetic.py
+
+"""Deterministic synthetic OHLCV universes for benchmarks and offline runs."""
+
+import numpy as np
+import pandas as pd
+
+# (index daily drift, index daily volatility, mean stock alpha) per market regime.
+REGIMES = {
+    'bull': (0.0012, 0.008, 0.002),
+    'bear': (-0.0012, 0.012, -0.001),
+    'sideways': (0.0, 0.006, 0.0),
+    'volatile': (0.0, 0.02, 0.0),
+}
+
+
+def generate_universe(n_symbols=500, periods=250, regime='bull', seed=0, start="2023-01-02",
+                      tz="Asia/Kolkata", gap_rate=0.0, index_symbol="NIFTY"):
+    """Return ``(stock_data_dict, index_df)`` of random-walk daily bars.
+
+    Each stock follows ``beta * index return + alpha + noise``. Betas,
+    alphas and volatilities are drawn per symbol, so the universe mixes
+    leaders and laggards. The same arguments always give the same data.
+    In the ``bull`` regime most stocks end above their 50-day MA, so the
+    entry engine's breadth filter passes; ``bear`` makes it fail.
+    ``gap_rate`` drops that fraction of each stock's bars (not the last one)
+    to mimic suspensions and missing data.
+    """
+    if regime not in REGIMES:
+        raise ValueError(f"Unknown regime {regime!r}; choose from {sorted(REGIMES)}")
+    drift, vol, mean_alpha = REGIMES[regime]
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=periods, tz=tz)
+
+    index_ret = rng.normal(drift, vol, periods)
+    index_close = 10_000 * np.exp(np.cumsum(index_ret))
+    index_df = _bars(index_close, rng, volume=np.zeros(periods), dates=dates)
+    index_df.attrs['symbol'] = index_symbol
+
+    beta = rng.uniform(0.6, 1.5, n_symbols)
+    alpha = rng.normal(mean_alpha, 0.001, n_symbols)
+    noise = rng.uniform(0.008, 0.025, n_symbols)
+    returns = index_ret[:, None] * beta + alpha + rng.normal(0, 1, (periods, n_symbols)) * noise
+    closes = rng.uniform(50, 3000, n_symbols) * np.exp(np.cumsum(returns, axis=0))
+    volumes = rng.lognormal(12, 1, (periods, n_symbols)).round()
+
+    stock_data = {}
+    width = len(str(n_symbols - 1))
+    for j in range(n_symbols):
+        df = _bars(closes[:, j], rng, volume=volumes[:, j], dates=dates)
+        if gap_rate:
+            drop = rng.random(periods - 1) < gap_rate
+            df = df[np.r_[~drop, True]]
+        stock_data[f"SYN{j:0{width}d}"] = df
+    return stock_data, index_df
+
+
+def _bars(close, rng, volume, dates):
+    spread = np.abs(rng.normal(0, 0.006, (2, len(close))))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + spread[0])
+    low = np.minimum(open_, close) * (1 - spread[1])
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close,
+                         'volume': volume}, index=dates)